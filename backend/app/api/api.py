@@ -1,4 +1,6 @@
 # backend/app/api.py 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.endpoints import products
@@ -6,8 +8,37 @@ from app.api.v1.endpoints import categories
 from app.api.v1.endpoints import users
 from app.api.v1.endpoints import orders
 from app.api.v1.endpoints import auth 
+from app.api.v1.endpoints import reports
+from app.api import internal
+from app.core.config import settings
+from app.core.jobs import job_queue
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.profiling import ProfilingMiddleware
+from app.core.security import password_hasher
+from app.database.leak_detector import ConnectionLeakMiddleware
+from app.database import session
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Creates the engines and the password hasher (kept out of import time for a fast cold start),
+    starts the background job worker (JOB_WORKER_ENABLED), then marks the worker ready
+    (GET /internal/health/ready). On shutdown, after the server has drained in-flight requests,
+    lets running jobs and queued password operations finish and closes the pools.
+    """
+    session.init_engines()
+    password_hasher.start()
+    if settings.JOB_WORKER_ENABLED:
+        await job_queue.start()
+    app.state.ready = True
+    yield
+    app.state.ready = False
+    await job_queue.stop(timeout=settings.GRACEFUL_SHUTDOWN_TIMEOUT)
+    password_hasher.shutdown()
+    await session.dispose_engines_async()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+app.state.ready = False
 
 origins = [
     "http://localhost",
@@ -20,8 +51,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+if settings.DEBUG_CONNECTION_LEAKS:
+    app.add_middleware(ConnectionLeakMiddleware)
+
+if settings.PROFILING_ENABLED:
+    # Added last, so it is the outermost middleware and times everything else.
+    app.add_middleware(ProfilingMiddleware)
+
 @app.get("/")
 async def read_root():
     return {"message": "Welcome to the E-commerce Backend API!"}
@@ -30,4 +69,6 @@ app.include_router(products.router, prefix="/api/v1/products", tags=["products"]
 app.include_router(categories.router, prefix="/api/v1/categories", tags=["categories"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 app.include_router(orders.router, prefix="/api/v1/orders", tags=["orders"])
-app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"]) 
\ No newline at end of file
+app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
+app.include_router(reports.router, prefix="/api/v1/reports", tags=["reports"])
+app.include_router(internal.router, prefix="/internal", tags=["internal"], include_in_schema=False)
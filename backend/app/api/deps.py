@@ -0,0 +1,69 @@
+# backend/app/api/deps.py
+import hmac
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import decode_access_token, revocations, token_cache, token_digest, token_id
+from app.schemas.user import CurrentUser
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> CurrentUser:
+    """
+    The user an access token was issued to, from its signed claims: no database round trip.
+
+    Verified tokens are cached until their exp, so a repeat request skips the signature check too.
+    Revocations are checked against this process's copy of revoked_tokens (reloaded every
+    TOKEN_REVOCATION_REFRESH_SECONDS, the only time a request waits on the database here). A logout
+    revokes the token, and a role change or a deletion every token the user had: their claims are
+    out of date. Tokens without the uid and role claims predate them and must be renewed.
+    """
+    digest = token_digest(token)
+    cached = token_cache.get(digest)
+    if cached is None:
+        claims = decode_access_token(token)
+        if claims is None or not {"exp", "sub", "uid", "role"} <= claims.keys():
+            raise _credentials_exception()
+        # Tokens issued before the iat claim count as issued at the epoch: any revocation of their user covers them.
+        cached = (token_id(claims, digest), CurrentUser(user_id=claims["uid"], username=claims["sub"], role=claims["role"]), claims.get("iat", 0))
+        token_cache.set(digest, cached, claims["exp"])
+
+    jti, user, issued_at = cached
+    if revocations.stale:
+        await run_in_threadpool(revocations.refresh)
+    if revocations.is_revoked(jti, user.user_id, issued_at):
+        raise _credentials_exception()
+    return user
+
+
+async def require_admin(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    if current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
+
+async def require_self_or_admin(user_id: int, current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    # For routes under /users/{user_id}: the user themself, or an admin.
+    if current_user.user_id != user_id and current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to access this user")
+    return current_user
+
+
+async def require_metrics_access(token: str = Depends(oauth2_scheme)) -> None:
+    # The internal metrics: a scraper presenting METRICS_TOKEN, or an admin.
+    if settings.METRICS_TOKEN and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        return
+    await require_admin(await get_current_user(token))
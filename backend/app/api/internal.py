@@ -0,0 +1,108 @@
+# backend/app/api/internal.py
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import text
+
+from app.api.deps import require_metrics_access
+from app.core.security import password_hasher
+from app.core.config import settings
+from app.core.jobs import job_queue
+from app.core.profiling import route_metrics
+from app.database import leak_detector
+from app.database.pool_metrics import pool_metrics
+from app.database import session
+from app.database.session import get_async_engine, get_engine
+from app.services import product as product_services
+
+router = APIRouter()
+
+@router.get("/health/live")
+async def read_liveness():
+    """
+    Liveness probe: answers as long as the worker's event loop does. Touches no dependency, so a
+    database outage does not get healthy workers restarted.
+    """
+    return {"status": "ok"}
+
+def _check_database() -> None:
+    with get_engine().connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+@router.get("/health/ready")
+async def read_readiness(request: Request):
+    """
+    Readiness probe: 200 once the worker has started and can reach its databases, 503 otherwise
+    (and while it shuts down), so a load balancer only routes requests to workers that can serve them.
+    """
+    checks = {"started": "ok" if request.app.state.ready else "not ready"}
+    try:
+        await run_in_threadpool(_check_database)
+        checks["database"] = "ok"
+    except Exception as exc:
+        checks["database"] = f"error: {type(exc).__name__}"
+    async_engine = get_async_engine()
+    if async_engine is not None:
+        try:
+            async with async_engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+            checks["async_database"] = "ok"
+        except Exception as exc:
+            checks["async_database"] = f"error: {type(exc).__name__}"
+    ready = all(result == "ok" for result in checks.values())
+    if session.replicas:
+        # Informational: reads fall back to the primary while replicas are down.
+        checks["replicas"] = f"{sum(replica.healthy for replica in session.replicas.replicas)}/{len(session.replicas.replicas)} healthy"
+    return JSONResponse(
+        {"status": "ok" if ready else "unavailable", "checks": checks},
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+# The metrics reveal routes, traffic and pool sizing: see METRICS_TOKEN.
+metrics_access = [Depends(require_metrics_access)]
+
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=metrics_access)
+def read_metrics():
+    """
+    Per-route request latency, SQL statements and time, and serialization time of this worker
+    process, in the Prometheus text format. Empty unless PROFILING_ENABLED.
+    """
+    return PlainTextResponse(route_metrics.prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@router.get("/metrics/db-pool", dependencies=metrics_access)
+def read_db_pool_metrics():
+    """
+    Connection pool state and checkout wait times for this worker process.
+    """
+    metrics = {"primary": pool_metrics["primary"].snapshot()}
+    if settings.DATABASE_ASYNC:
+        metrics["async"] = pool_metrics["async"].snapshot()
+    for name, replica_set in (("replicas", session.replicas), ("async_replicas", session.async_replicas)):
+        if replica_set:
+            metrics[name] = replica_set.stats()
+            for replica in replica_set.replicas:
+                metrics[name]["replicas"][replica.name]["pool"] = pool_metrics[replica.name].snapshot()
+    if settings.DEBUG_CONNECTION_LEAKS:
+        metrics["leaked_connections"] = leak_detector.leaked_connections
+    return metrics
+
+@router.get("/metrics/cache", dependencies=metrics_access)
+def read_cache_metrics():
+    """
+    Hit/miss/eviction counters of the read-through caches in this worker process.
+    """
+    return {"products": product_services.product_cache.stats()}
+
+@router.get("/metrics/password-hashing", dependencies=metrics_access)
+def read_password_hashing_metrics():
+    """
+    Queue depth and timings of the password hashing pool in this worker process.
+    """
+    return password_hasher.stats()
+
+@router.get("/metrics/jobs", dependencies=metrics_access)
+def read_job_metrics():
+    """
+    Background jobs: this process's worker and counters, and the jobs by status in the backend.
+    """
+    return job_queue.stats()
@@ -1,9 +1,11 @@
 # backend/app/api/v1/endpoints/categories.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app.database.session import get_db
+from app.core.http_cache import conditional_json_response
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.database.session import ReadDB, get_db, get_read_db
 from app.schemas import category as category_schemas
 from app.services import category as category_services
 
@@ -23,29 +25,35 @@ def create_category(
     return category_services.create_category(db=db, category=category)
 
 @router.get("/", response_model=List[category_schemas.Category])
-def read_categories(
+async def read_categories(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: ReadDB = Depends(get_read_db)
 ):
     """
     Retrieve a list of product categories.
+    Pass the X-Next-Cursor header of a page as `cursor` to fetch the next one (skip is ignored).
+    Responses carry an ETag; a matching If-None-Match gets an empty 304.
     """
-    categories = category_services.get_categories(db, skip=skip, limit=limit)
-    return categories
+    body, next_page = await db.run(category_services.get_categories_json, skip=skip, limit=limit, cursor=cursor)
+    return conditional_json_response(request, body, {NEXT_CURSOR_HEADER: next_page} if next_page else None)
 
 @router.get("/{category_id}", response_model=category_schemas.Category)
-def read_category(
+async def read_category(
+    request: Request,
     category_id: int,
-    db: Session = Depends(get_db)
+    db: ReadDB = Depends(get_read_db)
 ):
     """
     Retrieve a single category by its ID.
+    Responses carry an ETag; a matching If-None-Match gets an empty 304.
     """
-    db_category = category_services.get_category(db, category_id=category_id)
-    if db_category is None:
+    body = await db.run(category_services.get_category_json, category_id=category_id)
+    if body is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
-    return db_category
+    return conditional_json_response(request, body)
 
 @router.put("/{category_id}", response_model=category_schemas.Category)
 def update_category(
@@ -76,4 +84,5 @@ def delete_category(
     success = category_services.delete_category(db, category_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
-    return {"message": "Category deleted successfully"}
\ No newline at end of file
+    return {"message": "Category deleted successfully"}
+
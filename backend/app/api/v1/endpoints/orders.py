@@ -1,51 +1,82 @@
 # backend/app/api/v1/endpoints/orders.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
-from app.database.session import get_db
+from app.core.pagination import set_next_cursor
+from app.core.serialization import TrustedSerializer
+from app.core.streaming import streaming_response
+from app.database.session import ReadDB, get_db, get_read_db
 from app.schemas import order as order_schemas
 from app.schemas import order_item as order_item_schemas 
+from app.services import idempotency as idempotency_services
 from app.services import order as order_services
 from app.services import order_item as order_item_services
 
 router = APIRouter()
 
+# Read responses are written straight from the loaded rows; response_model still documents them.
+order_serializer = TrustedSerializer(order_schemas.Order)
+order_item_serializer = TrustedSerializer(order_item_schemas.OrderItem)
+
 @router.post("/", response_model=order_schemas.Order, status_code=status.HTTP_201_CREATED)
 def create_order(
     order: order_schemas.OrderCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255, description="Retries with the same key return the first response instead of placing the order again"),
     db: Session = Depends(get_db)
 ):
     """
     Create a new order.
     Requires a list of order_items with product_id and quantity.
+    With an Idempotency-Key header, a retry of the same request gets the stored response (marked
+    Idempotent-Replayed: true); 409 while the first attempt is still in progress, 422 if the key was used for another request.
     """
-    return order_services.create_order(db=db, order=order)
+    if not idempotency_key:
+        return order_serializer.response(order_services.create_order(db=db, order=order), status_code=status.HTTP_201_CREATED)
+
+    token, stored = idempotency_services.claim(db, idempotency_key, idempotency_services.fingerprint("POST /api/v1/orders/", order))
+    if stored is not None:
+        return idempotency_services.replay(stored)
+    try:
+        db_order = order_services.create_order(db=db, order=order, idempotency_key=idempotency_key, claim_token=token)
+    except Exception:
+        idempotency_services.release(db, idempotency_key, token)
+        raise
+    return order_serializer.response(db_order, status_code=status.HTTP_201_CREATED)
 
 @router.get("/", response_model=List[order_schemas.Order])
-def read_orders(
+async def read_orders(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    stream: Optional[Literal["ndjson", "json"]] = Query(None, description="Stream every row after `cursor` instead of one page"),
+    db: ReadDB = Depends(get_read_db)
 ):
     """
     Retrieve a list of orders.
+    Pass the X-Next-Cursor header of a page as `cursor` to fetch the next one (skip is ignored).
+    With ?stream=ndjson (one object per line) or ?stream=json (one array), every row after `cursor` is streamed
+    from a server-side cursor instead; limit and skip are ignored.
     """
-    orders = order_services.get_orders(db, skip=skip, limit=limit)
-    return orders
+    if stream:
+        return streaming_response(order_services.stream_orders(stream, cursor=cursor), stream)
+    orders = await db.run(order_services.get_orders, skip=skip, limit=limit, cursor=cursor)
+    response = order_serializer.list_response(orders)
+    set_next_cursor(response, orders, limit, "order_id")
+    return response
 
 @router.get("/{order_id}", response_model=order_schemas.Order)
-def read_order(
+async def read_order(
     order_id: int,
-    db: Session = Depends(get_db)
+    db: ReadDB = Depends(get_read_db)
 ):
     """
     Retrieve a single order by its ID.
     """
-    db_order = order_services.get_order(db, order_id=order_id)
+    db_order = await db.run(order_services.get_order, order_id=order_id)
     if db_order is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
-    return db_order
+    return order_serializer.response(db_order)
 
 @router.put("/{order_id}", response_model=order_schemas.Order)
 def update_order(
@@ -76,17 +107,17 @@ def delete_order(
     return {"message": "Order deleted successfully"}
 
 @router.get("/{order_id}/items", response_model=List[order_item_schemas.OrderItem])
-def read_order_items_for_order(
+async def read_order_items_for_order(
     order_id: int,
-    db: Session = Depends(get_db)
+    db: ReadDB = Depends(get_read_db)
 ):
     """
     Retrieve all order items for a specific order.
     """
-    db_order = order_services.get_order(db, order_id)
+    db_order = await db.run(order_services.get_order, order_id)
     if not db_order:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
 
-    order_items = order_item_services.get_order_items_by_order(db, order_id=order_id)
-    return order_items
+    order_items = await db.run(order_item_services.get_order_items_by_order, order_id=order_id)
+    return order_item_serializer.list_response(order_items)
 
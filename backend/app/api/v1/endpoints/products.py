@@ -1,9 +1,15 @@
 # backend/app/api/v1/endpoints/products.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
-from app.database.session import get_db
+from app.core import bulk_io
+from app.core.config import settings
+from app.core.http_cache import conditional_json_response
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.streaming import streaming_response
+from app.database.session import ReadDB, get_db, get_read_db
 from app.schemas import product as product_schemas
 from app.services import product as product_services 
 
@@ -20,29 +26,91 @@ def create_product(
     return product_services.create_product(db=db, product=product)
 
 @router.get("/", response_model=List[product_schemas.Product])
-def read_products(
+async def read_products(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    stream: Optional[Literal["ndjson", "json"]] = Query(None, description="Stream every row after `cursor` instead of one page"),
+    filters: product_schemas.ProductFilter = Depends(),
+    db: ReadDB = Depends(get_read_db)
+):
+    """
+    Retrieve a list of products, optionally filtered by category, price range and stock, and sorted.
+    Pass the X-Next-Cursor header of a page as `cursor` to fetch the next one (skip is ignored).
+    Responses carry an ETag; a matching If-None-Match gets an empty 304.
+    With ?stream=ndjson (one object per line) or ?stream=json (one array), every row after `cursor` is streamed
+    from a server-side cursor instead; limit and skip are ignored.
+    """
+    if stream:
+        return streaming_response(product_services.stream_products(stream, cursor=cursor, filters=filters), stream)
+    body, next_page = await db.run(product_services.get_products_json, skip=skip, limit=limit, cursor=cursor, filters=filters)
+    return conditional_json_response(request, body, {NEXT_CURSOR_HEADER: next_page} if next_page else None)
+
+@router.get("/search", response_model=List[product_schemas.Product])
+async def search_products(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    category_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: ReadDB = Depends(get_read_db)
 ):
     """
-    Retrieve a list of products.
+    Search products by name and description, best match first.
+    Terms match as prefixes and tolerate small typos in the product name.
     """
-    products = product_services.get_products(db, skip=skip, limit=limit)
+    products, next_cursor = await db.run(product_services.search_products, q, category_id=category_id, limit=limit, cursor=cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return products
 
+@router.post("/bulk", response_model=product_schemas.ProductImportReport)
+async def bulk_import_products(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Defaults to the request's Content-Type"),
+    mode: Literal["insert", "upsert"] = "insert",
+    batch_size: int = Query(settings.BULK_IMPORT_BATCH_SIZE, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """
+    Import products from a CSV (with a header row) or NDJSON body, streamed as it arrives.
+    Rows are validated one by one and written `batch_size` per transaction. With mode=upsert,
+    rows carrying a product_id replace that product. Rejected rows are listed in the report.
+    A line or record longer than BULK_IMPORT_MAX_RECORD_LENGTH characters stops the import with a 413;
+    the batches committed before it stay written.
+    """
+    format = format or bulk_io.format_from_content_type(request.headers.get("content-type"))
+    if format is None:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Send text/csv or application/x-ndjson, or pass ?format=")
+    records = bulk_io.iter_records(request.stream(), format, settings.BULK_IMPORT_MAX_RECORD_LENGTH)
+    return await product_services.import_products(db, records, upsert=mode == "upsert", batch_size=batch_size)
+
+@router.get("/export")
+def export_products(format: Literal["csv", "ndjson"] = "csv"):
+    """
+    Stream every product as CSV or NDJSON, without loading the table into memory.
+    """
+    return StreamingResponse(
+        product_services.export_products(format),
+        media_type=bulk_io.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
+
 @router.get("/{product_id}", response_model=product_schemas.Product)
-def read_product(
+async def read_product(
+    request: Request,
     product_id: int,
-    db: Session = Depends(get_db)
+    db: ReadDB = Depends(get_read_db)
 ):
     """
     Retrieve a single product by its ID.
+    Responses carry an ETag; a matching If-None-Match gets an empty 304.
     """
-    db_product = product_services.get_product(db, product_id=product_id)
-    if db_product is None:
+    body = await db.run(product_services.get_product_json, product_id=product_id)
+    if body is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
-    return db_product
+    return conditional_json_response(request, body)
 
 @router.put("/{product_id}", response_model=product_schemas.Product)
 def update_product(
@@ -69,4 +137,5 @@ def delete_product(
     success = product_services.delete_product(db, product_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
-    return {"message": "Product deleted successfully"}
\ No newline at end of file
+    return {"message": "Product deleted successfully"}
+
@@ -0,0 +1,57 @@
+# backend/app/api/v1/endpoints/reports.py
+from datetime import date, datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+
+from app.api.deps import require_admin
+from app.database.session import get_db
+from app.schemas import report as report_schemas
+from app.services import report as report_services
+
+# Sales dashboards, read from the rollups: whole months of product sales come from the monthly rows, so a
+# year costs about 12 rows per product plus the days at either end; daily revenue reads the order summary alone.
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+def report_period(
+    start: Optional[date] = Query(None, description="First day (UTC), inclusive; defaults to 29 days before end"),
+    end: Optional[date] = Query(None, description="Last day (UTC), inclusive; defaults to today"),
+    status_: Optional[List[report_schemas.OrderStatus]] = Query(None, alias="status", description="Order statuses to count; defaults to every status but cancelled"),
+) -> report_schemas.ReportPeriod:
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end")
+    return report_schemas.ReportPeriod(start=start, end=end, status=status_)
+
+@router.get("/revenue", response_model=List[report_schemas.DailyRevenue])
+def read_daily_revenue(
+    period: report_schemas.ReportPeriod = Depends(report_period),
+    db: Session = Depends(get_db)
+):
+    """
+    Orders, units sold and revenue per day. Days without orders are omitted.
+    """
+    return report_services.daily_revenue(db, period.start, period.end, period.status)
+
+@router.get("/top-products", response_model=List[report_schemas.ProductSales])
+def read_top_products(
+    period: report_schemas.ReportPeriod = Depends(report_period),
+    by: Literal["revenue", "units"] = "revenue",
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    The best-selling products of the period, ranked by revenue or by units.
+    """
+    return report_services.top_products(db, period.start, period.end, period.status, limit=limit, by=by)
+
+@router.get("/categories", response_model=List[report_schemas.CategorySales])
+def read_category_sales(
+    period: report_schemas.ReportPeriod = Depends(report_period),
+    db: Session = Depends(get_db)
+):
+    """
+    Units and revenue per category, by each product's current category.
+    """
+    return report_services.category_sales(db, period.start, period.end, period.status)
@@ -1,14 +1,26 @@
 # backend/app/v1/endpoints/users.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
-from app.database.session import get_db
+from app.api.deps import require_admin, require_self_or_admin
+from app.core.pagination import set_next_cursor
+from app.core.serialization import TrustedSerializer
+from app.core.streaming import streaming_response
+from app.database.session import ReadDB, get_db, get_read_db
+from app.schemas import order as order_schemas
 from app.schemas import user as user_schemas
+from app.services import order as order_services
 from app.services import user as user_services
 
 router = APIRouter()
 
+# Read responses are written straight from the loaded rows; response_model still documents them.
+user_serializer = TrustedSerializer(user_schemas.User)
+order_serializer = TrustedSerializer(order_schemas.Order)
+
+OrderStatusFilter = Optional[Literal['pending', 'processing', 'shipped', 'delivered', 'cancelled']]
+
 @router.post("/", response_model=user_schemas.User, status_code=status.HTTP_201_CREATED)
 def create_user(
     user: user_schemas.UserCreate,
@@ -28,39 +40,67 @@ def create_user(
 
     return user_services.create_user(db=db, user=user)
 
-@router.get("/", response_model=List[user_schemas.User])
-def read_users(
+@router.get("/", response_model=List[user_schemas.User], dependencies=[Depends(require_admin)])
+async def read_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    stream: Optional[Literal["ndjson", "json"]] = Query(None, description="Stream every row after `cursor` instead of one page"),
+    db: ReadDB = Depends(get_read_db)
 ):
     """
-    Retrieve a list of users. (Admin access typically required)
+    Retrieve a list of users. Admin only.
+    Pass the X-Next-Cursor header of a page as `cursor` to fetch the next one (skip is ignored).
+    With ?stream=ndjson (one object per line) or ?stream=json (one array), every row after `cursor` is streamed
+    from a server-side cursor instead; limit and skip are ignored.
     """
-    users = user_services.get_users(db, skip=skip, limit=limit)
-    return users
+    if stream:
+        return streaming_response(user_services.stream_users(stream, cursor=cursor), stream)
+    users = await db.run(user_services.get_users, skip=skip, limit=limit, cursor=cursor)
+    response = user_serializer.list_response(users)
+    set_next_cursor(response, users, limit, "user_id")
+    return response
 
-@router.get("/{user_id}", response_model=user_schemas.User)
-def read_user(
+@router.get("/{user_id}", response_model=user_schemas.User, dependencies=[Depends(require_self_or_admin)])
+async def read_user(
     user_id: int,
-    db: Session = Depends(get_db)
+    db: ReadDB = Depends(get_read_db)
 ):
     """
-    Retrieve a single user by their ID.
+    Retrieve a single user by their ID. The user themself or an admin only.
     """
-    db_user = user_services.get_user(db, user_id=user_id)
+    db_user = await db.run(user_services.get_user, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return db_user
+    return user_serializer.response(db_user)
+
+@router.get("/{user_id}/orders", response_model=List[order_schemas.Order], dependencies=[Depends(require_self_or_admin)])
+async def read_user_orders(
+    user_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    status_: OrderStatusFilter = Query(None, alias="status"),
+    db: ReadDB = Depends(get_read_db)
+):
+    """
+    Retrieve a user's orders, newest first. The user themself or an admin only.
+    Pass the X-Next-Cursor header of a page as `cursor` to fetch the next one.
+    """
+    orders = await db.run(order_services.get_user_orders, user_id, limit=limit, cursor=cursor, status=status_)
+    if not orders and not cursor and await db.run(user_services.get_user, user_id=user_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    response = order_serializer.list_response(orders)
+    set_next_cursor(response, orders, limit, "order_date", "order_id")
+    return response
 
-@router.put("/{user_id}", response_model=user_schemas.User)
+@router.put("/{user_id}", response_model=user_schemas.User, dependencies=[Depends(require_self_or_admin)])
 def update_user(
     user_id: int,
     user_update: user_schemas.UserBase, 
     db: Session = Depends(get_db)
 ):
     """
-    Update an existing user.
+    Update an existing user. The user themself or an admin only; the role is changed with PUT /{user_id}/role.
     Note: Password update should be handled separately for security.
     """
     db_user = user_services.update_user(db, user_id, user_update)
@@ -68,15 +108,30 @@ def update_user(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found or update failed")
     return db_user
 
-@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.put("/{user_id}/role", response_model=user_schemas.User, dependencies=[Depends(require_admin)])
+def update_user_role(
+    user_id: int,
+    role_update: user_schemas.UserRoleUpdate,
+    db: Session = Depends(get_db)
+):
+    """
+    Change a user's role. Admin only.
+    """
+    db_user = user_services.set_user_role(db, user_id, role_update.role)
+    if db_user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return db_user
+
+@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_admin)])
 def delete_user(
     user_id: int,
     db: Session = Depends(get_db)
 ):
     """
-    Delete a user. (Admin access typically required)
+    Delete a user. Admin only.
     """
     success = user_services.delete_user(db, user_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return {"message": "User deleted successfully"}
\ No newline at end of file
+    return {"message": "User deleted successfully"}
+
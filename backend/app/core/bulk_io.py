@@ -0,0 +1,143 @@
+# backend/app/core/bulk_io.py
+import codecs
+import csv
+import io
+import json
+from typing import AsyncIterator, Iterable, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+
+# Upload formats by the media types clients send them with.
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-lines": "ndjson",
+}
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# (record number, fields, parse error): the record number is 1-based, the CSV header excluded.
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+
+def format_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    if not content_type:
+        return None
+    return CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+
+
+def _too_long(what: str, max_length: int) -> HTTPException:
+    # The upload cannot be split into records past this point, so the rest of it is not read. Batches
+    # already committed stay written; the rows of the unfinished batch are not.
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"{what} is longer than {max_length} characters; the import stopped there",
+    )
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_length: int) -> AsyncIterator[str]:
+    """
+    Splits a stream of UTF-8 byte chunks into lines (without line endings), holding at most one partial line.
+    Raises HTTPException(413) on a line longer than `max_length` characters, before buffering more of it.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    number = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            number += 1
+            if len(line) > max_length:
+                raise _too_long(f"Line {number}", max_length)
+            yield line.rstrip("\r")
+        if len(pending) > max_length:
+            raise _too_long(f"Line {number + 1}", max_length)
+    pending += decoder.decode(b"", final=True)
+    if pending.rstrip("\r"):
+        yield pending.rstrip("\r")
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            fields = json.loads(line)
+        except ValueError as exc:
+            yield number, None, f"invalid JSON: {exc}"
+            continue
+        if isinstance(fields, dict):
+            yield number, fields, None
+        else:
+            yield number, None, "expected a JSON object"
+
+
+async def iter_csv_records(lines: AsyncIterator[str], max_length: int) -> AsyncIterator[Record]:
+    """
+    CSV with a header row. Empty cells are treated as absent, so field defaults apply.
+    Raises HTTPException(413) on a record (quoted line breaks included) longer than `max_length` characters.
+    """
+    header = None
+    number = 0
+    record_lines = []
+    record_length = 0
+    async for line in lines:
+        record_lines.append(line)
+        record_length += len(line) + 1
+        if record_length > max_length + 1:
+            raise _too_long(f"Record {number + 1}", max_length)
+        # An odd number of quotes means a quoted field continues on the next line.
+        if sum(part.count('"') for part in record_lines) % 2:
+            continue
+        text, record_lines, record_length = "\n".join(record_lines), [], 0
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        number += 1
+        if len(values) != len(header):
+            yield number, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        yield number, {name: value for name, value in zip(header, values) if value != ""}, None
+    if record_lines:
+        yield number + 1, None, "unterminated quoted field"
+
+
+def iter_records(chunks: AsyncIterator[bytes], format: str, max_record_length: int) -> AsyncIterator[Record]:
+    lines = iter_lines(chunks, max_record_length)
+    return iter_csv_records(lines, max_record_length) if format == "csv" else iter_ndjson_records(lines)
+
+
+def _json_default(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def csv_lines(columns: Sequence[str], rows: Iterable[Sequence], header: bool = True) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(columns)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def ndjson_lines(columns: Sequence[str], rows: Iterable[Sequence]) -> str:
+    return "".join(json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in rows)
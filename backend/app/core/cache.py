@@ -0,0 +1,219 @@
+# backend/app/core/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.config import settings
+
+
+class MemoryCacheBackend:
+    """
+    Process-local TTL + LRU store, bounded by entry count and by the total size of the stored strings.
+    Counters (used for generations) are kept apart from entries and are never evicted.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._pop(key)
+
+    def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def info(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "evictions": self.evictions}
+
+    def _pop(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value)
+
+
+class RedisCacheBackend:
+    """
+    Store shared by every worker, on any server speaking the Redis protocol.
+    Memory bounds and eviction are the server's (maxmemory / maxmemory-policy).
+    """
+    _clients: Dict[str, object] = {}
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from exc
+        if url not in self._clients:
+            self._clients[url] = redis.Redis.from_url(url, decode_responses=True)
+        self.client = self._clients[url]
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.client.set(key, value, px=int(ttl * 1000))
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self.client.delete(*keys)
+
+    def get_counter(self, key: str) -> int:
+        return int(self.client.get(key) or 0)
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(key)
+
+    def info(self) -> dict:
+        return {}
+
+
+def create_cache_backend(max_entries: int, max_bytes: int):
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.CACHE_REDIS_URL)
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(max_entries, max_bytes)
+    return None
+
+
+class ReadThroughCache:
+    """
+    A namespaced read-through cache of serialized (JSON) values.
+
+    Keys embed a generation number: bump() invalidates everything in the namespace at once,
+    bump(scope) only the keys built with that scope, without having to enumerate them.
+    """
+
+    def __init__(self, namespace: str, ttl: float, max_entries: int, max_bytes: int):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.backend = create_cache_backend(max_entries, max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None and self.ttl > 0
+
+    def _generation(self, counter: str) -> str:
+        return str(self.backend.get_counter(counter)) if self.enabled else "0"
+
+    def key(self, *parts, scope: Optional[str] = None) -> str:
+        generation = self._generation(f"{self.namespace}:gen")
+        if scope is None:
+            return ":".join([self.namespace, generation, *map(str, parts)])
+        scope_generation = self._generation(f"{self.namespace}:gen:{scope}")
+        return ":".join([self.namespace, generation, scope, scope_generation, *map(str, parts)])
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        if self.enabled:
+            self.backend.set(key, value, self.ttl)
+
+    def delete(self, *keys: str) -> None:
+        if self.enabled:
+            self.invalidations += 1
+            self.backend.delete(*keys)
+
+    def bump(self, scope: Optional[str] = None) -> None:
+        if self.enabled:
+            self.invalidations += 1
+            self.backend.incr(f"{self.namespace}:gen" if scope is None else f"{self.namespace}:gen:{scope}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": settings.CACHE_BACKEND,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+            **(self.backend.info() if self.backend is not None else {}),
+        }
+
+
+class ExpiringLRUCache:
+    """
+    Process-local LRU of Python objects, each dropped at its own absolute expiry (a Unix timestamp).
+    Values are kept as they are, not serialized, so a hit costs a dict lookup.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
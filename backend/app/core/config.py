@@ -1,18 +1,111 @@
 # backend/app/core/config.py
 import os
-from dotenv import load_dotenv
+from pathlib import Path
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-load_dotenv()
+# backend/.env, wherever the process starts from; a .env in the working directory takes precedence.
+ENV_FILES = (Path(__file__).resolve().parents[2] / ".env", ".env")
 
 class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    # Serve GET endpoints from an AsyncEngine. ASYNC_DATABASE_URL defaults to DATABASE_URL with its async driver.
+    DATABASE_ASYNC: bool = os.getenv("DATABASE_ASYNC", "false").lower() == "true"
+    ASYNC_DATABASE_URL: Optional[str] = os.getenv("ASYNC_DATABASE_URL")
+    # Read replicas, comma-separated URLs (async variants derived like ASYNC_DATABASE_URL's default).
+    # GET requests read from one of them, picked per "round_robin" or "least_connections"; writes, and
+    # the rest of a request after a write, use the primary. Replica lag adds to PRODUCT_CACHE_TTL_SECONDS
+    # in how stale a cached product read can be.
+    DATABASE_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    DATABASE_REPLICA_POLICY: str = os.getenv("DATABASE_REPLICA_POLICY", "round_robin")
+    # Seconds a replica that refused or dropped a connection is skipped (its reads go elsewhere).
+    DATABASE_REPLICA_RETRY_SECONDS: float = float(os.getenv("DATABASE_REPLICA_RETRY_SECONDS", "30"))
+
+    # Production launcher (python run.py): worker processes (default: one per CPU core) and bind address.
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+    HOST: str = os.getenv("HOST", "0.0.0.0")
+    PORT: int = int(os.getenv("PORT", "8000"))
+    # Seconds in-flight requests get to finish after SIGTERM before a worker is stopped.
+    GRACEFUL_SHUTDOWN_TIMEOUT: int = int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "30"))
+    # Import the app once in the gunicorn master, so its workers share that memory copy-on-write.
+    PRELOAD_APP: bool = os.getenv("PRELOAD_APP", "true").lower() == "true"
+
+    # Connection pool, per engine and per worker process: size it so that
+    # workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays below the server's max_connections.
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+    # Development aid: log connections a request still holds when it finishes, with route and stack.
+    DEBUG_CONNECTION_LEAKS: bool = os.getenv("DEBUG_CONNECTION_LEAKS", "false").lower() == "true"
+    # Per-route latency, SQL and serialization metrics (GET /internal/metrics, Prometheus format). Off by
+    # default, as it costs every request some time: enable it where the metrics are scraped.
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    # Also report each request's DB, serialization and total time in a Server-Timing response header.
+    SERVER_TIMING_HEADER: bool = os.getenv("SERVER_TIMING_HEADER", "false").lower() == "true"
+    # The /internal/metrics* endpoints take an admin's access token, or this one as a bearer token (for a
+    # scraper); empty: admins only. The health probes stay open.
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+    # Log SQL statements at least this slow to the app.database.slow_queries logger; 0 logs every
+    # statement, a negative value disables the log.
+    SLOW_QUERY_THRESHOLD_MS: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+    # Read-through cache: "memory" (per worker), "redis" (shared, any Redis-protocol server) or "none".
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_REDIS_URL: str = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    # Also the longest a cached product read can be stale (on other workers with "memory"; see services/product.py).
+    PRODUCT_CACHE_TTL_SECONDS: float = float(os.getenv("PRODUCT_CACHE_TTL_SECONDS", "60"))
+    PRODUCT_CACHE_MAX_ENTRIES: int = int(os.getenv("PRODUCT_CACHE_MAX_ENTRIES", "10000"))
+    PRODUCT_CACHE_MAX_BYTES: int = int(os.getenv("PRODUCT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    # Rows fetched and serialized per chunk by the ?stream= mode of list endpoints.
+    STREAM_BATCH_SIZE: int = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+    # Bulk product import: default rows per transaction, and how many row errors a report lists.
+    BULK_IMPORT_BATCH_SIZE: int = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "1000"))
+    BULK_IMPORT_MAX_ERRORS: int = int(os.getenv("BULK_IMPORT_MAX_ERRORS", "1000"))
+    # Longest line or record (in characters) an import buffers; a longer one ends the import with a 413.
+    BULK_IMPORT_MAX_RECORD_LENGTH: int = int(os.getenv("BULK_IMPORT_MAX_RECORD_LENGTH", str(64 * 1024)))
+    # Rows per day and status in daily_order_summary; more means less lock contention between concurrent orders.
+    REPORT_SUMMARY_SHARDS: int = int(os.getenv("REPORT_SUMMARY_SHARDS", "8"))
+    # Idempotency-Key: how long a response is replayed, how long an unfinished request blocks retries
+    # of the same key (after a crash, say), and how often each worker purges expired keys.
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", str(24 * 60 * 60)))
+    IDEMPOTENCY_LOCK_SECONDS: int = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: float = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL_SECONDS", "300"))
+    # Background jobs: "database" keeps them in the outbox_events table, written in the same transaction
+    # as the change that causes them; "memory" keeps them in this process only (local runs, nothing durable).
+    JOB_BACKEND: str = os.getenv("JOB_BACKEND", "database")
+    # Run jobs in this process (off: leave them to other processes), how many at once, and how often
+    # an idle worker looks for due jobs (it is also woken when this process enqueues one).
+    JOB_WORKER_ENABLED: bool = os.getenv("JOB_WORKER_ENABLED", "true").lower() == "true"
+    JOB_CONCURRENCY: int = int(os.getenv("JOB_CONCURRENCY", "4"))
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1"))
+    # Retries: attempts before a job is marked dead, and the backoff, doubling from the first delay up to
+    # the cap (with jitter). A claimed job not finished within the lease (its worker died) is run again.
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "8"))
+    JOB_RETRY_BASE_SECONDS: float = float(os.getenv("JOB_RETRY_BASE_SECONDS", "2"))
+    JOB_RETRY_MAX_SECONDS: float = float(os.getenv("JOB_RETRY_MAX_SECONDS", "600"))
+    JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+    # Finished jobs are deleted after this long; dead ones are kept for inspection.
+    JOB_RETENTION_SECONDS: int = int(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 60 * 60)))
+
+    # Password hashing. Hashes of schemes listed after the first are still verified but marked deprecated.
+    PASSWORD_HASH_SCHEMES: str = os.getenv("PASSWORD_HASH_SCHEMES", "bcrypt")
+    PASSWORD_BCRYPT_ROUNDS: int = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+    # Threads hashing/verifying passwords per worker process, and how many operations may queue before a 503.
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
     SECRET_KEY: str = os.getenv("SECRET_KEY", "b391d1e70e3c5a6f2b8d0c7e9a4f1b6d8c3e7a2f5b9d0c1e7a4f1b6d8c3e7a2f") 
 
 
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
 
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # Verified access tokens remembered per worker process (each until its own exp).
+    TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+    # How often each worker process reloads the revoked tokens: the longest a logout, role change or
+    # deletion made in another process takes to apply here (in the process that made it, at once).
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = float(os.getenv("TOKEN_REVOCATION_REFRESH_SECONDS", "5"))
 
-    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+    # Fields read the environment, then the .env files, by name (no load_dotenv() needed).
+    model_config = SettingsConfigDict(env_file=ENV_FILES, extra="ignore")
 settings = Settings()
@@ -0,0 +1,124 @@
+# backend/app/core/hashing.py
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Optional
+
+from fastapi import HTTPException, status
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+class PasswordHasher:
+    """
+    Runs password hashing and verification on a small dedicated thread pool, so a burst
+    of logins neither blocks the event loop nor occupies the threads serving other requests.
+    bcrypt releases the GIL while it works, so threads scale with CPU cores.
+
+    At most `max_pending` operations may be queued or running; beyond that callers get
+    a 503 straight away instead of waiting behind work the pool cannot catch up with.
+
+    The CryptContext (and with it passlib) is only built by start(), so importing the app stays cheap.
+    """
+
+    def __init__(self, context_factory: Callable[[], "CryptContext"], workers: int, max_pending: int):
+        self.context_factory = context_factory
+        self.workers = workers
+        self.max_pending = max_pending
+        self._context: Optional["CryptContext"] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_ms_sum = 0.0
+        self.run_ms_sum = 0.0
+
+    def start(self):
+        """
+        Builds the CryptContext and the thread pool unless done already. Called from the app's lifespan;
+        elsewhere (scripts, say) the first password operation starts the hasher.
+        """
+        with self._lock:
+            if self._context is None:
+                self._context = self.context_factory()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+
+    @property
+    def context(self) -> "CryptContext":
+        if self._context is None:
+            self.start()
+        return self._context
+
+    def _submit(self, fn, *args) -> Future:
+        if self._executor is None:
+            self.start()
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent password operations, try again shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            return self._executor.submit(self._run, time.perf_counter(), fn, *args)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+            raise
+
+    def _run(self, queued_at: float, fn, *args):
+        started = time.perf_counter()
+        with self._lock:
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.running -= 1
+                self.pending -= 1
+                self.completed += 1
+                self.wait_ms_sum += (started - queued_at) * 1000
+                self.run_ms_sum += (finished - started) * 1000
+
+    def hash(self, password: str) -> str:
+        return self._submit(self.context.hash, password).result()
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._submit(self.context.verify, plain_password, hashed_password).result()
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(self.context.hash, password))
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self._submit(self.context.verify, plain_password, hashed_password))
+
+    def shutdown(self):
+        # Lets queued operations finish; called when the worker stops. A later operation starts a new pool.
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "queue_depth": self.pending - self.running,
+                "running": self.running,
+                "peak_pending": self.peak_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.wait_ms_sum / self.completed, 3) if self.completed else None,
+                "avg_run_ms": round(self.run_ms_sum / self.completed, 3) if self.completed else None,
+            }
@@ -0,0 +1,43 @@
+# backend/app/core/http_cache.py
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+# Responses carry an ETag only, no Last-Modified: a product embeds its category, and a page changes
+# when a product leaves it, neither of which moves any updated_at. The ETag is a hash of the exact
+# bytes sent, so whatever a response is built from (the database, a cache entry), the two always agree.
+
+
+def make_etag(body: bytes) -> str:
+    """
+    A strong ETag for a response body.
+    """
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def validator_headers(etag: str) -> dict:
+    # no-cache: clients may store the response but must revalidate it on every use.
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Evaluates If-None-Match (weak comparison) against `etag`.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+
+def conditional_json_response(request: Request, body: bytes, headers: Optional[dict] = None) -> Response:
+    """
+    `body` (JSON) with its ETag, or a bodiless 304 with the same headers if the client's copy matches.
+    """
+    etag = make_etag(body)
+    headers = {**(headers or {}), **validator_headers(etag)}
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,365 @@
+# backend/app/core/jobs.py
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import delete, event, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import models
+from app.database.session import SessionLocal
+
+logger = logging.getLogger("app.jobs")
+
+# Session.info keys: jobs a memory-backend transaction will publish when it commits, and whether it enqueued any.
+_PENDING_JOBS = "pending_jobs"
+_ENQUEUED = "jobs_enqueued"
+
+# Finished outbox rows deleted per purge statement, and how often a worker purges.
+PURGE_BATCH_SIZE = 500
+PURGE_INTERVAL_SECONDS = 300
+
+_handlers: Dict[str, Callable[[dict], None]] = {}
+
+
+def job_handler(topic: str):
+    """
+    Registers the decorated function as the handler of `topic`. Handlers take the job's payload (a JSON
+    object), run on the job thread pool with their own sessions, and must tolerate running twice:
+    delivery is at least once.
+    """
+    def register(handler: Callable[[dict], None]):
+        _handlers[topic] = handler
+        return handler
+    return register
+
+
+@dataclass
+class Job:
+    job_id: int
+    topic: str
+    payload: dict
+    # Including the current one.
+    attempts: int
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def retry_delay(attempts: int) -> float:
+    # Exponential backoff with jitter, so jobs that failed together do not all retry together.
+    delay = min(settings.JOB_RETRY_MAX_SECONDS, settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class DatabaseJobBackend:
+    """
+    Jobs as rows of outbox_events. enqueue() adds the row to the caller's transaction; workers in any
+    process claim due rows by bumping `attempts` (a compare-and-swap, so each claim has one winner)
+    and pushing `available_at` out by the lease.
+    """
+    name = "database"
+
+    def __init__(self):
+        self._last_purge = 0.0
+
+    def enqueue(self, db: Session, topic: str, payload: dict):
+        db.add(models.OutboxEvent(topic=topic, payload=payload))
+
+    def publish(self, jobs):
+        # The rows committed with the transaction: nothing left to do.
+        pass
+
+    def claim(self, limit: int) -> List[Job]:
+        now = _now()
+        Event = models.OutboxEvent
+        with SessionLocal() as db:
+            self._purge(db, now)
+            due = db.execute(
+                select(Event.event_id, Event.attempts)
+                .filter(Event.status == 'pending', Event.available_at <= now)
+                .order_by(Event.available_at, Event.event_id)
+                .limit(limit)
+            ).all()
+            claimed = []
+            for event_id, attempts in due:
+                result = db.execute(
+                    update(Event)
+                    .filter(Event.event_id == event_id, Event.attempts == attempts, Event.status == 'pending')
+                    .values(attempts=attempts + 1, available_at=now + timedelta(seconds=settings.JOB_LEASE_SECONDS))
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount == 1:
+                    claimed.append(event_id)
+            db.commit()
+            if not claimed:
+                return []
+            rows = db.execute(
+                select(Event.event_id, Event.topic, Event.payload, Event.attempts).filter(Event.event_id.in_(claimed)).order_by(Event.event_id)
+            ).all()
+        return [Job(*row) for row in rows]
+
+    def _finish(self, job: Job, **values):
+        # Only while the claim is still ours: after the lease ran out another worker may own the job.
+        Event = models.OutboxEvent
+        with SessionLocal() as db:
+            db.execute(
+                update(Event)
+                .filter(Event.event_id == job.job_id, Event.attempts == job.attempts, Event.status == 'pending')
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+    def succeed(self, job: Job):
+        now = _now()
+        self._finish(job, status='done', processed_at=now, available_at=now, last_error=None)
+
+    def fail(self, job: Job, error: str, retry_in: Optional[float]):
+        if retry_in is None:
+            self._finish(job, status='dead', processed_at=_now(), last_error=error)
+        else:
+            self._finish(job, available_at=_now() + timedelta(seconds=retry_in), last_error=error)
+
+    def _purge(self, db: Session, now: datetime):
+        if time.monotonic() - self._last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = time.monotonic()
+        Event = models.OutboxEvent
+        finished = (
+            select(Event.event_id)
+            .filter(Event.status == 'done', Event.available_at < now - timedelta(seconds=settings.JOB_RETENTION_SECONDS))
+            .limit(PURGE_BATCH_SIZE)
+            .scalar_subquery()
+        )
+        db.execute(delete(Event).filter(Event.event_id.in_(finished)))
+        db.commit()
+
+    def counts(self) -> dict:
+        Event = models.OutboxEvent
+        with SessionLocal() as db:
+            return dict(db.execute(select(Event.status, func.count()).group_by(Event.status)).all())
+
+
+class MemoryJobBackend:
+    """
+    Jobs held in this process: published when the enqueuing transaction commits, dropped if it rolls
+    back, lost if the process stops. A stand-in for a broker in local runs.
+    """
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._due = []
+        self._ids = itertools.count(1)
+        self.dead = 0
+
+    def enqueue(self, db: Session, topic: str, payload: dict):
+        db.info.setdefault(_PENDING_JOBS, []).append((topic, payload))
+
+    def publish(self, jobs):
+        with self._lock:
+            for topic, payload in jobs:
+                heapq.heappush(self._due, (time.monotonic(), next(self._ids), Job(0, topic, payload, 0)))
+
+    def claim(self, limit: int) -> List[Job]:
+        now = time.monotonic()
+        claimed = []
+        with self._lock:
+            while self._due and len(claimed) < limit and self._due[0][0] <= now:
+                _, job_id, job = heapq.heappop(self._due)
+                claimed.append(Job(job_id, job.topic, job.payload, job.attempts + 1))
+        return claimed
+
+    def succeed(self, job: Job):
+        pass
+
+    def fail(self, job: Job, error: str, retry_in: Optional[float]):
+        with self._lock:
+            if retry_in is None:
+                self.dead += 1
+            else:
+                heapq.heappush(self._due, (time.monotonic() + retry_in, job.job_id, job))
+
+    def counts(self) -> dict:
+        with self._lock:
+            return {"pending": len(self._due), "dead": self.dead}
+
+
+def create_job_backend():
+    if settings.JOB_BACKEND == "database":
+        return DatabaseJobBackend()
+    if settings.JOB_BACKEND == "memory":
+        return MemoryJobBackend()
+    raise ValueError(f"JOB_BACKEND must be 'database' or 'memory', not {settings.JOB_BACKEND!r}")
+
+
+class JobQueue:
+    """
+    Enqueues jobs inside the caller's transaction and, once started (from the app's lifespan), runs
+    due jobs on a pool of `concurrency` threads. A failed job is retried after retry_delay() until
+    JOB_MAX_ATTEMPTS, then marked dead.
+    """
+
+    def __init__(self, backend, concurrency: int, poll_interval: float):
+        self.backend = backend
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = set()
+        self._stopping = False
+        self._lock = threading.Lock()
+        self.succeeded = 0
+        self.failed = 0
+        self.dead = 0
+
+    def enqueue(self, db: Session, topic: str, payload: dict):
+        """
+        Adds a job to `db`'s transaction: it runs only if, and once, that transaction commits.
+        """
+        if not db.in_transaction():
+            # A session that has not begun does not report its rollback, which must drop the job.
+            db.begin()
+        self.backend.enqueue(db, topic, payload)
+        db.info[_ENQUEUED] = True
+
+    def _committed(self, session: Session):
+        jobs = session.info.pop(_PENDING_JOBS, None)
+        if jobs:
+            self.backend.publish(jobs)
+        if session.info.pop(_ENQUEUED, False):
+            self.notify()
+
+    def _rolled_back(self, session: Session):
+        session.info.pop(_PENDING_JOBS, None)
+        session.info.pop(_ENQUEUED, None)
+
+    def notify(self):
+        # Wakes an idle worker of this process; callable from any thread.
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="jobs")
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float):
+        """
+        Stops claiming jobs and waits up to `timeout` seconds for running ones. Unfinished database
+        jobs run again once their lease expires.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        if self._running:
+            await asyncio.wait(set(self._running), timeout=timeout)
+        self._executor.shutdown(wait=False)
+        self._task = self._executor = self._loop = None
+
+    async def _run(self):
+        while not self._stopping:
+            self._wakeup.clear()
+            free = self.concurrency - len(self._running)
+            if free <= 0:
+                await asyncio.wait(set(self._running), return_when=asyncio.FIRST_COMPLETED)
+                continue
+            try:
+                jobs = await self._loop.run_in_executor(self._executor, self.backend.claim, free)
+            except Exception:
+                logger.exception("Claiming jobs failed")
+                jobs = []
+            for job in jobs:
+                task = self._loop.run_in_executor(self._executor, self._execute, job)
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+            if len(jobs) < free:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _execute(self, job: Job):
+        handler = _handlers.get(job.topic)
+        try:
+            if handler is None:
+                raise LookupError(f"no handler for topic {job.topic!r}")
+            handler(job.payload)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            retry_in = retry_delay(job.attempts) if job.attempts < settings.JOB_MAX_ATTEMPTS else None
+            with self._lock:
+                self.failed += 1
+                self.dead += retry_in is None
+            if retry_in is None:
+                logger.error("Job %s (%s) failed for good after %d attempts: %s", job.job_id, job.topic, job.attempts, error)
+            else:
+                logger.warning("Job %s (%s) failed (attempt %d), retrying in %.1fs: %s", job.job_id, job.topic, job.attempts, retry_in, error)
+            try:
+                self.backend.fail(job, error[:2000], retry_in)
+            except Exception:
+                logger.exception("Recording the failure of job %s failed", job.job_id)
+            return
+        with self._lock:
+            self.succeeded += 1
+        try:
+            self.backend.succeed(job)
+        except Exception:
+            # The job ran; once its lease expires it runs again, which handlers must tolerate.
+            logger.exception("Recording the success of job %s failed", job.job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {"succeeded": self.succeeded, "failed_attempts": self.failed, "dead": self.dead}
+        return {
+            "backend": self.backend.name,
+            "worker_running": self.started,
+            "concurrency": self.concurrency,
+            "running": len(self._running),
+            "handlers": sorted(_handlers),
+            "this_process": counters,
+            "jobs": self.backend.counts(),
+        }
+
+
+job_queue = JobQueue(create_job_backend(), settings.JOB_CONCURRENCY, settings.JOB_POLL_INTERVAL_SECONDS)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    if _ENQUEUED in session.info:
+        job_queue._committed(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    if _ENQUEUED in session.info:
+        job_queue._rolled_back(session)
+
+
+def enqueue(db: Session, topic: str, payload: dict):
+    job_queue.enqueue(db, topic, payload)
@@ -0,0 +1,91 @@
+# backend/app/core/pagination.py
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import literal, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _json_default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encodes the key values of the last row of a page into an opaque cursor.
+    """
+    raw = json.dumps(list(values), default=_json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _coerce(column, value: Any):
+    python_type = column.type.python_type
+    if isinstance(value, (list, dict)):
+        # encode_cursor only writes scalars; str() would turn these into some other, valid-looking key.
+        raise TypeError("cursor values are scalars")
+    if value is None or isinstance(value, python_type):
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    coerced = python_type(value)
+    if isinstance(coerced, Decimal) and not coerced.is_finite():
+        raise ValueError("cursor values are finite")
+    return coerced
+
+
+def decode_cursor(cursor: str, *columns) -> List[Any]:
+    """
+    Decodes a cursor produced by encode_cursor back into values typed like `columns`.
+    Raises HTTPException(400) if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return [_coerce(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError, ArithmeticError, binascii.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+
+def keyset_after(columns: Sequence, values: Sequence[Any], descending: bool = False):
+    """
+    Builds the WHERE clause selecting rows strictly after `values` in the (columns) ordering.
+    All columns are expected to be ordered in the same direction.
+    """
+    if len(columns) == 1:
+        return columns[0] < values[0] if descending else columns[0] > values[0]
+    left = tuple_(*columns)
+    right = tuple_(*[literal(value, type_=column.type) for column, value in zip(columns, values)])
+    return left < right if descending else left > right
+
+
+def next_cursor(rows: Sequence[Any], limit: int, *attrs: str) -> Optional[str]:
+    """
+    Returns the cursor for the page following `rows`, or None if this was the last page.
+    """
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor([getattr(last, attr) for attr in attrs])
+
+
+def set_next_cursor(response: Response, rows: Sequence[Any], limit: int, *attrs: str) -> None:
+    """
+    Exposes the next page cursor on the response, if there is a next page.
+    """
+    cursor = next_cursor(rows, limit, *attrs)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
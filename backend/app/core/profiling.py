@@ -0,0 +1,225 @@
+# backend/app/core/profiling.py
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+slow_query_logger = logging.getLogger("app.database.slow_queries")
+
+# Label used for requests that matched no route, so unknown paths cannot grow the metrics without bound.
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestProfile:
+    """
+    What one request spent its time on. Set for the whole request (threadpool work and streamed bodies
+    included) by ProfilingMiddleware; the SQL events and the serializers add to it.
+    """
+    __slots__ = ("scope", "db_seconds", "statements", "serialization_seconds")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.db_seconds = 0.0
+        self.statements = 0
+        self.serialization_seconds = 0.0
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def add_serialization_time(seconds: float):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.serialization_seconds += seconds
+
+
+def route_template(scope) -> str:
+    """
+    The path template of the route a request matched, e.g. "/api/v1/orders/{order_id}".
+    Routes of included routers may only know their path relative to the router's prefix, so the
+    prefix is taken from the request path: everything before the segments the route's own path covers.
+    """
+    path = getattr(scope.get("route"), "path", None)
+    if path is None:
+        return UNMATCHED_ROUTE
+    return scope["path"].rsplit("/", path.count("/"))[0] + path
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)
+        self.sum = 0.0
+
+
+class RouteMetrics:
+    """
+    Per (method, route, status) request counts, latency and statement-count histograms, and DB and
+    serialization time totals, for this worker process.
+    """
+    DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str, str], list] = {}
+        self.slow_queries = 0
+
+    @staticmethod
+    def _bucket(buckets, value) -> int:
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                return index
+        return len(buckets)
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float, profile: RequestProfile):
+        duration_bucket = self._bucket(self.DURATION_BUCKETS, seconds)
+        statement_bucket = self._bucket(self.STATEMENT_BUCKETS, profile.statements)
+        key = (method, route, str(status_code))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [
+                    _Histogram(len(self.DURATION_BUCKETS)), _Histogram(len(self.STATEMENT_BUCKETS)), [0.0], [0.0],
+                ]
+            duration, statements, db_seconds, serialization_seconds = series
+            duration.counts[duration_bucket] += 1
+            duration.sum += seconds
+            statements.counts[statement_bucket] += 1
+            statements.sum += profile.statements
+            db_seconds[0] += profile.db_seconds
+            serialization_seconds[0] += profile.serialization_seconds
+
+    def increment_slow_queries(self):
+        with self._lock:
+            self.slow_queries += 1
+
+    def prometheus(self) -> str:
+        """
+        The metrics in the Prometheus text exposition format (version 0.0.4).
+        """
+        with self._lock:
+            series = {key: (
+                (list(duration.counts), duration.sum), (list(statements.counts), statements.sum), db[0], serialization[0]
+            ) for key, (duration, statements, db, serialization) in self._series.items()}
+            slow_queries = self.slow_queries
+
+        lines = []
+
+        def histogram(name: str, help_text: str, buckets, index: int):
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} histogram"])
+            for key in sorted(series):
+                counts, total = series[key][index]
+                labels = _labels(key)
+                cumulative = 0
+                for bound, count in zip(buckets, counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                cumulative += counts[-1]
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {total}")
+                lines.append(f"{name}_count{{{labels}}} {cumulative}")
+
+        def counter(name: str, help_text: str, index: int):
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} counter"])
+            for key in sorted(series):
+                lines.append(f"{name}{{{_labels(key)}}} {series[key][index]}")
+
+        histogram("http_request_duration_seconds", "Time from receiving a request to sending the last of its response.", self.DURATION_BUCKETS, 0)
+        histogram("http_request_db_statements", "SQL statements executed per request.", self.STATEMENT_BUCKETS, 1)
+        counter("http_request_db_seconds_total", "Time spent executing SQL statements, by route.", 2)
+        counter("http_request_serialization_seconds_total", "Time spent serializing response bodies, by route.", 3)
+        lines.extend([
+            "# HELP db_slow_queries_total SQL statements slower than SLOW_QUERY_THRESHOLD_MS.",
+            "# TYPE db_slow_queries_total counter",
+            f"db_slow_queries_total {slow_queries}",
+        ])
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: Tuple[str, str, str]) -> str:
+    method, route, status_code = key
+    return f'method="{_escape(method)}",route="{_escape(route)}",status="{status_code}"'
+
+
+route_metrics = RouteMetrics()
+
+
+def attach_query_profiler(engine):
+    """
+    Times every statement `engine` (a sync Engine, or an AsyncEngine's sync_engine) executes, adds it
+    to the current request's profile and logs statements slower than SLOW_QUERY_THRESHOLD_MS.
+    """
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000 if settings.SLOW_QUERY_THRESHOLD_MS >= 0 else None
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info.pop("query_started_at", time.perf_counter())
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.db_seconds += elapsed
+            profile.statements += 1
+        if threshold is not None and elapsed >= threshold:
+            route_metrics.increment_slow_queries()
+            where = f"{profile.scope['method']} {route_template(profile.scope)}" if profile is not None else "outside a request"
+            slow_query_logger.warning("Slow query (%.1f ms, %s): %s", elapsed * 1000, where, statement[:2000])
+
+
+def _server_timing(profile: RequestProfile, seconds: float) -> bytes:
+    return (
+        f'db;desc="{profile.statements} statements";dur={profile.db_seconds * 1000:.2f}, '
+        f"serialize;dur={profile.serialization_seconds * 1000:.2f}, "
+        f"total;dur={seconds * 1000:.2f}"
+    ).encode()
+
+
+class ProfilingMiddleware:
+    """
+    Records each HTTP request's latency, SQL time and statement count and serialization time in
+    route_metrics, by route template. With SERVER_TIMING_HEADER, also reports the request's own
+    figures (up to the start of the response) in a Server-Timing header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.server_timing = settings.SERVER_TIMING_HEADER
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        profile = RequestProfile(scope)
+        status_code = 500
+
+        async def send_profiled(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(profile, time.perf_counter() - started)))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_profiled)
+        finally:
+            _current_profile.reset(token)
+            route_metrics.observe(scope["method"], route_template(scope), status_code, time.perf_counter() - started, profile)
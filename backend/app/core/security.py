@@ -1,39 +1,75 @@
 # backend/app/core/security.py
+import hashlib
+import logging
+import threading
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Dict, Optional, Set, Tuple
 
-from passlib.context import CryptContext
 from jose import JWTError, jwt
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from app.core.cache import ExpiringLRUCache
 from app.core.config import settings 
+from app.core.hashing import PasswordHasher
+from app.database.models import RevokedToken, User
+from app.database.session import SessionLocal
+
+logger = logging.getLogger("app.auth")
+
 
+def _crypt_context():
+    # passlib and its bcrypt backend are imported only when the password hasher starts.
+    from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return CryptContext(
+        schemes=settings.PASSWORD_HASH_SCHEMES.split(","),
+        deprecated="auto",
+        bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    )
+
+password_hasher = PasswordHasher(_crypt_context, workers=settings.PASSWORD_HASH_WORKERS, max_pending=settings.PASSWORD_HASH_MAX_PENDING)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    Verifies a plain password against a hashed password.
+    Verifies a plain password against a hashed password, on the password hashing pool.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """
-    Hashes a plain password.
+    Hashes a plain password, on the password hashing pool.
+    """
+    return password_hasher.hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Async variant of verify_password; the event loop stays free while bcrypt runs.
+    """
+    return await password_hasher.verify_async(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Async variant of get_password_hash.
     """
-    return pwd_context.hash(password)
+    return await password_hasher.hash_async(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
-    Creates a JWT access token.
+    Creates a JWT access token. Each token gets a unique `jti`, by which it can be revoked, and an `iat`
+    with fractions of a second, by which revoke_user_tokens() tells earlier tokens from later ones.
     """
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -48,25 +84,169 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
-from app.database.session import get_db 
-from app.database.models import User
-from sqlalchemy.orm import Session
-from app.schemas.user import User as UserSchema 
+# Verified tokens, keyed by token digest, each kept until the token's own exp (see get_current_user in
+# app/api/deps.py). Revocations are checked separately, against `revocations`.
+token_cache = ExpiringLRUCache(settings.TOKEN_CACHE_MAX_ENTRIES)
+
+_USER_PREFIX = "user:"
+
 
-def authenticate_user(username: str, password: str) -> Optional[UserSchema]:
+class RevocationSet:
     """
-    Authenticates a user by username/email and password.
+    The revoked_tokens rows still in force, held in this process so that checking a token costs no
+    query: revoked jtis, and per user the time before which every token they were issued is revoked.
+    Reloaded once older than `ttl` seconds; revocations made in this process apply here at once.
     """
-    db: Session = next(get_db()) 
 
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._jtis: Set[str] = set()
+        self._users: Dict[int, float] = {}
+        # Revocations made here while a reload runs, which its rows may predate.
+        self._added_jtis: Set[str] = set()
+        self._added_users: Dict[int, float] = {}
+        self._loaded_at: Optional[float] = None
+
+    @property
+    def stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl
+
+    def refresh(self):
+        """
+        Reloads the set from the database; blocking, so call it from a threadpool thread. One reload
+        runs at a time while the others keep using the current set. If a reload fails the current set
+        is kept until the next attempt, `ttl` later; a failed first load raises.
+        """
+        if not self._refreshing.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if not self.stale:
+                return
+            with self._lock:
+                self._added_jtis, self._added_users = set(), {}
+            try:
+                jtis, users = self._load()
+            except Exception:
+                if self._loaded_at is None:
+                    raise
+                logger.exception("Reloading the revoked tokens failed, keeping the last known ones")
+                self._loaded_at = time.monotonic()
+                return
+            with self._lock:
+                self._jtis = jtis | self._added_jtis
+                self._users = {**users, **self._added_users}
+                self._loaded_at = time.monotonic()
+        finally:
+            self._refreshing.release()
+
+    def _load(self) -> Tuple[Set[str], Dict[int, float]]:
+        now = datetime.now(timezone.utc)
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(RevokedToken.jti, RevokedToken.user_id, RevokedToken.issued_before).filter(RevokedToken.expires_at > now)
+            ).all()
+        jtis = {jti for jti, user_id, _ in rows if user_id is None}
+        users = {user_id: issued_before for _, user_id, issued_before in rows if user_id is not None}
+        return jtis, users
+
+    def add(self, jti: str):
+        with self._lock:
+            self._jtis.add(jti)
+            self._added_jtis.add(jti)
+
+    def add_user(self, user_id: int, issued_before: float):
+        with self._lock:
+            self._users[user_id] = self._added_users[user_id] = max(issued_before, self._users.get(user_id, 0.0))
+
+    def is_revoked(self, jti: str, user_id: int, issued_at: float) -> bool:
+        return jti in self._jtis or issued_at < self._users.get(user_id, float("-inf"))
+
+
+revocations = RevocationSet(settings.TOKEN_REVOCATION_REFRESH_SECONDS)
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+def token_id(claims: dict, digest: bytes) -> str:
+    # Tokens issued before jti was added are revoked by digest.
+    return claims.get("jti") or digest.hex()
+
+def _purge_revocations(db: Session, now: datetime):
+    # Revocations of tokens that have expired since are no longer needed.
+    db.execute(delete(RevokedToken).filter(RevokedToken.expires_at < now))
+
+def revoke_access_token(db: Session, token: str) -> bool:
+    """
+    Revokes a valid token until it expires. Returns False if the token is not valid.
+    """
+    claims = decode_access_token(token)
+    if claims is None or "exp" not in claims:
+        return False
+    digest = token_digest(token)
+    jti = token_id(claims, digest)
+    _purge_revocations(db, datetime.now(timezone.utc))
+    db.merge(RevokedToken(jti=jti, expires_at=datetime.fromtimestamp(claims["exp"], timezone.utc)))
+    db.commit()
+    revocations.add(jti)
+    token_cache.delete(digest)
+    return True
+
+def revoke_user_tokens(db: Session, user_id: int):
+    """
+    Revokes every token issued to the user so far, e.g. because their role changed: the role claim
+    of those tokens is out of date. Commits `db`, with whatever else it holds.
+    """
+    issued_before = time.time()
+    now = datetime.now(timezone.utc)
+    _purge_revocations(db, now)
+    db.merge(RevokedToken(
+        jti=f"{_USER_PREFIX}{user_id}", user_id=user_id, issued_before=issued_before,
+        # By then every token issued before now has expired.
+        expires_at=now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    ))
+    db.commit()
+    revocations.add_user(user_id, issued_before)
+
+
+from app.schemas.user import User as UserSchema 
+
+def _get_login_user(db: Session, username: str) -> Optional[Tuple[UserSchema, str]]:
     user_in_db = db.query(User).filter(
         (User.username == username) | (User.email == username)
     ).first()
+    login_user = (UserSchema.model_validate(user_in_db), user_in_db.password_hash) if user_in_db else None
+    # End the read-only transaction, so the connection is back in the pool during the (slow) password check.
+    db.rollback()
+    return login_user
+
+def authenticate_user(db: Session, username: str, password: str) -> Optional[UserSchema]:
+    """
+    Authenticates a user by username/email and password.
+    """
+    login_user = _get_login_user(db, username)
+
+    if not login_user:
+        return None 
+
+    user, password_hash = login_user
+    if not verify_password(password, password_hash):
+        return None 
+
+    return user
+
+async def authenticate_user_async(db: Session, username: str, password: str) -> Optional[UserSchema]:
+    """
+    Async variant of authenticate_user: the lookup runs in the threadpool, the password check on the hashing pool.
+    """
+    login_user = await run_in_threadpool(_get_login_user, db, username)
 
-    if not user_in_db:
+    if not login_user:
         return None 
 
-    if not verify_password(password, user_in_db.password_hash):
+    user, password_hash = login_user
+    if not await verify_password_async(password, password_hash):
         return None 
 
-    return UserSchema.model_validate(user_in_db) 
+    return user
@@ -0,0 +1,42 @@
+# backend/app/core/streaming.py
+from typing import Iterator, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.serialization import TrustedSerializer
+from app.database.session import ReadSessionLocal
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+
+def iter_serialized(statement, schema: Type[BaseModel], format: str, batch_size: int = None) -> Iterator[bytes]:
+    """
+    Runs `statement` (an ORM select) on a server-side cursor and yields its rows serialized through
+    `schema` (see TrustedSerializer), as NDJSON lines or as one JSON array, `batch_size` rows per chunk.
+
+    The session only holds weak references to unmodified objects, so each batch is released once it
+    is written and memory does not grow with the result. Runs in its own session, open for as long as the iteration.
+    """
+    batch_size = batch_size or settings.STREAM_BATCH_SIZE
+    serializer = TrustedSerializer(schema)
+    separator = b"\n" if format == "ndjson" else b","
+    with ReadSessionLocal() as db:
+        result = db.execute(statement.execution_options(yield_per=batch_size)).scalars()
+        if format == "json":
+            yield b"["
+        first = True
+        for partition in result.partitions():
+            chunk = separator.join(serializer.dump(row) for row in partition)
+            if format == "ndjson":
+                yield chunk + b"\n"
+            else:
+                yield chunk if first else b"," + chunk
+            first = False
+        if format == "json":
+            yield b"]"
+
+
+def streaming_response(rows: Iterator[bytes], format: str) -> StreamingResponse:
+    return StreamingResponse(rows, media_type=MEDIA_TYPES[format])
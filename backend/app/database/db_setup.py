@@ -1,10 +1,13 @@
 # backend/app/database/db_setup.py
-from app.database.session import engine, Base
+from app.database.session import Base, get_engine
 from app.database import models 
+from app.database.migrations import run_migrations
 
 def create_db_and_tables():
     print("Creating database tables...")
+    engine = get_engine()
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
     print("Database tables created successfully!")
 
 if __name__ == "__main__":
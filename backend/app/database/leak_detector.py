@@ -0,0 +1,74 @@
+# backend/app/database/leak_detector.py
+import logging
+import traceback
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+
+from app.core.profiling import route_template
+
+logger = logging.getLogger("app.database.leaks")
+
+# Connections checked out during the current request, by connection record, with the stack that took them.
+_request_checkouts: ContextVar[Optional[Dict[object, str]]] = ContextVar("request_checkouts", default=None)
+
+leaked_connections = 0
+
+
+def _checkout_stack() -> str:
+    # The caller's frames, without SQLAlchemy's own pool and session internals.
+    frames = [frame for frame in traceback.extract_stack(limit=40)[:-2] if "sqlalchemy" not in frame.filename]
+    return "".join(traceback.format_list(frames[-15:]))
+
+
+def attach_leak_detector(engine):
+    """
+    Records which request checks out each connection of `engine` (a sync Engine) and when it is returned.
+    The request context follows the work into threadpool threads, so sync endpoints are covered too.
+    """
+
+    @event.listens_for(engine.pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checkouts = _request_checkouts.get()
+        if checkouts is not None:
+            checkouts[connection_record] = _checkout_stack()
+            connection_record.info["leak_detector_checkouts"] = checkouts
+
+    @event.listens_for(engine.pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        checkouts = connection_record.info.pop("leak_detector_checkouts", None)
+        if checkouts is not None:
+            checkouts.pop(connection_record, None)
+
+
+class ConnectionLeakMiddleware:
+    """
+    Logs every connection a request still holds once its response (and dependency teardown) is done,
+    with the route and the stack that checked it out. Meant for development: it captures a stack per checkout.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        checkouts: Dict[object, str] = {}
+        token = _request_checkouts.set(checkouts)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_checkouts.reset(token)
+            if checkouts:
+                _report(scope, checkouts)
+
+
+def _report(scope, checkouts: Dict[object, str]):
+    global leaked_connections
+    path = route_template(scope)
+    for stack in list(checkouts.values()):
+        leaked_connections += 1
+        logger.warning("Connection still checked out after %s %s; it was checked out at:\n%s", scope["method"], path, stack)
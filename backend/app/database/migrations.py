@@ -0,0 +1,117 @@
+# backend/app/database/migrations.py
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, DateTime, Index, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import func
+
+from app.database import models
+from app.database.session import Base
+from app.services.report import rebuild_rollups
+
+# Applied versions, kept apart from the models' metadata so create_all never touches it.
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", String(64), primary_key=True),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def _applies_to(index, connection: Connection) -> bool:
+    # Index.create() itself honours ddl_if(); checked here only to report what was really created.
+    ddl_if = index._ddl_if
+    return ddl_if is None or ddl_if.dialect is None or ddl_if.dialect == connection.dialect.name
+
+
+def create_missing_indexes(connection: Connection, *table_names: str) -> List[str]:
+    """
+    Creates the indexes declared on the models that an existing table does not have yet
+    (create_all only creates indexes together with their table). Indexes limited to other
+    dialects with ddl_if() are skipped. Returns the names of the created indexes.
+    """
+    existing_tables = set(inspect(connection).get_table_names())
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables or (table_names and table.name not in table_names):
+            continue
+        existing = {index["name"] for index in inspect(connection).get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name in existing or not _applies_to(index, connection):
+                continue
+            index.create(connection)
+            created.append(index.name)
+    return created
+
+
+def _lookup_indexes(connection: Connection):
+    # Foreign keys and order filters (orders.user_id/status/order_date, order_items.order_id/product_id)
+    # and the product listing indexes, on databases created before they were declared.
+    for name in create_missing_indexes(connection, "products", "orders", "order_items"):
+        print(f"  created index {name}")
+
+
+def _sales_rollups(connection: Connection):
+    # Daily reporting rollups, created for databases that predate them. They are filled from the existing
+    # orders by 0004: rebuild_rollups() also writes the monthly table, which does not exist before it.
+    models.DailyProductSales.__table__.create(connection, checkfirst=True)
+    models.DailyOrderSummary.__table__.create(connection, checkfirst=True)
+
+
+def _user_order_history_indexes(connection: Connection):
+    # The composite history indexes lead with user_id, which makes the single-column one redundant.
+    for name in create_missing_indexes(connection, "orders"):
+        print(f"  created index {name}")
+    if "ix_orders_user_id" in {index["name"] for index in inspect(connection).get_indexes("orders")}:
+        Index("ix_orders_user_id", models.Order.__table__.c.user_id).drop(connection)
+        print("  dropped index ix_orders_user_id")
+
+
+def _monthly_sales_rollups(connection: Connection):
+    # Product sales per month and units per day in the order summary, filled by rebuilding every rollup.
+    models.MonthlyProductSales.__table__.create(connection, checkfirst=True)
+    if "units" not in {column["name"] for column in inspect(connection).get_columns("daily_order_summary")}:
+        connection.execute(text("ALTER TABLE daily_order_summary ADD COLUMN units INTEGER NOT NULL DEFAULT 0"))
+    rebuild_rollups(connection)
+
+
+def _idempotency_claim_tokens(connection: Connection):
+    # Rows claimed before this have no token; their claims are taken over like any other once they expire.
+    if "claim_token" not in {column["name"] for column in inspect(connection).get_columns("idempotency_keys")}:
+        connection.execute(text("ALTER TABLE idempotency_keys ADD COLUMN claim_token VARCHAR(32)"))
+
+
+def _user_token_revocations(connection: Connection):
+    # Revocation of every token a user was issued before a point in time (role changes, deletions).
+    existing = {column["name"] for column in inspect(connection).get_columns("revoked_tokens")}
+    if "user_id" not in existing:
+        connection.execute(text("ALTER TABLE revoked_tokens ADD COLUMN user_id INTEGER"))
+    if "issued_before" not in existing:
+        connection.execute(text("ALTER TABLE revoked_tokens ADD COLUMN issued_before FLOAT"))
+
+
+# (version, migration) in the order they are applied. Append only; never rename a version.
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("0001_lookup_indexes", _lookup_indexes),
+    ("0002_sales_rollups", _sales_rollups),
+    ("0003_user_order_history_indexes", _user_order_history_indexes),
+    ("0004_monthly_sales_rollups", _monthly_sales_rollups),
+    ("0005_idempotency_claim_tokens", _idempotency_claim_tokens),
+    ("0006_user_token_revocations", _user_token_revocations),
+]
+
+
+def run_migrations(engine: Engine):
+    """
+    Applies the migrations that have not run against this database yet, each in its own transaction.
+    """
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.connect() as connection:
+        applied = set(connection.execute(select(schema_migrations.c.version)).scalars())
+    for version, migration in MIGRATIONS:
+        if version in applied:
+            continue
+        print(f"Applying migration {version}...")
+        with engine.begin() as connection:
+            migration(connection)
+            connection.execute(schema_migrations.insert().values(version=version))
@@ -1,9 +1,32 @@
 # backend/app/database/models.py
-from sqlalchemy import Column, Integer, String, Text, DECIMAL, DateTime, ForeignKey, Enum
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, Text, DECIMAL, Date, DateTime, Float, ForeignKey, Enum, Index, JSON, LargeBinary, DDL, event
+from sqlalchemy.sql import func, literal_column
+from sqlalchemy.dialects import postgresql, sqlite  # postgresql registers the typed full-text functions (to_tsvector, ...)
 from sqlalchemy.orm import relationship
 from .session import Base 
 
+# Full-text search document for products on PostgreSQL. Constants are rendered inline
+# (not as bound parameters) so queries match the expression index below exactly.
+SEARCH_CONFIG = "english"
+
+def product_search_document(name, description):
+    return func.to_tsvector(
+        literal_column(f"'{SEARCH_CONFIG}'::regconfig"),
+        func.coalesce(name, literal_column("''")).op("||")(literal_column("' '")).op("||")(func.coalesce(description, literal_column("''")))
+    )
+
+# SQLite keeps timestamps as text, and its CURRENT_TIMESTAMP has no fractional seconds. Bind values
+# (e.g. from a pagination cursor) in the same format so they compare correctly with server defaults.
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"), "sqlite"
+)
+
+# Shared by orders and the sales rollups keyed by order status.
+OrderStatus = Enum('pending', 'processing', 'shipped', 'delivered', 'cancelled', name='order_status_enum')
+
+# Trigram matching (typo tolerance) needs the pg_trgm extension.
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+
 class Category(Base):
     __tablename__ = "categories"
 
@@ -22,12 +45,24 @@ class Product(Base):
     stock_quantity = Column(Integer, nullable=False, default=0)
     image_url = Column(String(255), nullable=True)
     category_id = Column(Integer, ForeignKey("categories.category_id", ondelete="RESTRICT", onupdate="CASCADE"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, server_default=func.now(), onupdate=func.now())
 
     category = relationship("Category", back_populates="products")
     order_items = relationship("OrderItem", back_populates="product")
 
+    __table_args__ = (
+        # Listing: each supported sort, alone or under a category filter, with product_id as tiebreaker.
+        Index("ix_products_price", price, product_id),
+        Index("ix_products_created_at", created_at, product_id),
+        Index("ix_products_name", name, product_id),
+        Index("ix_products_category_price", category_id, price, product_id),
+        Index("ix_products_category_created_at", category_id, created_at, product_id),
+        Index("ix_products_category_name", category_id, name, product_id),
+        Index("ix_products_search_document", product_search_document(name, description), postgresql_using="gin").ddl_if(dialect="postgresql"),
+        Index("ix_products_name_trgm", name, postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+    )
+
 
 class User(Base):
     __tablename__ = "users"
@@ -56,9 +91,9 @@ class Order(Base):
 
     order_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
-    order_date = Column(DateTime(timezone=True), server_default=func.now())
+    order_date = Column(Timestamp, server_default=func.now(), index=True)
     total_amount = Column(DECIMAL(10, 2), nullable=False)
-    status = Column(Enum('pending', 'processing', 'shipped', 'delivered', 'cancelled', name='order_status_enum'), nullable=False, default='pending') # Define enum type
+    status = Column(OrderStatus, nullable=False, default='pending', index=True)
     shipping_address = Column(String(255), nullable=True)
     shipping_city = Column(String(255), nullable=True)
     shipping_state = Column(String(255), nullable=True)
@@ -66,17 +101,116 @@ class Order(Base):
     shipping_country = Column(String(255), nullable=True)
 
     user = relationship("User", back_populates="orders")
-    order_items = relationship("OrderItem", back_populates="order")
+    order_items = relationship("OrderItem", back_populates="order", passive_deletes=True)
+
+    __table_args__ = (
+        # A user's order history, newest first, optionally for one status; also serves the user_id foreign key.
+        Index("ix_orders_user_date", user_id, order_date, order_id),
+        Index("ix_orders_user_status_date", user_id, status, order_date, order_id),
+    )
 
 
 class OrderItem(Base):
     __tablename__ = "order_items"
 
     order_item_id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.order_id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
-    product_id = Column(Integer, ForeignKey("products.product_id", ondelete="RESTRICT", onupdate="CASCADE"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.order_id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.product_id", ondelete="RESTRICT", onupdate="CASCADE"), nullable=False, index=True)
     quantity = Column(Integer, nullable=False)
     price_at_purchase = Column(DECIMAL(10, 2), nullable=False)
 
     order = relationship("Order", back_populates="order_items")
-    product = relationship("Product", back_populates="order_items")
\ No newline at end of file
+    product = relationship("Product", back_populates="order_items")
+
+
+# Reporting rollups, maintained in the same transaction as the orders they summarize (services/report.py).
+# Days are UTC calendar days of orders.order_date. None has foreign keys: they are derived data and must
+# not keep a product from being deleted once its orders are gone.
+class DailyProductSales(Base):
+    __tablename__ = "daily_product_sales"
+
+    sales_date = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    status = Column(OrderStatus, primary_key=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+
+class DailyOrderSummary(Base):
+    __tablename__ = "daily_order_summary"
+
+    sales_date = Column(Date, primary_key=True)
+    status = Column(OrderStatus, primary_key=True)
+    # order_id modulo REPORT_SUMMARY_SHARDS: spreads one day's orders over several rows so concurrent
+    # checkouts do not all queue on a single row lock. Reports sum over the shards.
+    shard = Column(Integer, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+    # Items sold, so daily revenue reports need not read daily_product_sales.
+    units = Column(Integer, nullable=False, default=0)
+
+
+# daily_product_sales summed per calendar month (sales_month is its first day): a report over a long
+# period reads whole months from here and only the days at either end from the daily rows.
+class MonthlyProductSales(Base):
+    __tablename__ = "monthly_product_sales"
+
+    sales_month = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    status = Column(OrderStatus, primary_key=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+
+# Responses of requests sent with an Idempotency-Key header, replayed when the request is retried (services/idempotency.py).
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(255), primary_key=True)
+    # sha256 of the request the key was first used with; reusing a key for a different request is an error.
+    fingerprint = Column(String(64), nullable=False)
+    # Random per claim: only the request holding the current claim may store its response or release the key.
+    claim_token = Column(String(32), nullable=True)
+    # Both None while the request is still being processed.
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    # Until then a completed response is replayed, or an unfinished claim blocks retries; afterwards the row may be taken over or purged.
+    expires_at = Column(Timestamp, nullable=False, index=True)
+
+
+# Access tokens revoked before their exp (POST /auth/logout), and users whose earlier tokens all are (a role
+# change, a deletion). Each worker process holds the rows in memory and reloads them every few seconds
+# (see RevocationSet in core/security.py); rows are purged once the tokens they cover have expired anyway.
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    # The token's jti, or "user:<user_id>" for a user's tokens.
+    jti = Column(String(64), primary_key=True)
+    expires_at = Column(Timestamp, nullable=False, index=True)
+    # For a user's row: their tokens with an iat (epoch seconds, fractional) before issued_before are revoked.
+    user_id = Column(Integer, nullable=True)
+    issued_before = Column(Float, nullable=True)
+
+
+# Background jobs (app/core/jobs.py): each row is written in the same transaction as the change that
+# causes it, so the job exists exactly when that change committed. Workers claim due rows and run them.
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+
+    event_id = Column(Integer, primary_key=True, index=True)
+    topic = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    # pending -> done, or dead after JOB_MAX_ATTEMPTS failures.
+    status = Column(Enum('pending', 'done', 'dead', name='outbox_status_enum'), nullable=False, default='pending')
+    # Claims so far; each claim increments it, which is also what lets only one worker win a claim.
+    attempts = Column(Integer, nullable=False, default=0)
+    # When the job is next due: now for a new job, the retry time after a failure, the end of the lease while claimed.
+    available_at = Column(Timestamp, nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    created_at = Column(Timestamp, server_default=func.now())
+    processed_at = Column(Timestamp, nullable=True)
+
+    __table_args__ = (
+        # Due pending jobs, oldest first; also finds finished jobs to purge.
+        Index("ix_outbox_events_status_available", status, available_at),
+    )
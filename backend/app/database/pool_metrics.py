@@ -0,0 +1,121 @@
+# backend/app/database/pool_metrics.py
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """
+    Counters and a checkout wait-time histogram for one connection pool.
+    """
+    WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.connections_invalidated = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.wait_buckets = [0] * (len(self.WAIT_BUCKETS_MS) + 1)
+        self.wait_sum_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    def observe_wait(self, wait_ms: float):
+        with self._lock:
+            for index, bound in enumerate(self.WAIT_BUCKETS_MS):
+                if wait_ms <= bound:
+                    break
+            else:
+                index = len(self.WAIT_BUCKETS_MS)
+            self.wait_buckets[index] += 1
+            self.wait_sum_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(self.WAIT_BUCKETS_MS, self.wait_buckets):
+                cumulative += count
+                buckets[f"le_{bound}"] = cumulative
+            buckets["le_inf"] = cumulative + self.wait_buckets[-1]
+            return {
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                "size": pool.size() if isinstance(pool, QueuePool) else None,
+                "checked_out": pool.checkedout() if isinstance(pool, QueuePool) else None,
+                "overflow": pool.overflow() if isinstance(pool, QueuePool) else None,
+                "connections_opened": self.connections_opened,
+                "connections_invalidated": self.connections_invalidated,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "wait_ms": {
+                    "count": buckets["le_inf"],
+                    "sum": round(self.wait_sum_ms, 3),
+                    "max": round(self.wait_max_ms, 3),
+                    "buckets": buckets,
+                },
+            }
+
+
+class _TimedCheckoutMixin:
+    """
+    Times how long each checkout waits for a free connection (including opening a new one)
+    and counts checkouts that fail, e.g. with a pool TimeoutError.
+    """
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.metrics.increment("checkout_failures")
+            raise
+        self.metrics.observe_wait((time.perf_counter() - start) * 1000)
+        return connection
+
+
+def instrumented_pool_class(metrics: PoolMetrics, async_: bool = False):
+    """
+    Returns a QueuePool subclass reporting into `metrics`. The metrics live on the class,
+    so they survive pool.recreate() (e.g. after engine.dispose()).
+    """
+    base = AsyncAdaptedQueuePool if async_ else QueuePool
+    return type(f"Instrumented{base.__name__}", (_TimedCheckoutMixin, base), {"metrics": metrics})
+
+
+def attach_pool_listeners(engine, metrics: PoolMetrics):
+    """
+    Feeds `metrics` from the pool events of `engine` (a sync Engine).
+    """
+    metrics.pool = engine.pool
+
+    @event.listens_for(engine, "engine_disposed")
+    def _on_dispose(engine_):
+        metrics.pool = engine_.pool
+
+    @event.listens_for(engine.pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.increment("connections_opened")
+
+    @event.listens_for(engine.pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.increment("checkouts")
+
+    @event.listens_for(engine.pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.increment("connections_invalidated")
+
+
+pool_metrics = {
+    "primary": PoolMetrics("primary"),
+    "async": PoolMetrics("async"),
+}
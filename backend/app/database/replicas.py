@@ -0,0 +1,113 @@
+# backend/app/database/replicas.py
+import itertools
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger("app.database.replicas")
+
+POLICIES = ("round_robin", "least_connections")
+
+
+class Replica:
+    """
+    One read replica: its engine (a sync Engine, or an AsyncEngine's sync_engine), whether it is
+    currently skipped after a failure, and how many sessions read from it.
+    """
+
+    def __init__(self, name: str, engine):
+        self.name = name
+        self.engine = engine
+        self.retry_at = 0.0
+        self.failures = 0
+        self.sessions = 0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.retry_at
+
+    def checked_out(self) -> int:
+        pool = self.engine.pool
+        return pool.checkedout() if isinstance(pool, QueuePool) else 0
+
+
+class ReplicaSet:
+    """
+    The read replicas of one engine kind (sync or async) and the policy that spreads sessions over
+    them. A replica that fails to connect, or loses a connection, is skipped for `retry_seconds`;
+    after that the next session tries it again.
+    """
+
+    def __init__(self, replicas: List[Replica], policy: str, retry_seconds: float):
+        if policy not in POLICIES:
+            raise ValueError(f"DATABASE_REPLICA_POLICY must be one of {', '.join(POLICIES)}, not {policy!r}")
+        self.replicas = replicas
+        self.policy = policy
+        self.retry_seconds = retry_seconds
+        self._lock = threading.Lock()
+        self._next = itertools.count()
+        self.primary_fallbacks = 0
+        for replica in replicas:
+            self._watch(replica)
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def _watch(self, replica: Replica):
+        @event.listens_for(replica.engine, "handle_error")
+        def _on_error(context):
+            # Lost or refused connections, not errors in the SQL itself.
+            if context.is_disconnect or context.connection is None:
+                self.mark_failed(replica, context.original_exception)
+
+    def candidates(self) -> List[Replica]:
+        """
+        The healthy replicas in the order a new session should try them.
+        """
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return []
+        start = next(self._next) % len(healthy)
+        ordered = healthy[start:] + healthy[:start]
+        if self.policy == "least_connections":
+            # Stable sort: replicas with equally few connections keep their round-robin order.
+            ordered.sort(key=Replica.checked_out)
+        return ordered
+
+    def mark_used(self, replica: Replica):
+        with self._lock:
+            replica.sessions += 1
+
+    def mark_failed(self, replica: Replica, exc: Optional[BaseException] = None):
+        with self._lock:
+            replica.failures += 1
+            replica.retry_at = time.monotonic() + self.retry_seconds
+        logger.warning("Read replica %s unavailable, skipped for %.0fs: %r", replica.name, self.retry_seconds, exc)
+
+    def mark_fallback(self):
+        with self._lock:
+            self.primary_fallbacks += 1
+
+    def dispose(self, close: bool = True):
+        for replica in self.replicas:
+            replica.engine.dispose(close=close)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "policy": self.policy,
+                "primary_fallbacks": self.primary_fallbacks,
+                "replicas": {
+                    replica.name: {
+                        "healthy": replica.healthy,
+                        "sessions": replica.sessions,
+                        "failures": replica.failures,
+                        "checked_out": replica.checked_out(),
+                    }
+                    for replica in self.replicas
+                },
+            }
@@ -0,0 +1,169 @@
+# backend/app/database/schema_audit.py
+"""
+Reports foreign keys and common filter columns of the live database that no index can serve.
+
+    python -m app.database.schema_audit            # index coverage
+    python -m app.database.schema_audit --explain  # also EXPLAIN the main read queries
+
+Exits with status 1 when anything is flagged.
+"""
+import argparse
+import sys
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.pagination import encode_cursor
+from app.database import models
+from app.database.session import get_engine
+from app.schemas.product import ProductFilter
+from app.services import order as order_services
+from app.services import order_item as order_item_services
+from app.services import product as product_services
+
+# Columns the services filter or sort on besides foreign keys, by table.
+FILTER_COLUMNS = {
+    "products": ["price", "created_at", "name"],
+    "orders": ["status", "order_date"],
+    "users": ["username", "email"],
+    "categories": ["name"],
+}
+
+
+def _leading_columns(connection, table_name: str):
+    """
+    The column lists of the primary key and every index (unique constraints included) of a table.
+    """
+    inspector = inspect(connection)
+    leading = [inspector.get_pk_constraint(table_name)["constrained_columns"]]
+    leading += [index["column_names"] for index in inspector.get_indexes(table_name)]
+    leading += [constraint["column_names"] for constraint in inspector.get_unique_constraints(table_name)]
+    return [columns for columns in leading if columns]
+
+
+def _is_indexed(columns, leading) -> bool:
+    # An index serves lookups on `columns` only if they are its leading columns.
+    return any(list(existing[:len(columns)]) == list(columns) for existing in leading)
+
+
+def audit_indexes(connection):
+    findings = []
+    inspector = inspect(connection)
+    for table_name in inspector.get_table_names():
+        leading = _leading_columns(connection, table_name)
+        for foreign_key in inspector.get_foreign_keys(table_name):
+            columns = foreign_key["constrained_columns"]
+            if not _is_indexed(columns, leading):
+                findings.append(f"{table_name}({', '.join(columns)}): foreign key to {foreign_key['referred_table']} has no index")
+        for column in FILTER_COLUMNS.get(table_name, []):
+            if not _is_indexed([column], leading):
+                findings.append(f"{table_name}({column}): filter column has no index")
+    return findings
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN " + compiler.process(element.statement, **kw)
+
+
+@compiles(Explain, "sqlite")
+def _compile_explain_sqlite(element, compiler, **kw):
+    return "EXPLAIN QUERY PLAN " + compiler.process(element.statement, **kw)
+
+
+# Sample cursor values, to explain the keyset (second page) form of each product sort.
+_SORT_CURSORS = {
+    "product_id": [1],
+    "price": [Decimal("10.00"), 1],
+    "created_at": [datetime(2024, 1, 1), 1],
+    "name": ["m", 1],
+}
+
+
+def query_shapes():
+    """
+    (label, statement, pk_ordered) for the read paths that must be index-backed. A pk_ordered
+    statement may walk the table in primary key order (SQLite reports that as a plain SCAN) and stop at LIMIT.
+    """
+    shapes = []
+    for sort in ProductFilter.model_fields["sort"].annotation.__args__:
+        for category_id in (None, 1):
+            filters = ProductFilter(sort=sort, category_id=category_id, in_stock=True)
+            cursor = encode_cursor(_SORT_CURSORS[sort.lstrip("-")])
+            label = f"products sort={sort}" + (" category_id" if category_id else "")
+            pk_ordered = sort == "product_id" and category_id is None
+            shapes.append((label, product_services._products_query(0, 20, None, filters), pk_ordered))
+            shapes.append((label + " (keyset)", product_services._products_query(0, 20, cursor, filters), pk_ordered))
+    shapes += [
+        ("products price range", product_services._products_query(0, 20, None, ProductFilter(sort="price", min_price=5, max_price=50)), False),
+        ("order items by order", order_item_services._order_items_by_order_query(1), False),
+        ("order items by product", select(models.OrderItem).filter(models.OrderItem.product_id == 1), False),
+        ("orders by user", order_services._user_orders_query(1, 20, None, None), False),
+        ("orders by user (keyset)", order_services._user_orders_query(1, 20, encode_cursor([datetime(2024, 1, 1), 1]), None), False),
+        ("orders by user and status", order_services._user_orders_query(1, 20, None, "shipped"), False),
+        ("orders by status", select(models.Order).filter(models.Order.status == "pending"), False),
+        ("orders page", order_services._orders_query(0, 20, None), True),
+    ]
+    return shapes
+
+
+def _full_scans(dialect_name: str, plan, pk_ordered: bool):
+    if dialect_name == "sqlite":
+        # EXPLAIN QUERY PLAN rows: (id, parent, notused, detail); "SCAN t" without an index reads the whole table.
+        if pk_ordered and not any("TEMP B-TREE" in row[-1] for row in plan):
+            return []
+        return [row[-1] for row in plan if row[-1].startswith("SCAN ") and "USING" not in row[-1]]
+    return [row[0].strip() for row in plan if "Seq Scan" in row[0]]
+
+
+def full_scans(connection, statement, pk_ordered: bool = False) -> List[str]:
+    """
+    The full table scans in the plan of `statement` (see query_shapes() for `pk_ordered`); none when
+    indexes serve it. Run inside a transaction: on PostgreSQL it turns sequential scans off for the rest of it.
+    """
+    if connection.dialect.name == "postgresql":
+        # Tables of a fresh database are tiny, where a sequential scan is always cheapest;
+        # this asks whether an index *can* serve the query.
+        connection.execute(text("SET LOCAL enable_seqscan = off"))
+    return _full_scans(connection.dialect.name, connection.execute(Explain(statement)).all(), pk_ordered)
+
+
+def audit_plans(connection):
+    findings = []
+    for label, statement, pk_ordered in query_shapes():
+        scans = full_scans(connection, statement, pk_ordered)
+        print(f"  {'FULL SCAN' if scans else 'ok':9} {label}" + (f": {'; '.join(scans)}" if scans else ""))
+        findings += [f"{label}: {scan}" for scan in scans]
+    return findings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--explain", action="store_true", help="also EXPLAIN the main read queries")
+    args = parser.parse_args(argv)
+
+    with get_engine().begin() as connection:
+        findings = audit_indexes(connection)
+        if args.explain:
+            print("Query plans:")
+            findings += audit_plans(connection)
+
+    for finding in findings:
+        print(f"MISSING INDEX {finding}")
+    print(f"{len(findings)} problem(s) found." if findings else "No missing indexes.")
+    return 1 if findings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,295 @@
 # backend/app/database/session.py
+import threading
+from typing import Callable, TypeVar
+
+from fastapi import Request
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core.profiling import attach_query_profiler
+from app.database.leak_detector import attach_leak_detector
+from app.database.pool_metrics import PoolMetrics, attach_pool_listeners, instrumented_pool_class, pool_metrics
+from app.database.replicas import Replica, ReplicaSet
 
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True 
-)
+def pool_options(url, metrics, async_: bool = False) -> dict:
+    """
+    Pool arguments for create_engine/create_async_engine. In-memory SQLite keeps
+    SQLAlchemy's single-connection pool, which takes no sizing options.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": instrumented_pool_class(metrics, async_=async_),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base() 
 
-def get_db():
-    db = SessionLocal()
+# Created by init_engines(): from the app's lifespan, or on first use by scripts and sessions.
+engine = None
+async_engine = None
+replicas = ReplicaSet([], "round_robin", 0)
+async_replica_engines = []
+async_replicas = ReplicaSet([], "round_robin", 0)
+_init_lock = threading.Lock()
+
+# Session.info keys: READ_ONLY sessions may read from a replica; WROTE and REPLICA (a Replica, or None for
+# the primary) record where the session's statements go from then on.
+READ_ONLY = "read_only"
+WROTE = "wrote"
+REPLICA = "replica"
+# The replicas a READ_ONLY session has yet to try, and whether it has connected to the one in info[REPLICA].
+_CANDIDATES = "replica_candidates"
+_CONNECTED = "replica_connected"
+
+# Request methods whose sessions read from the replicas (see get_db).
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+
+class RoutingSession(Session):
+    """
+    A Session that binds to the engines when it first needs a connection (creating them then if
+    nothing has yet, so importing the app opens no pools and loads no DB driver), and routes:
+
+    - sessions without info[READ_ONLY], writes (flushes, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE)
+      and everything after a write, to the primary; so a request reads its own writes;
+    - the reads of a READ_ONLY session to one replica, picked by DATABASE_REPLICA_POLICY among the
+      healthy ones. If none is healthy or none accepts a connection, the session reads from the
+      primary instead.
+
+    get_bind() only picks an engine; it never connects (it may be called where no I/O is allowed,
+    e.g. outside an AsyncSession's greenlet). The replica's connection is opened, and a refused one
+    replaced by the next candidate's, when the session first needs it (_connection_for_bind).
+    """
+
+    def _primary(self):
+        return get_engine()
+
+    def _replicas(self) -> ReplicaSet:
+        init_engines()
+        return replicas
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is not None or self.bind is not None:
+            return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        primary = self._primary()
+        if not self.info.get(READ_ONLY) or not self._replicas():
+            return primary
+        if self._flushing or self.info.get(WROTE) or _is_write(clause):
+            self.info[WROTE] = True
+            return primary
+        if REPLICA not in self.info:
+            self.info[_CANDIDATES] = self._replicas().candidates()
+            self._next_replica()
+        replica = self.info[REPLICA]
+        return replica.engine if replica is not None else primary
+
+    def _next_replica(self):
+        # The next untried candidate, or None (and the primary) once there is none.
+        candidates = self.info[_CANDIDATES]
+        self.info[REPLICA] = candidates.pop(0) if candidates else None
+        if self.info[REPLICA] is None:
+            self._replicas().mark_fallback()
+        return self.info[REPLICA]
+
+    def _connection_for_bind(self, engine, execution_options=None, **kw):
+        replica = self.info.get(REPLICA)
+        while replica is not None and engine is replica.engine and not self.info.get(_CONNECTED):
+            try:
+                connection = super()._connection_for_bind(engine, execution_options, **kw)
+            except DBAPIError as exc:
+                if replica.healthy:
+                    # Not already marked by the engine's handle_error listener.
+                    self._replicas().mark_failed(replica, exc)
+                replica = self._next_replica()
+                engine = replica.engine if replica is not None else self._primary()
+                continue
+            self.info[_CONNECTED] = True
+            self._replicas().mark_used(replica)
+            return connection
+        return super()._connection_for_bind(engine, execution_options, **kw)
+
+
+class AsyncRoutingSession(RoutingSession):
+    # The sync side of AsyncSessionLocal's sessions: the same routing over the async engines.
+
+    def _primary(self):
+        return get_async_engine().sync_engine
+
+    def _replicas(self) -> ReplicaSet:
+        init_engines()
+        return async_replicas
+
+
+def _is_write(clause) -> bool:
+    return clause is not None and (getattr(clause, "is_dml", False) or getattr(clause, "_for_update_arg", None) is not None)
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+# For work outside a request that only reads, e.g. streamed exports: it may use a replica.
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, info={READ_ONLY: True})
+# expire_on_commit=False: attributes must never be lazily refreshed outside of an await.
+AsyncSessionLocal = async_sessionmaker(sync_session_class=AsyncRoutingSession, autoflush=False, expire_on_commit=False)
+
+def get_db(request: Request):
+    db = SessionLocal(info={READ_ONLY: request.method in READ_METHODS})
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Async drivers substituted for the sync ones when ASYNC_DATABASE_URL is not set explicitly.
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_url(url: str) -> str:
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername)).render_as_string(hide_password=False)
+
+def get_async_database_url() -> str:
+    return settings.ASYNC_DATABASE_URL or async_url(settings.DATABASE_URL)
+
+def replica_urls() -> list:
+    return [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
+def _create_engine(url: str = None, metrics_name: str = "primary"):
+    url = url or settings.DATABASE_URL
+    metrics = pool_metrics.setdefault(metrics_name, PoolMetrics(metrics_name))
+    created = create_engine(
+        url,
+        pool_pre_ping=True,
+        **pool_options(url, metrics)
+    )
+    attach_pool_listeners(created, metrics)
+    if settings.DEBUG_CONNECTION_LEAKS:
+        attach_leak_detector(created)
+    if settings.PROFILING_ENABLED or settings.SLOW_QUERY_THRESHOLD_MS >= 0:
+        attach_query_profiler(created)
+    return created
+
+def _create_async_engine(url: str = None, metrics_name: str = "async"):
+    url = url or get_async_database_url()
+    metrics = pool_metrics.setdefault(metrics_name, PoolMetrics(metrics_name))
+    created = create_async_engine(
+        url,
+        pool_pre_ping=True,
+        **pool_options(url, metrics, async_=True)
+    )
+    attach_pool_listeners(created.sync_engine, metrics)
+    if settings.DEBUG_CONNECTION_LEAKS:
+        attach_leak_detector(created.sync_engine)
+    if settings.PROFILING_ENABLED or settings.SLOW_QUERY_THRESHOLD_MS >= 0:
+        attach_query_profiler(created.sync_engine)
+    return created
+
+def init_engines():
+    """
+    Creates the engines (the async ones only with DATABASE_ASYNC) and the replica sets unless that
+    has been done already. Creating an engine loads its DB driver but opens no connection.
+    """
+    global engine, async_engine, replicas, async_replica_engines, async_replicas
+    if engine is not None:
+        return
+    with _init_lock:
+        if engine is not None:
+            return
+        urls = replica_urls()
+        if settings.DATABASE_ASYNC:
+            async_engine = _create_async_engine()
+            async_replica_engines = [
+                _create_async_engine(async_url(url), f"async_replica{index}") for index, url in enumerate(urls, 1)
+            ]
+            async_replicas = ReplicaSet(
+                [Replica(f"async_replica{index}", created.sync_engine) for index, created in enumerate(async_replica_engines, 1)],
+                settings.DATABASE_REPLICA_POLICY, settings.DATABASE_REPLICA_RETRY_SECONDS,
+            )
+        replicas = ReplicaSet(
+            [Replica(f"replica{index}", _create_engine(url, f"replica{index}")) for index, url in enumerate(urls, 1)],
+            settings.DATABASE_REPLICA_POLICY, settings.DATABASE_REPLICA_RETRY_SECONDS,
+        )
+        # Set last: a non-None engine tells other threads that everything above exists.
+        engine = _create_engine()
+
+def get_engine():
+    init_engines()
+    return engine
+
+def get_async_engine():
+    """
+    The AsyncEngine, or None without DATABASE_ASYNC.
+    """
+    init_engines()
+    return async_engine
+
+def dispose_engines(close: bool = True):
+    """
+    Empties the connection pools. A worker forked from a process that already connected must pass
+    close=False: the inherited connections are then dropped without closing the parent's sockets.
+    """
+    if engine is not None:
+        engine.dispose(close=close)
+    replicas.dispose(close=close)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=close)
+    async_replicas.dispose(close=close)
+
+async def dispose_engines_async():
+    # At shutdown: async pools must be closed from the event loop.
+    if async_engine is not None:
+        await async_engine.dispose()
+    for created in async_replica_engines:
+        await created.dispose()
+    if engine is not None:
+        engine.dispose()
+    replicas.dispose()
+
+T = TypeVar("T")
+
+
+class ReadDB:
+    """
+    The session of a read endpoint: a RoutingSession, or with DATABASE_ASYNC an AsyncSession over
+    the async engines. Either way handlers call the (sync) service functions through run(), which
+    passes them the sync Session on a threadpool thread, or inside the AsyncSession's greenlet; so
+    there is one set of read handlers and service functions, and the event loop never waits on the database.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+
+async def get_read_db(request: Request):
+    """
+    A ReadDB for the request, over the async engines with DATABASE_ASYNC. GET and HEAD sessions read from the replicas.
+    """
+    info = {READ_ONLY: request.method in READ_METHODS}
+    if settings.DATABASE_ASYNC:
+        async with AsyncSessionLocal(info=info) as db:
+            yield ReadDB(db)
+        return
+    db = SessionLocal(info=info)
+    try:
+        yield ReadDB(db)
+    finally:
+        await run_in_threadpool(db.close)
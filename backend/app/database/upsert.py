@@ -0,0 +1,49 @@
+# backend/app/database/upsert.py
+from typing import Dict, List, Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+# Bound parameters a single statement may carry, per dialect.
+MAX_PARAMETERS = {"postgresql": 65535, "sqlite": 32766, "mysql": 65535}
+
+
+def max_rows_per_statement(dialect_name: str, column_count: int, default: int = 1000) -> int:
+    """
+    How many rows of `column_count` values fit into one multi-row INSERT.
+    """
+    limit = MAX_PARAMETERS.get(dialect_name)
+    return max(1, limit // column_count) if limit else default
+
+
+def supports_upsert(dialect_name: str) -> bool:
+    return dialect_name in ("postgresql", "sqlite", "mysql")
+
+
+def upsert_statement(dialect_name: str, table: Table, rows: List[dict], index_elements: Sequence[str], update_columns: Sequence[str], extra_values: Dict = None, increment_columns: Sequence[str] = ()):
+    """
+    Multi-row INSERT of `rows` that, for rows conflicting on `index_elements`, updates `update_columns`
+    to the inserted values (plus `extra_values`, e.g. {"updated_at": func.now()}) instead of failing.
+    `increment_columns` are instead added to the existing values, which makes counters atomic.
+    On MySQL the conflict target is whichever unique key matches.
+    """
+    extra_values = extra_values or {}
+    if dialect_name in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+        statement = dialect_insert(table).values(rows)
+        return statement.on_conflict_do_update(
+            index_elements=list(index_elements),
+            set_={
+                **{column: statement.excluded[column] for column in update_columns},
+                **{column: table.c[column] + statement.excluded[column] for column in increment_columns},
+                **extra_values,
+            },
+        )
+    if dialect_name == "mysql":
+        statement = mysql.insert(table).values(rows)
+        return statement.on_duplicate_key_update({
+            **{column: statement.inserted[column] for column in update_columns},
+            **{column: table.c[column] + statement.inserted[column] for column in increment_columns},
+            **extra_values,
+        })
+    raise ValueError(f"Upsert is not supported on {dialect_name}")
@@ -1,8 +1,3 @@
 # backend/app/schemas/__init__.py
-from . import category, product, user, order, order_item
-
-category.Category.model_rebuild()
-product.Product.model_rebuild()
-user.User.model_rebuild()
-order.Order.model_rebuild()
-order_item.OrderItem.model_rebuild()
\ No newline at end of file
+# Each schema module imports the schemas it references, so pydantic builds every model's validator
+# once, when its class is defined; nothing needs a model_rebuild() here.
@@ -1,6 +1,6 @@
 # backend/app/schemas/product.py
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional
 from decimal import Decimal
 from datetime import datetime
 
@@ -17,11 +17,31 @@ class ProductBase(BaseModel):
 class ProductCreate(ProductBase):
     pass 
 
+class ProductImportRow(ProductBase):
+    product_id: Optional[int] = Field(None, ge=1, description="Existing product to replace when upserting; omitted for new products")
+
+class ProductImportError(BaseModel):
+    row: int = Field(..., description="1-based position of the record in the upload, CSV header excluded")
+    error: str
+
+class ProductImportReport(BaseModel):
+    received: int = Field(..., description="Records read from the upload")
+    written: int = Field(..., description="Products inserted or updated")
+    failed: int = Field(..., description="Records rejected, see errors")
+    errors: List[ProductImportError] = Field(..., description="Per-record errors, the first ones up to the report limit")
+
 class Product(ProductBase):
     product_id: int
     created_at: datetime
-    updated_at: datetime
+    updated_at: Optional[datetime] = None
     category: Category 
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ProductFilter(BaseModel):
+    category_id: Optional[int] = Field(None, description="Only products in this category")
+    min_price: Optional[Decimal] = Field(None, ge=0, description="Lowest price, inclusive")
+    max_price: Optional[Decimal] = Field(None, ge=0, description="Highest price, inclusive")
+    in_stock: Optional[bool] = Field(None, description="true: only products in stock, false: only sold-out products")
+    sort: Literal['product_id', 'price', '-price', 'created_at', '-created_at', 'name', '-name'] = Field('product_id', description="Sort key, '-' prefix for descending")
@@ -0,0 +1,31 @@
+# backend/app/schemas/report.py
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+from datetime import date
+from decimal import Decimal
+
+OrderStatus = Literal['pending', 'processing', 'shipped', 'delivered', 'cancelled']
+
+# Reporting period (UTC days, both inclusive) and the order statuses it counts; None means all but cancelled.
+class ReportPeriod(BaseModel):
+    start: date
+    end: date
+    status: Optional[List[OrderStatus]] = None
+
+class DailyRevenue(BaseModel):
+    day: date
+    orders: int
+    units: int
+    revenue: Decimal
+
+class ProductSales(BaseModel):
+    product_id: int
+    name: Optional[str] = None # None once the product has been deleted
+    units: int
+    revenue: Decimal
+
+class CategorySales(BaseModel):
+    category_id: int
+    name: str
+    units: int
+    revenue: Decimal
@@ -14,15 +14,25 @@ class UserBase(BaseModel):
     zip_code: Optional[str] = Field(None, max_length=20)
     country: Optional[str] = Field(None, max_length=255)
     phone_number: Optional[str] = Field(None, max_length=50)
-    role: str = Field("customer", pattern="^(customer|admin)$", description="User role: customer or admin")
 
 class UserCreate(UserBase):
     password: str = Field(..., min_length=8, description="User's password (will be hashed)")
 
+# Roles are not part of the fields users register or edit themselves: only an admin changes one (PUT /users/{id}/role).
+class UserRoleUpdate(BaseModel):
+    role: str = Field(..., pattern="^(customer|admin)$", description="User role: customer or admin")
+
 class User(UserBase):
     user_id: int
+    role: str
     created_at: datetime
     updated_at: Optional[datetime] = None 
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# The authenticated user, as carried by the access token's claims.
+class CurrentUser(BaseModel):
+    user_id: int
+    username: str
+    role: str
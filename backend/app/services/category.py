@@ -1,14 +1,28 @@
 # backend/app/services/category.py
+from typing import Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import select
+from app.core.pagination import decode_cursor, keyset_after, next_cursor
+from app.core.serialization import TrustedSerializer
 from app.database import models
 from app.schemas import category as schemas 
+from app.services import product as product_services
+
+def _category_query(category_id: int):
+    return select(models.Category).filter(models.Category.category_id == category_id)
+
+def _categories_query(skip: int, limit: int, cursor: Optional[str]):
+    query = select(models.Category).order_by(models.Category.category_id).limit(limit)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, models.Category.category_id)
+        return query.filter(keyset_after([models.Category.category_id], [last_id]))
+    return query.offset(skip)
 
 def get_category(db: Session, category_id: int):
     """
     Retrieves a single category by its ID.
     """
-    return db.execute(select(models.Category).filter(models.Category.category_id == category_id)).scalar_one_or_none()
+    return db.execute(_category_query(category_id)).scalar_one_or_none()
 
 def get_category_by_name(db: Session, name: str):
     """
@@ -16,11 +30,28 @@ def get_category_by_name(db: Session, name: str):
     """
     return db.execute(select(models.Category).filter(models.Category.name == name)).scalar_one_or_none()
 
-def get_categories(db: Session, skip: int = 0, limit: int = 100):
+def get_categories(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
     """
     Retrieves a list of categories.
+    Pages by category_id after `cursor` when given, otherwise by offset.
+    """
+    return db.execute(_categories_query(skip, limit, cursor)).scalars().all()
+
+category_serializer = TrustedSerializer(schemas.Category)
+
+def get_category_json(db: Session, category_id: int) -> Optional[bytes]:
+    """
+    The JSON response of a category, or None if the category does not exist.
+    """
+    db_category = get_category(db, category_id)
+    return category_serializer.dump(db_category) if db_category is not None else None
+
+def get_categories_json(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Tuple[bytes, Optional[str]]:
+    """
+    The JSON response of a category page and the cursor of the next page (or None).
     """
-    return db.execute(select(models.Category).offset(skip).limit(limit)).scalars().all()
+    db_categories = get_categories(db, skip=skip, limit=limit, cursor=cursor)
+    return category_serializer.dump_many(db_categories), next_cursor(db_categories, limit, "category_id")
 
 def create_category(db: Session, category: schemas.CategoryCreate):
     """
@@ -42,6 +73,7 @@ def update_category(db: Session, category_id: int, category_update: schemas.Cate
             setattr(db_category, key, value)
         db.add(db_category)
         db.commit()
+        product_services.invalidate_catalog()
         db.refresh(db_category)
         return db_category
     return None
@@ -54,5 +86,6 @@ def delete_category(db: Session, category_id: int):
     if db_category:
         db.delete(db_category)
         db.commit()
+        product_services.invalidate_catalog()
         return True 
     return False 
\ No newline at end of file
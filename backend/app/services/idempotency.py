@@ -0,0 +1,136 @@
+# backend/app/services/idempotency.py
+import hashlib
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import models
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Rows deleted per purge statement, and when this process last purged.
+PURGE_BATCH_SIZE = 500
+_last_purge = 0.0
+
+def fingerprint(operation: str, payload: BaseModel) -> str:
+    """
+    Identifies a request: the operation (e.g. "POST /api/v1/orders/") and its validated body.
+    """
+    return hashlib.sha256(f"{operation}\n{payload.model_dump_json()}".encode()).hexdigest()
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def claim(db: Session, key: str, request_fingerprint: str) -> Tuple[Optional[str], Optional[models.IdempotencyKey]]:
+    """
+    Reserves `key` for a request about to be processed and commits the reservation, so a concurrent
+    retry sees it. Returns (claim token, None) once reserved: complete() and release() only act while
+    the token still holds the claim. Returns (None, completed row) if the stored response must be replayed instead.
+    Raises 409 while another request with the key is in progress, 422 if the key was used for a different request.
+    """
+    _purge_expired(db)
+    now = _now()
+    token = uuid.uuid4().hex
+    db.add(models.IdempotencyKey(key=key, fingerprint=request_fingerprint, claim_token=token, expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)))
+    try:
+        db.commit()
+        return token, None
+    except IntegrityError:
+        db.rollback()
+
+    row = db.execute(
+        select(models.IdempotencyKey, models.IdempotencyKey.expires_at <= now)
+        .filter(models.IdempotencyKey.key == key)
+    ).first()
+    if row is None:
+        # Purged between our INSERT and SELECT: the client may simply retry.
+        raise _in_progress()
+    stored, expired = row
+    if not expired:
+        if stored.fingerprint != request_fingerprint:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail="Idempotency-Key was already used for a different request")
+        if stored.status_code is None:
+            raise _in_progress()
+        return None, stored
+
+    # An expired response, or a request that never finished: take the key over, unless someone else just did.
+    # The new token locks out the request that held the claim before, should it still be running.
+    result = db.execute(
+        update(models.IdempotencyKey)
+        .filter(models.IdempotencyKey.key == key, models.IdempotencyKey.expires_at == stored.expires_at)
+        .values(
+            fingerprint=request_fingerprint, claim_token=token, status_code=None, response_body=None,
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    if result.rowcount != 1:
+        raise _in_progress()
+    return token, None
+
+def _in_progress() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A request with this Idempotency-Key is already in progress",
+        headers={"Retry-After": "1"},
+    )
+
+def complete(db: Session, key: str, token: str, status_code: int, body: bytes):
+    """
+    Stores the response for `key`. Call it in the transaction that makes the request's changes,
+    so they and the stored response commit (or roll back) together. Does not commit.
+    Raises 409 if `token` no longer holds the claim (it expired and another request took the key
+    over): the caller's transaction must then roll back, or the request would take effect twice.
+    """
+    result = db.execute(
+        update(models.IdempotencyKey)
+        .filter(models.IdempotencyKey.key == key, models.IdempotencyKey.claim_token == token, models.IdempotencyKey.status_code.is_(None))
+        .values(status_code=status_code, response_body=body, expires_at=_now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS))
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise _in_progress()
+
+def release(db: Session, key: str, token: str):
+    """
+    Drops the reservation of a request that failed without changing anything, so it can be retried.
+    Leaves the key alone if `token` no longer holds the claim.
+    """
+    db.rollback()
+    db.execute(
+        delete(models.IdempotencyKey)
+        .filter(models.IdempotencyKey.key == key, models.IdempotencyKey.claim_token == token, models.IdempotencyKey.status_code.is_(None))
+    )
+    db.commit()
+
+def replay(stored: models.IdempotencyKey) -> Response:
+    return Response(
+        content=stored.response_body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={REPLAYED_HEADER: "true"},
+    )
+
+def _purge_expired(db: Session):
+    # At most every IDEMPOTENCY_PURGE_INTERVAL_SECONDS per process, one batch through the expires_at index.
+    global _last_purge
+    if time.monotonic() - _last_purge < settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS:
+        return
+    _last_purge = time.monotonic()
+    expired = (
+        select(models.IdempotencyKey.key)
+        .filter(models.IdempotencyKey.expires_at < _now())
+        .limit(PURGE_BATCH_SIZE)
+        .scalar_subquery()
+    )
+    db.execute(delete(models.IdempotencyKey).filter(models.IdempotencyKey.key.in_(expired)))
+    db.commit()
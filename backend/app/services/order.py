@@ -1,30 +1,102 @@
 # backend/app/services/order.py
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from typing import Optional
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import select, delete
 from fastapi import HTTPException, status
 from decimal import Decimal
 
+from app.core import jobs
+from app.core.pagination import decode_cursor, keyset_after
+from app.core.serialization import TrustedSerializer
+from app.core.streaming import iter_serialized
 from app.database import models
 from app.schemas import order as order_schemas
 from app.schemas import order_item as order_item_schemas
 from app.services import user as user_services
 from app.services import product as product_services
-from app.services import order_item as order_item_services
+from app.services import idempotency as idempotency_services
+from app.services import report as report_services
+from app.services import order_events
+
+# Everything the Order response schema serializes: user and order_items[].product.category.
+# The collection is loaded with a single SELECT ... IN per page, the many-to-one links are joined.
+ORDER_LOAD_OPTIONS = (
+    joinedload(models.Order.user),
+    selectinload(models.Order.order_items)
+    .joinedload(models.OrderItem.product)
+    .joinedload(models.Product.category),
+)
+
+order_serializer = TrustedSerializer(order_schemas.Order)
+
+def _order_query(order_id: int):
+    return select(models.Order).options(*ORDER_LOAD_OPTIONS).filter(models.Order.order_id == order_id)
+
+def _orders_query(skip: int, limit: int, cursor: Optional[str]):
+    query = select(models.Order).options(*ORDER_LOAD_OPTIONS).order_by(models.Order.order_id).limit(limit)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, models.Order.order_id)
+        return query.filter(keyset_after([models.Order.order_id], [last_id]))
+    return query.offset(skip)
+
+def _user_orders_query(user_id: int, limit: int, cursor: Optional[str], status: Optional[str]):
+    # Newest first; walks ix_orders_user_date (or ix_orders_user_status_date) backwards from the cursor.
+    keys = [models.Order.order_date, models.Order.order_id]
+    query = (
+        select(models.Order).options(*ORDER_LOAD_OPTIONS)
+        .filter(models.Order.user_id == user_id)
+        .order_by(*[key.desc() for key in keys])
+        .limit(limit)
+    )
+    if status:
+        query = query.filter(models.Order.status == status)
+    if cursor:
+        query = query.filter(keyset_after(keys, decode_cursor(cursor, *keys), descending=True))
+    return query
 
 def get_order(db: Session, order_id: int):
-    return db.execute(select(models.Order).filter(models.Order.order_id == order_id)).scalar_one_or_none()
+    return db.execute(_order_query(order_id)).scalar_one_or_none()
+
+def get_orders(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return db.execute(_orders_query(skip, limit, cursor)).scalars().all()
+
+def get_user_orders(db: Session, user_id: int, limit: int = 20, cursor: Optional[str] = None, status: Optional[str] = None):
+    """
+    A page of one user's orders, newest first, with items and products loaded in two queries.
+    """
+    return db.execute(_user_orders_query(user_id, limit, cursor, status)).scalars().all()
 
-def get_orders(db: Session, skip: int = 0, limit: int = 100):
-    return db.execute(select(models.Order).offset(skip).limit(limit)).scalars().all()
+def stream_orders(format: str, cursor: Optional[str] = None):
+    """
+    Every order after `cursor`, serialized as `format` ("ndjson" or "json") batch by batch.
+    """
+    return iter_serialized(_orders_query(0, None, cursor), order_schemas.Order, format)
 
-def create_order(db: Session, order: order_schemas.OrderCreate):
+def _quantities_by_product(order_items):
+    quantities = {}
+    for item in order_items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    return quantities
+
+def create_order(db: Session, order: order_schemas.OrderCreate, idempotency_key: Optional[str] = None, claim_token: Optional[str] = None):
+    """
+    Places an order. With `idempotency_key` (claimed with `claim_token`), its response is stored in the same
+    transaction as the order, so a retry replays it and can never place the order twice; if the claim
+    was lost meanwhile, a 409 is raised and the order is not placed. Follow-up
+    work (the confirmation, see order_events) is enqueued in that transaction too and runs after the response.
+    """
     db_user = user_services.get_user(db, user_id=order.user_id)
     if not db_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"User with ID {order.user_id} not found")
 
+    if not order.order_items:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Order must contain at least one item.")
+
+    # Lock and decrement every product up front, in one round trip, before any order rows exist.
+    db_products = product_services.reserve_stock(db, _quantities_by_product(order.order_items))
+
     db_order = models.Order(
         user_id=order.user_id,
-        status=order.status,
         shipping_address=order.shipping_address,
         shipping_city=order.shipping_city,
         shipping_state=order.shipping_state,
@@ -38,20 +110,8 @@ def create_order(db: Session, order: order_schemas.OrderCreate):
     total_order_amount = Decimal('0.00')
     order_items_to_add = []
 
-    if not order.order_items:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Order must contain at least one item.")
-
     for item_data in order.order_items:
-        db_product = product_services.get_product(db, product_id=item_data.product_id)
-        if not db_product:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Product with ID {item_data.product_id} not found.")
-        if db_product.stock_quantity < item_data.quantity:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient stock for product '{db_product.name}'. Available: {db_product.stock_quantity}, requested: {item_data.quantity}")
-
-        db_product.stock_quantity -= item_data.quantity
-        db.add(db_product)
-
-        price_at_purchase = db_product.price
+        price_at_purchase = db_products[item_data.product_id].price
         item_total = price_at_purchase * item_data.quantity
         total_order_amount += item_total
 
@@ -67,11 +127,18 @@ def create_order(db: Session, order: order_schemas.OrderCreate):
     db.add(db_order)
     db.add_all(order_items_to_add)
 
+    # order_date is a server default: reading it loads the row flushed above.
+    report_services.record_order(db, db_order, [
+        (item.product_id, item.quantity, item.price_at_purchase) for item in order_items_to_add
+    ])
+    jobs.enqueue(db, order_events.ORDER_CREATED, {"order_id": db_order.order_id})
+    if idempotency_key:
+        db.flush()
+        idempotency_services.complete(db, idempotency_key, claim_token, status.HTTP_201_CREATED, order_serializer.dump(get_order(db, db_order.order_id)))
     db.commit()
-    db.refresh(db_order)
-    db.refresh(db_user)
+    product_services.invalidate_products(*db_products.keys())
 
-    return db_order
+    return get_order(db, db_order.order_id)
 
 def update_order(db: Session, order_id: int, order_update: order_schemas.OrderCreate):
     db_order = db.execute(select(models.Order).filter(models.Order.order_id == order_id)).scalar_one_or_none()
@@ -79,32 +146,37 @@ def update_order(db: Session, order_id: int, order_update: order_schemas.OrderCr
         return None
 
     update_data = order_update.model_dump(exclude_unset=True, exclude={'order_items'})
+    status_changed = update_data.get('status', db_order.status) != db_order.status
+    total_changed = update_data.get('total_amount', db_order.total_amount) != db_order.total_amount
+
+    # Moves the order (and, with a new status, its items) from the rollup rows of its old values to those of the new ones.
+    items = report_services.order_items_sold(db, order_id) if status_changed else []
+    if status_changed or total_changed:
+        report_services.record_order(db, db_order, items, sign=-1)
     for key, value in update_data.items():
         setattr(db_order, key, value)
+    if status_changed or total_changed:
+        report_services.record_order(db, db_order, items)
 
     db.add(db_order)
     db.commit()
-    db.refresh(db_order)
-    return db_order
+    return get_order(db, order_id)
 
 def delete_order(db: Session, order_id: int):
     db_order = db.execute(select(models.Order).filter(models.Order.order_id == order_id)).scalar_one_or_none()
     if not db_order:
         return False
 
-    order_items = order_item_services.get_order_items_by_order(db, order_id=order_id)
-
-    for item in order_items:
-        db_product = product_services.get_product(db, product_id=item.product_id)
-        if db_product:
-            db_product.stock_quantity += item.quantity
-            db.add(db_product)
+    items = report_services.order_items_sold(db, order_id)
+    quantities = {}
+    for product_id, quantity, _ in items:
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    product_services.release_stock(db, quantities)
+    report_services.record_order(db, db_order, items, sign=-1)
 
+    db.execute(delete(models.OrderItem).filter(models.OrderItem.order_id == order_id))
     db.delete(db_order)
     db.commit()
-
-    if order_items:
-        for item in order_items:
-            product_services.get_product(db, product_id=item.product_id)
+    product_services.invalidate_products(*quantities)
 
     return True
@@ -0,0 +1,31 @@
+# backend/app/services/order_events.py
+import logging
+
+from sqlalchemy import select
+
+from app.core.jobs import job_handler
+from app.database import models
+from app.database.session import SessionLocal
+
+notification_logger = logging.getLogger("app.notifications")
+
+# Topics of the background jobs orders enqueue (app/core/jobs.py), with their handlers below.
+ORDER_CREATED = "order.created"
+
+
+@job_handler(ORDER_CREATED)
+def send_order_confirmation(payload: dict):
+    """
+    Confirms a placed order to its customer, off the checkout request. There is no mail provider yet:
+    the message goes to the app.notifications log.
+    """
+    with SessionLocal() as db:
+        order = db.execute(
+            select(models.Order.order_id, models.Order.total_amount, models.User.email)
+            .join(models.User, models.User.user_id == models.Order.user_id)
+            .filter(models.Order.order_id == payload["order_id"])
+        ).first()
+    if order is None:
+        # Deleted before the job ran.
+        return
+    notification_logger.info("Order confirmation to %s: order %s, total %s", order.email, order.order_id, order.total_amount)
@@ -1,22 +1,39 @@
 # backend/app/services/order_item.py
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import select
 from fastapi import HTTPException, status
 from app.database import models
 from app.schemas import order_item as schemas 
 from app.services import product as product_services 
+from app.services import report as report_services
+
+# The OrderItem response schema nests product.category.
+ORDER_ITEM_LOAD_OPTIONS = (
+    joinedload(models.OrderItem.product).joinedload(models.Product.category),
+)
 
 def get_order_item(db: Session, order_item_id: int):
     """
     Retrieves a single order item by its ID.
     """
-    return db.execute(select(models.OrderItem).filter(models.OrderItem.order_item_id == order_item_id)).scalar_one_or_none()
+    return db.execute(
+        select(models.OrderItem).options(*ORDER_ITEM_LOAD_OPTIONS).filter(models.OrderItem.order_item_id == order_item_id)
+    ).scalar_one_or_none()
+
+def _order_items_by_order_query(order_id: int):
+    return select(models.OrderItem).options(*ORDER_ITEM_LOAD_OPTIONS).filter(models.OrderItem.order_id == order_id)
 
 def get_order_items_by_order(db: Session, order_id: int):
     """
     Retrieves all order items for a specific order.
     """
-    return db.execute(select(models.OrderItem).filter(models.OrderItem.order_id == order_id)).scalars().all()
+    return db.execute(_order_items_by_order_query(order_id)).scalars().all()
+
+def _record_item(db: Session, order_id: int, item: report_services.SoldItem, sign: int = 1):
+    # Keeps the daily product sales in step with a single item change, in the same transaction.
+    db_order = db.get(models.Order, order_id)
+    if db_order is not None:
+        report_services.record_order_items(db, db_order, [item], sign)
 
 def create_order_item(db: Session, order_item: schemas.OrderItemCreate):
     """
@@ -39,7 +56,9 @@ def create_order_item(db: Session, order_item: schemas.OrderItemCreate):
         price_at_purchase=order_item.price_at_purchase 
     )
     db.add(db_order_item)
+    _record_item(db, order_item.order_id, (order_item.product_id, order_item.quantity, order_item.price_at_purchase))
     db.commit()
+    product_services.invalidate_products(order_item.product_id)
     db.refresh(db_order_item)
     db.refresh(db_product)
     return db_order_item
@@ -70,12 +89,15 @@ def update_order_item(db: Session, order_item_id: int, order_item_update: schema
     elif quantity_difference < 0: 
         db_product.stock_quantity -= quantity_difference
 
+    _record_item(db, db_order_item.order_id, (product_id, original_quantity, db_order_item.price_at_purchase), sign=-1)
     db_order_item.quantity = new_quantity
     db_order_item.price_at_purchase = order_item_update.price_at_purchase
+    _record_item(db, db_order_item.order_id, (product_id, new_quantity, order_item_update.price_at_purchase))
 
     db.add(db_product)
     db.add(db_order_item)
     db.commit()
+    product_services.invalidate_products(product_id)
     db.refresh(db_order_item)
     db.refresh(db_product)
     return db_order_item
@@ -93,8 +115,11 @@ def delete_order_item(db: Session, order_item_id: int):
         db_product.stock_quantity += db_order_item.quantity
         db.add(db_product)
 
+    product_id = db_order_item.product_id
+    _record_item(db, db_order_item.order_id, (product_id, db_order_item.quantity, db_order_item.price_at_purchase), sign=-1)
     db.delete(db_order_item)
     db.commit()
+    product_services.invalidate_products(product_id)
     if db_product: 
         db.refresh(db_product)
     return True 
\ No newline at end of file
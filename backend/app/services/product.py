@@ -1,19 +1,289 @@
 # backend/app/services/product.py
-from sqlalchemy.orm import Session
-from sqlalchemy import select, update, delete
+import re
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, insert, update, delete, case, func, or_, text, Float, Integer
+from sqlalchemy.exc import IntegrityError
+from app.core import bulk_io
+from app.core.cache import ReadThroughCache
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor, keyset_after, next_cursor
+from app.core.serialization import TrustedSerializer
+from app.core.streaming import iter_serialized
 from app.database import models
+from app.database.session import ReadSessionLocal, get_engine
+from app.database.upsert import max_rows_per_statement, supports_upsert, upsert_statement
 from app.schemas import product as schemas 
 
+# The Product response schema nests its category.
+PRODUCT_LOAD_OPTIONS = (joinedload(models.Product.category),)
+
+def _product_query(product_id: int):
+    return select(models.Product).options(*PRODUCT_LOAD_OPTIONS).filter(models.Product.product_id == product_id)
+
+# Sort keys accepted by ProductFilter.sort. Each one is served by an index on
+# (column, product_id), or (category_id, column, product_id) when filtering by category.
+SORT_COLUMNS = {
+    "product_id": models.Product.product_id,
+    "price": models.Product.price,
+    "created_at": models.Product.created_at,
+    "name": models.Product.name,
+}
+
+def _sort_key(filters: Optional[schemas.ProductFilter]):
+    sort = filters.sort if filters else "product_id"
+    descending = sort.startswith("-")
+    column = SORT_COLUMNS[sort.lstrip("-")]
+    # product_id breaks ties, so the ordering is total and can be paged by keyset.
+    columns = [column] if column is models.Product.product_id else [column, models.Product.product_id]
+    return columns, descending
+
+def cursor_attrs(filters: Optional[schemas.ProductFilter]):
+    """
+    Attributes of the last product of a page that make up the cursor for `filters.sort`.
+    """
+    columns, _ = _sort_key(filters)
+    return [column.key for column in columns]
+
+def _filter(query, filters: schemas.ProductFilter):
+    if filters.category_id is not None:
+        query = query.filter(models.Product.category_id == filters.category_id)
+    if filters.min_price is not None:
+        query = query.filter(models.Product.price >= filters.min_price)
+    if filters.max_price is not None:
+        query = query.filter(models.Product.price <= filters.max_price)
+    if filters.in_stock is not None:
+        query = query.filter(models.Product.stock_quantity > 0 if filters.in_stock else models.Product.stock_quantity <= 0)
+    return query
+
+def _page(query, skip: int, limit: int, cursor: Optional[str], filters: Optional[schemas.ProductFilter]):
+    if filters:
+        query = _filter(query, filters)
+    columns, descending = _sort_key(filters)
+    query = query.order_by(*[column.desc() if descending else column for column in columns]).limit(limit)
+    if cursor:
+        values = decode_cursor(cursor, *columns)
+        return query.filter(keyset_after(columns, values, descending=descending))
+    return query.offset(skip)
+
+def _products_query(skip: int, limit: int, cursor: Optional[str], filters: Optional[schemas.ProductFilter]):
+    return _page(select(models.Product).options(*PRODUCT_LOAD_OPTIONS), skip, limit, cursor, filters)
+
 def get_product(db: Session, product_id: int):
-    return db.execute(select(models.Product).filter(models.Product.product_id == product_id)).scalar_one_or_none()
+    return db.execute(_product_query(product_id)).scalar_one_or_none()
+
+def get_products(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, filters: Optional[schemas.ProductFilter] = None):
+    return db.execute(_products_query(skip, limit, cursor, filters)).scalars().all()
+
+def stream_products(format: str, cursor: Optional[str] = None, filters: Optional[schemas.ProductFilter] = None):
+    """
+    Every product matching `filters` after `cursor`, serialized as `format` ("ndjson" or "json") batch by batch.
+    """
+    return iter_serialized(_products_query(0, None, cursor, filters), schemas.Product, format)
+
+# Product responses as sent: the JSON of a product under "item" keys, and of a page (after the
+# cursor of the next page and a newline) under "list" keys. The ETag is a hash of those bytes.
+#
+# Writes invalidate by bumping generations, never by deleting keys: a product write bumps the
+# generation of its item bucket and the "list" scope, a category write the whole namespace. Keys are
+# built before the database is read, so a read that raced a write stores its (old) result under a
+# generation nobody looks up any more, instead of putting it back after the invalidation.
+#
+# Accepted staleness: up to PRODUCT_CACHE_TTL_SECONDS after a write, on workers that did not make it
+# with CACHE_BACKEND=memory (generations are per process), or when the page was read from a lagging
+# replica right after the write. With CACHE_BACKEND=redis and no replicas, a write is seen at once.
+product_cache = ReadThroughCache(
+    "products",
+    ttl=settings.PRODUCT_CACHE_TTL_SECONDS,
+    max_entries=settings.PRODUCT_CACHE_MAX_ENTRIES,
+    max_bytes=settings.PRODUCT_CACHE_MAX_BYTES,
+)
+product_serializer = TrustedSerializer(schemas.Product)
+
+# Products share ITEM_GENERATION_BUCKETS item generations (by product_id modulo), which keeps the
+# number of counters bounded; a write invalidates the cached copies of the products in its bucket.
+ITEM_GENERATION_BUCKETS = 1024
+
+def _item_scope(product_id: int) -> str:
+    return f"item{product_id % ITEM_GENERATION_BUCKETS}"
+
+def _product_key(product_id: int) -> str:
+    return product_cache.key(product_id, scope=_item_scope(product_id))
+
+def _products_key(skip: int, limit: int, cursor: Optional[str], filters: Optional[schemas.ProductFilter]) -> str:
+    return product_cache.key(skip, limit, cursor or "", filters.model_dump_json() if filters else "", scope="list")
+
+def invalidate_products(*product_ids: int):
+    """
+    Invalidates the cached copies of `product_ids` and every cached product page. Call after commit.
+    """
+    for scope in sorted({_item_scope(product_id) for product_id in product_ids}):
+        product_cache.bump(scope)
+    product_cache.bump("list")
+
+def invalidate_catalog():
+    """
+    Invalidates every cached product and page, e.g. after a category they embed has changed.
+    """
+    product_cache.bump()
+
+def get_product_json(db: Session, product_id: int) -> Optional[bytes]:
+    """
+    The JSON response of a product, from the read-through cache when it is there; None if there is no such product.
+    """
+    key = _product_key(product_id)
+    cached = product_cache.get(key)
+    if cached is not None:
+        return cached.encode()
+    db_product = get_product(db, product_id)
+    if db_product is None:
+        return None
+    body = product_serializer.dump(db_product)
+    product_cache.set(key, body.decode())
+    return body
+
+def get_products_json(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, filters: Optional[schemas.ProductFilter] = None) -> Tuple[bytes, Optional[str]]:
+    """
+    The JSON response of a product page and the cursor of the next page (or None), from the read-through cache when they are there.
+    """
+    key = _products_key(skip, limit, cursor, filters)
+    cached = product_cache.get(key)
+    if cached is not None:
+        next_page, _, body = cached.partition("\n")
+        return body.encode(), next_page or None
+    db_products = get_products(db, skip=skip, limit=limit, cursor=cursor, filters=filters)
+    body = product_serializer.dump_many(db_products)
+    next_page = next_cursor(db_products, limit, *cursor_attrs(filters))
+    product_cache.set(key, f"{next_page or ''}\n{body.decode()}")
+    return body, next_page
+
+SEARCH_MAX_TERMS = 8
+
+def _search_terms(q: str) -> List[str]:
+    # Letters and digits only: the terms are spliced into tsquery syntax and LIKE patterns.
+    return re.findall(r"[^\W_]+", q.lower())[:SEARCH_MAX_TERMS]
+
+def _postgres_search_rank(q: str, terms: List[str]):
+    # Every term is a prefix (so partial words match as the user types), plus trigram
+    # word similarity of the query against the name (`name %> q`) to tolerate typos.
+    document = models.product_search_document(models.Product.name, models.Product.description)
+    tsquery = func.to_tsquery(models.SEARCH_CONFIG, " & ".join(f"{term}:*" for term in terms))
+    rank = (func.ts_rank_cd(document, tsquery, type_=Float) + func.word_similarity(q, models.Product.name, type_=Float)).label("rank")
+    return rank, or_(document.op("@@")(tsquery), models.Product.name.op("%>")(q))
+
+def _one_typo_patterns(term: str) -> List[str]:
+    # LIKE patterns matching `term` with one character substituted, missing, or swapped with its neighbour.
+    substituted = [f"{term[:i]}_{term[i + 1:]}" for i in range(len(term))]
+    missing = [f"{term[:i]}_{term[i:]}" for i in range(1, len(term))]
+    swapped = [f"{term[:i]}{term[i + 1]}{term[i]}{term[i + 2:]}" for i in range(len(term) - 1)]
+    return substituted + missing + swapped
 
-def get_products(db: Session, skip: int = 0, limit: int = 100):
-    return db.execute(select(models.Product).offset(skip).limit(limit)).scalars().all()
+def _portable_search_rank(terms: List[str]):
+    # LIKE-based scoring for databases without full-text search (SQLite in tests and dev):
+    # name hits outweigh description hits, and a name still matches with one typo in a term.
+    scores = []
+    for term in terms:
+        scores.append(case((models.Product.name.ilike(f"%{term}%"), 4), else_=0))
+        scores.append(case((models.Product.description.ilike(f"%{term}%"), 2), else_=0))
+        if len(term) >= 4:
+            typo_patterns = [f"%{pattern}%" for pattern in _one_typo_patterns(term)]
+            scores.append(case((or_(*[models.Product.name.ilike(pattern) for pattern in typo_patterns]), 1), else_=0))
+    rank = sum(scores[1:], scores[0]).cast(Integer).label("rank")
+    return rank, rank > 0
+
+def _search_query(dialect_name: str, q: str, category_id: Optional[int], limit: int, cursor: Optional[str]):
+    terms = _search_terms(q)
+    if not terms:
+        return None
+    if dialect_name == "postgresql":
+        rank, match = _postgres_search_rank(q, terms)
+    else:
+        rank, match = _portable_search_rank(terms)
+
+    query = select(models.Product, rank).options(*PRODUCT_LOAD_OPTIONS).filter(match)
+    if category_id is not None:
+        query = query.filter(models.Product.category_id == category_id)
+    if cursor:
+        last_rank, last_id = decode_cursor(cursor, rank, models.Product.product_id)
+        query = query.filter(keyset_after([rank, models.Product.product_id], [last_rank, last_id], descending=True))
+    return query.order_by(rank.desc(), models.Product.product_id.desc()).limit(limit)
+
+def _search_page(rows, limit: int):
+    products = [row[0] for row in rows]
+    next_cursor = encode_cursor([rows[-1][1], products[-1].product_id]) if len(rows) == limit else None
+    return products, next_cursor
+
+def search_products(db: Session, q: str, category_id: Optional[int] = None, limit: int = 20, cursor: Optional[str] = None):
+    """
+    Ranked search over product name and description, best match first.
+    Returns the page of products and the cursor of the next page (or None).
+    """
+    query = _search_query(get_engine().dialect.name, q, category_id, limit, cursor)
+    if query is None:
+        return [], None
+    return _search_page(db.execute(query).all(), limit)
+
+def reserve_stock(db: Session, quantities: Dict[int, int]):
+    """
+    Takes `quantities` (product_id -> units) out of stock for an order being placed.
+    All rows are locked with one SELECT ... FOR UPDATE in product_id order, so concurrent
+    checkouts queue on the same locks instead of deadlocking, and the decrement is a single
+    conditional UPDATE that can never drive stock below zero.
+    Returns the locked products keyed by product_id. Does not commit.
+    """
+    product_ids = sorted(quantities)
+    db_products = db.execute(
+        select(models.Product)
+        .filter(models.Product.product_id.in_(product_ids))
+        .order_by(models.Product.product_id)
+        .with_for_update()
+    ).scalars().all()
+    products_by_id = {db_product.product_id: db_product for db_product in db_products}
+
+    for product_id in product_ids:
+        db_product = products_by_id.get(product_id)
+        if not db_product:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Product with ID {product_id} not found.")
+        if db_product.stock_quantity < quantities[product_id]:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient stock for product '{db_product.name}'. Available: {db_product.stock_quantity}, requested: {quantities[product_id]}")
+
+    requested = case(quantities, value=models.Product.product_id)
+    result = db.execute(
+        update(models.Product)
+        .filter(models.Product.product_id.in_(product_ids), models.Product.stock_quantity >= requested)
+        .values(stock_quantity=models.Product.stock_quantity - requested)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(product_ids):
+        # Only reachable on backends without row locks (e.g. SQLite): another checkout won the race.
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Stock changed while placing the order, please retry.")
+
+    for db_product in db_products:
+        db.expire(db_product, ["stock_quantity", "updated_at"])
+    return products_by_id
+
+def release_stock(db: Session, quantities: Dict[int, int]):
+    """
+    Returns `quantities` (product_id -> units) to stock with a single UPDATE. Does not commit.
+    """
+    if not quantities:
+        return
+    returned = case(quantities, value=models.Product.product_id)
+    db.execute(
+        update(models.Product)
+        .filter(models.Product.product_id.in_(sorted(quantities)))
+        .values(stock_quantity=models.Product.stock_quantity + returned)
+        .execution_options(synchronize_session=False)
+    )
 
 def create_product(db: Session, product: schemas.ProductCreate):
     db_product = models.Product(**product.model_dump()) 
     db.add(db_product)
     db.commit()
+    invalidate_products()
     db.refresh(db_product)
     return db_product
 
@@ -24,6 +294,7 @@ def update_product(db: Session, product_id: int, product_update: schemas.Product
             setattr(db_product, key, value)
         db.add(db_product) 
         db.commit()
+        invalidate_products(product_id)
         db.refresh(db_product)
         return db_product
     return None
@@ -33,5 +304,131 @@ def delete_product(db: Session, product_id: int):
     if db_product:
         db.delete(db_product)
         db.commit()
+        invalidate_products(product_id)
         return True 
-    return False
\ No newline at end of file
+    return False
+
+# Columns of a product in bulk imports and exports; exports add the timestamps.
+BULK_COLUMNS = ("product_id", "name", "description", "price", "stock_quantity", "image_url", "category_id")
+EXPORT_COLUMNS = BULK_COLUMNS + ("created_at", "updated_at")
+
+def _row_error(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}" for error in exc.errors())
+
+def _write_product_rows(db: Session, rows: List[dict], upsert: bool) -> int:
+    dialect_name = get_engine().dialect.name
+    products = models.Product.__table__
+    new_rows = [{key: value for key, value in row.items() if key != "product_id"} for row in rows if row["product_id"] is None]
+    keyed_rows = [row for row in rows if row["product_id"] is not None]
+    for group, keyed in ((new_rows, False), (keyed_rows, True)):
+        if not group:
+            continue
+        step = max_rows_per_statement(dialect_name, len(group[0]))
+        for start in range(0, len(group), step):
+            chunk = group[start:start + step]
+            if keyed and upsert:
+                update_columns = [column for column in BULK_COLUMNS if column != "product_id"]
+                db.execute(upsert_statement(dialect_name, products, chunk, ["product_id"], update_columns, {"updated_at": func.now()}))
+            else:
+                db.execute(insert(products).values(chunk))
+    if keyed_rows and dialect_name == "postgresql":
+        # Explicit ids do not advance the sequence; move it past them so later inserts do not collide.
+        db.execute(text("SELECT setval(pg_get_serial_sequence('products', 'product_id'), (SELECT max(product_id) FROM products))"))
+    return len(rows)
+
+def write_product_batch(db: Session, rows: List[Tuple[int, dict]], upsert: bool) -> Tuple[int, List[Tuple[int, str]]]:
+    """
+    Writes a batch of validated (row number, values) in one transaction. If the database rejects
+    the batch, the rows are retried one by one in savepoints, so only the offending ones are reported.
+    Returns the number of rows written and the (row number, error) of the rejected ones.
+    """
+    try:
+        written = _write_product_rows(db, [values for _, values in rows], upsert)
+        db.commit()
+        return written, []
+    except IntegrityError:
+        db.rollback()
+    written, errors = 0, []
+    for row_number, values in rows:
+        try:
+            with db.begin_nested():
+                written += _write_product_rows(db, [values], upsert)
+        except IntegrityError as exc:
+            errors.append((row_number, str(exc.orig)))
+    db.commit()
+    return written, errors
+
+def _category_ids(db: Session):
+    category_ids = set(db.execute(select(models.Category.category_id)).scalars())
+    db.rollback()
+    return category_ids
+
+async def import_products(db: Session, records: AsyncIterator[bulk_io.Record], upsert: bool = False, batch_size: int = 1000) -> schemas.ProductImportReport:
+    """
+    Validates records as they are read from the upload and writes them in batches of `batch_size`,
+    each in its own transaction, so memory stays bounded and a bad row does not fail the rest.
+    Rows with a product_id replace that product when `upsert`, otherwise they are inserted with that id.
+    """
+    if upsert and not supports_upsert(get_engine().dialect.name):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Upsert is not supported by this database")
+    category_ids = await run_in_threadpool(_category_ids, db)
+    received, written, errors = 0, 0, []
+    failed = 0
+
+    def reject(row_number: int, error: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < settings.BULK_IMPORT_MAX_ERRORS:
+            errors.append(schemas.ProductImportError(row=row_number, error=error))
+
+    batch: List[Tuple[int, dict]] = []
+
+    async def flush():
+        nonlocal written
+        batch_written, batch_errors = await run_in_threadpool(write_product_batch, db, batch, upsert)
+        written += batch_written
+        for row_number, error in batch_errors:
+            reject(row_number, error)
+        batch.clear()
+
+    try:
+        async for row_number, fields, error in records:
+            received += 1
+            if error is not None:
+                reject(row_number, error)
+                continue
+            try:
+                row = schemas.ProductImportRow.model_validate(fields)
+            except ValidationError as exc:
+                reject(row_number, _row_error(exc))
+                continue
+            if row.category_id not in category_ids:
+                reject(row_number, f"category_id: category {row.category_id} does not exist")
+                continue
+            batch.append((row_number, row.model_dump(include=set(BULK_COLUMNS))))
+            if len(batch) >= batch_size:
+                await flush()
+        if batch:
+            await flush()
+    finally:
+        if written:
+            invalidate_catalog()
+    return schemas.ProductImportReport(received=received, written=written, failed=failed, errors=errors)
+
+def export_products(format: str, batch_size: int = 1000) -> Iterator[str]:
+    """
+    Yields every product as CSV or NDJSON text, `batch_size` rows at a time, from a server-side
+    cursor where the driver supports one. Uses its own session, which lives as long as the iteration.
+    """
+    columns = [models.Product.__table__.c[column] for column in EXPORT_COLUMNS]
+    with ReadSessionLocal() as db:
+        result = db.execute(
+            select(*columns).order_by(models.Product.product_id).execution_options(yield_per=batch_size)
+        )
+        if format == "csv":
+            yield bulk_io.csv_lines(EXPORT_COLUMNS, [])
+        for rows in result.partitions():
+            if format == "csv":
+                yield bulk_io.csv_lines(EXPORT_COLUMNS, rows, header=False)
+            else:
+                yield bulk_io.ndjson_lines(EXPORT_COLUMNS, rows)
@@ -0,0 +1,252 @@
+# backend/app/services/report.py
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, and_, cast, delete, desc, func, insert, or_, select, union_all, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import models
+from app.database.session import get_engine
+from app.database.upsert import supports_upsert, upsert_statement
+
+# Statuses counted as sales when a report is not given any: everything but cancelled orders.
+SALES_STATUSES = ('pending', 'processing', 'shipped', 'delivered')
+
+# (product_id, quantity, price_at_purchase)
+SoldItem = Tuple[int, int, Decimal]
+
+def sales_day(order_date: datetime) -> date:
+    """
+    The UTC calendar day an order counts towards. Must agree with sales_day_column().
+    """
+    if order_date.tzinfo is not None:
+        order_date = order_date.astimezone(timezone.utc)
+    return order_date.date()
+
+def sales_day_column(column, dialect_name: str):
+    # SQL counterpart of sales_day(). SQLite keeps CURRENT_TIMESTAMP (UTC) as text; MySQL has no time zones here.
+    if dialect_name == "postgresql":
+        return func.date(func.timezone("UTC", column))
+    return func.date(column)
+
+def sales_month(day: date) -> date:
+    return day.replace(day=1)
+
+def sales_month_column(column, dialect_name: str):
+    # SQL counterpart of sales_month(), for a Date column.
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc("month", column), Date)
+    if dialect_name == "mysql":
+        return func.date_format(column, "%Y-%m-01")
+    return func.date(column, "start of month")
+
+def summary_shard(order_id: int) -> int:
+    return order_id % settings.REPORT_SUMMARY_SHARDS
+
+def _increment(db: Session, table, keys: Sequence[str], counters: Sequence[str], rows: List[dict]):
+    """
+    Adds each row's `counters` to the row with the same `keys`, creating it if missing.
+    Rows are written in key order so concurrent transactions take their locks in the same order.
+    """
+    if not rows:
+        return
+    rows = sorted(rows, key=lambda row: tuple(row[key] for key in keys))
+    dialect_name = get_engine().dialect.name
+    if supports_upsert(dialect_name):
+        db.execute(upsert_statement(dialect_name, table, rows, keys, (), increment_columns=counters))
+        return
+    for row in rows:
+        result = db.execute(
+            update(table)
+            .filter(and_(*(table.c[key] == row[key] for key in keys)))
+            .values({counter: table.c[counter] + row[counter] for counter in counters})
+        )
+        if result.rowcount == 0:
+            db.execute(insert(table).values(row))
+
+def _record(db: Session, order: models.Order, items: Iterable[SoldItem], sign: int, whole_order: bool):
+    day = sales_day(order.order_date)
+    totals: Dict[int, list] = {}
+    for product_id, quantity, price in items:
+        total = totals.setdefault(product_id, [0, Decimal('0.00')])
+        total[0] += quantity
+        total[1] += price * quantity
+    product_rows = [
+        {"product_id": product_id, "status": order.status, "units": sign * units, "revenue": sign * revenue}
+        for product_id, (units, revenue) in totals.items()
+    ]
+    _increment(db, models.DailyProductSales.__table__, ("sales_date", "product_id", "status"), ("units", "revenue"), [
+        {"sales_date": day, **row} for row in product_rows
+    ])
+    _increment(db, models.MonthlyProductSales.__table__, ("sales_month", "product_id", "status"), ("units", "revenue"), [
+        {"sales_month": sales_month(day), **row} for row in product_rows
+    ])
+    units = sum(units for units, _ in totals.values())
+    if whole_order or units:
+        _increment(db, models.DailyOrderSummary.__table__, ("sales_date", "status", "shard"), ("orders", "revenue", "units"), [
+            {
+                "sales_date": day,
+                "status": order.status,
+                "shard": summary_shard(order.order_id),
+                "orders": sign if whole_order else 0,
+                "revenue": sign * order.total_amount if whole_order else 0,
+                "units": sign * units,
+            }
+        ])
+
+def record_order_items(db: Session, order: models.Order, items: Iterable[SoldItem], sign: int = 1):
+    """
+    Adds (sign=1) or removes (sign=-1) `items` of `order` from the product sales and the units of the
+    daily summary. Does not commit.
+    """
+    _record(db, order, items, sign, whole_order=False)
+
+def record_order(db: Session, order: models.Order, items: Iterable[SoldItem], sign: int = 1):
+    """
+    Adds (sign=1) or removes (sign=-1) `order` and its `items` from the rollups, in the caller's
+    transaction so reports never disagree with the orders they summarize. Does not commit.
+    """
+    _record(db, order, items, sign, whole_order=True)
+
+def order_items_sold(db: Session, order_id: int) -> List[SoldItem]:
+    return [tuple(row) for row in db.execute(
+        select(models.OrderItem.product_id, models.OrderItem.quantity, models.OrderItem.price_at_purchase)
+        .filter(models.OrderItem.order_id == order_id)
+    ).all()]
+
+def rebuild_rollups(connection: Connection):
+    """
+    Recomputes the rollups from orders and order_items with INSERT ... SELECT statements.
+    """
+    dialect_name = connection.dialect.name
+    day = sales_day_column(models.Order.order_date, dialect_name)
+    connection.execute(delete(models.DailyProductSales))
+    connection.execute(delete(models.MonthlyProductSales))
+    connection.execute(delete(models.DailyOrderSummary))
+    connection.execute(insert(models.DailyProductSales).from_select(
+        ["sales_date", "product_id", "status", "units", "revenue"],
+        select(
+            day, models.OrderItem.product_id, models.Order.status,
+            func.sum(models.OrderItem.quantity),
+            func.sum(models.OrderItem.quantity * models.OrderItem.price_at_purchase),
+        )
+        .join(models.Order, models.Order.order_id == models.OrderItem.order_id)
+        .group_by(day, models.OrderItem.product_id, models.Order.status)
+    ))
+    month = sales_month_column(models.DailyProductSales.sales_date, dialect_name)
+    connection.execute(insert(models.MonthlyProductSales).from_select(
+        ["sales_month", "product_id", "status", "units", "revenue"],
+        select(
+            month, models.DailyProductSales.product_id, models.DailyProductSales.status,
+            func.sum(models.DailyProductSales.units), func.sum(models.DailyProductSales.revenue),
+        )
+        .group_by(month, models.DailyProductSales.product_id, models.DailyProductSales.status)
+    ))
+    shard = models.Order.order_id % settings.REPORT_SUMMARY_SHARDS
+    units = (
+        select(func.coalesce(func.sum(models.OrderItem.quantity), 0))
+        .filter(models.OrderItem.order_id == models.Order.order_id)
+        .scalar_subquery()
+    )
+    connection.execute(insert(models.DailyOrderSummary).from_select(
+        ["sales_date", "status", "shard", "orders", "revenue", "units"],
+        select(day, models.Order.status, shard, func.count(), func.sum(models.Order.total_amount), func.sum(units))
+        .group_by(day, models.Order.status, shard)
+    ))
+
+def _sales_filter(table, start: date, end: date, statuses: Optional[Sequence[str]]):
+    return and_(table.sales_date >= start, table.sales_date <= end, table.status.in_(statuses or SALES_STATUSES))
+
+def _whole_months(start: date, end: date) -> Optional[Tuple[date, date]]:
+    # The first day of the first and of the day after the last calendar month lying wholly within [start, end].
+    first = start if start.day == 1 else sales_month(start + timedelta(days=32 - start.day))
+    after = sales_month(end + timedelta(days=1))
+    return (first, after) if first < after else None
+
+def _product_sales(start: date, end: date, statuses: Optional[Sequence[str]]):
+    """
+    (product_id, units, revenue) rows that sum to each product's sales between `start` and `end`:
+    monthly rows for whole months, daily rows for the days before and after them.
+    """
+    Daily, Monthly = models.DailyProductSales, models.MonthlyProductSales
+    statuses = statuses or SALES_STATUSES
+    months = _whole_months(start, end)
+    if months is None:
+        return (
+            select(Daily.product_id, Daily.units, Daily.revenue)
+            .filter(_sales_filter(Daily, start, end, statuses))
+            .subquery()
+        )
+    first, after = months
+    return union_all(
+        select(Monthly.product_id, Monthly.units, Monthly.revenue)
+        .filter(Monthly.sales_month >= first, Monthly.sales_month < after, Monthly.status.in_(statuses)),
+        select(Daily.product_id, Daily.units, Daily.revenue)
+        .filter(
+            or_(and_(Daily.sales_date >= start, Daily.sales_date < first), and_(Daily.sales_date >= after, Daily.sales_date <= end)),
+            Daily.status.in_(statuses),
+        ),
+    ).subquery()
+
+def daily_revenue(db: Session, start: date, end: date, statuses: Optional[Sequence[str]] = None) -> List[dict]:
+    """
+    Orders, revenue and units sold per day between `start` and `end` (inclusive). Days without orders are omitted.
+    """
+    Summary = models.DailyOrderSummary
+    rows = db.execute(
+        select(Summary.sales_date, func.sum(Summary.orders), func.sum(Summary.revenue), func.sum(Summary.units))
+        .filter(_sales_filter(Summary, start, end, statuses))
+        .group_by(Summary.sales_date)
+        .having(func.sum(Summary.orders) > 0)
+        .order_by(Summary.sales_date)
+    ).all()
+    return [{"day": day, "orders": orders, "revenue": revenue, "units": units} for day, orders, revenue, units in rows]
+
+def top_products(db: Session, start: date, end: date, statuses: Optional[Sequence[str]] = None, limit: int = 10, by: str = "revenue") -> List[dict]:
+    """
+    The `limit` best-selling products between `start` and `end`, ranked by revenue or units.
+    """
+    sales = _product_sales(start, end, statuses)
+    units = func.sum(sales.c.units).label("units")
+    revenue = func.sum(sales.c.revenue).label("revenue")
+    ranked = (
+        select(sales.c.product_id, units, revenue)
+        .group_by(sales.c.product_id)
+        .having(units > 0)
+        .order_by(desc(revenue if by == "revenue" else units), sales.c.product_id)
+        .limit(limit)
+        .subquery()
+    )
+    rows = db.execute(
+        select(ranked.c.product_id, models.Product.name, ranked.c.units, ranked.c.revenue)
+        .outerjoin(models.Product, models.Product.product_id == ranked.c.product_id)
+        .order_by(desc(ranked.c.revenue if by == "revenue" else ranked.c.units), ranked.c.product_id)
+    ).all()
+    return [{"product_id": product_id, "name": name, "units": units, "revenue": revenue} for product_id, name, units, revenue in rows]
+
+def category_sales(db: Session, start: date, end: date, statuses: Optional[Sequence[str]] = None) -> List[dict]:
+    """
+    Units and revenue per category between `start` and `end`, by each product's current category.
+    """
+    sales = _product_sales(start, end, statuses)
+    # Summed per product first, so the join to products and categories sees one row per product.
+    per_product = (
+        select(sales.c.product_id, func.sum(sales.c.units).label("units"), func.sum(sales.c.revenue).label("revenue"))
+        .group_by(sales.c.product_id)
+        .subquery()
+    )
+    units = func.sum(per_product.c.units).label("units")
+    revenue = func.sum(per_product.c.revenue).label("revenue")
+    rows = db.execute(
+        select(models.Category.category_id, models.Category.name, units, revenue)
+        .select_from(per_product)
+        .join(models.Product, models.Product.product_id == per_product.c.product_id)
+        .join(models.Category, models.Category.category_id == models.Product.category_id)
+        .group_by(models.Category.category_id, models.Category.name)
+        .having(units > 0)
+        .order_by(desc(revenue), models.Category.category_id)
+    ).all()
+    return [{"category_id": category_id, "name": name, "units": units, "revenue": revenue} for category_id, name, units, revenue in rows]
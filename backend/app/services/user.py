@@ -1,25 +1,28 @@
 # backend/app/services/user.py
+from typing import Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import select
-from passlib.context import CryptContext 
+from app.core.pagination import decode_cursor, keyset_after
+from app.core.security import get_password_hash, revoke_user_tokens
+from app.core.streaming import iter_serialized
 from app.database import models
 from app.schemas import user as schemas 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def _user_query(user_id: int):
+    return select(models.User).filter(models.User.user_id == user_id)
 
-def get_password_hash(password: str) -> str:
-    """Hashes a plain password."""
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifies a plain password against a hashed password."""
-    return pwd_context.verify(plain_password, hashed_password)
+def _users_query(skip: int, limit: int, cursor: Optional[str]):
+    query = select(models.User).order_by(models.User.user_id).limit(limit)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, models.User.user_id)
+        return query.filter(keyset_after([models.User.user_id], [last_id]))
+    return query.offset(skip)
 
 def get_user(db: Session, user_id: int):
     """
     Retrieves a single user by their ID.
     """
-    return db.execute(select(models.User).filter(models.User.user_id == user_id)).scalar_one_or_none()
+    return db.execute(_user_query(user_id)).scalar_one_or_none()
 
 def get_user_by_email(db: Session, email: str):
     """
@@ -33,11 +36,18 @@ def get_user_by_username(db: Session, username: str):
     """
     return db.execute(select(models.User).filter(models.User.username == username)).scalar_one_or_none()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
+def get_users(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
     """
     Retrieves a list of users.
+    Pages by user_id after `cursor` when given, otherwise by offset.
+    """
+    return db.execute(_users_query(skip, limit, cursor)).scalars().all()
+
+def stream_users(format: str, cursor: Optional[str] = None):
     """
-    return db.execute(select(models.User).offset(skip).limit(limit)).scalars().all()
+    Every user after `cursor`, serialized as `format` ("ndjson" or "json") batch by batch.
+    """
+    return iter_serialized(_users_query(0, None, cursor), schemas.User, format)
 
 def create_user(db: Session, user: schemas.UserCreate):
     """
@@ -56,7 +66,7 @@ def create_user(db: Session, user: schemas.UserCreate):
         zip_code=user.zip_code,
         country=user.country,
         phone_number=user.phone_number,
-        role=user.role
+        role='customer'
     )
     db.add(db_user)
     db.commit()
@@ -80,13 +90,29 @@ def update_user(db: Session, user_id: int, user_update: schemas.UserBase):
         return db_user
     return None
 
+def set_user_role(db: Session, user_id: int, role: str):
+    """
+    Changes a user's role. The tokens they already have carry the old role, so a change revokes them:
+    the user logs in again for a token with the new one.
+    """
+    db_user = db.execute(select(models.User).filter(models.User.user_id == user_id)).scalar_one_or_none()
+    if db_user is None:
+        return None
+    if db_user.role != role:
+        db_user.role = role
+        db.commit()
+        revoke_user_tokens(db, user_id)
+    db.refresh(db_user)
+    return db_user
+
 def delete_user(db: Session, user_id: int):
     """
-    Deletes a user from the database.
+    Deletes a user from the database, revoking the tokens they still have.
     """
     db_user = db.execute(select(models.User).filter(models.User.user_id == user_id)).scalar_one_or_none()
     if db_user:
         db.delete(db_user)
         db.commit()
+        revoke_user_tokens(db, user_id)
         return True
     return False 
\ No newline at end of file
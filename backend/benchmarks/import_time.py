@@ -0,0 +1,124 @@
+# backend/benchmarks/import_time.py
+"""
+Measures the cold start of `import app.api.api` in fresh interpreters and fails when it exceeds a
+budget, or when the import loads something that is meant to wait for the app's lifespan.
+
+    python -m benchmarks.import_time                      # median of 5 runs against the default budget
+    python -m benchmarks.import_time --budget-ms 800 --runs 9
+    python -m benchmarks.import_time --top 30             # longer -X importtime breakdown
+
+Exit status 1 when over budget or when a deferred module was imported.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+APP_MODULE = "app.api.api"
+
+# Wall-clock budget for the import, in milliseconds. Most of it is FastAPI, SQLAlchemy and pydantic.
+DEFAULT_BUDGET_MS = 1500.0
+
+# Created on first use or from the lifespan, never at import: password hashing and the DB drivers.
+DEFERRED_MODULES = ("passlib", "bcrypt", "sqlite3", "aiosqlite", "psycopg2", "psycopg", "asyncpg", "pymysql", "aiomysql")
+
+_TIMED_IMPORT = f"""
+import json, sys, time
+started = time.perf_counter()
+import {APP_MODULE}
+print(json.dumps({{"ms": (time.perf_counter() - started) * 1000, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _environment() -> Dict[str, str]:
+    env = dict(os.environ)
+    # Importing the settings needs a database URL; nothing connects to it.
+    env.setdefault("DATABASE_URL", "sqlite:///import-time.db")
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    return env
+
+
+def timed_import() -> Tuple[float, List[str]]:
+    """
+    Milliseconds `import app.api.api` took in a fresh interpreter, and the modules it left loaded.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", _TIMED_IMPORT], cwd=BACKEND_DIR, env=_environment(), capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result["ms"], result["modules"]
+
+
+def import_profile() -> List[Tuple[str, int, int]]:
+    """
+    (module, self µs, cumulative µs) for every module the import loads, parsed from -X importtime.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {APP_MODULE}"],
+        cwd=BACKEND_DIR, env=_environment(), capture_output=True, text=True, check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def _top_level_cumulative(rows: List[Tuple[str, int, int]], prefixes: Tuple[str, ...]) -> Dict[str, int]:
+    # Cumulative time of the first module imported from each package: the cost of that package.
+    totals: Dict[str, int] = {}
+    for name, _self_us, cumulative_us in rows:
+        package = name.split(".")[0]
+        if package in prefixes:
+            totals[package] = max(totals.get(package, 0), cumulative_us)
+    return totals
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help=f"import budget (default: {DEFAULT_BUDGET_MS:.0f})")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to time; the median counts (default: 5)")
+    parser.add_argument("--top", type=int, default=15, help="modules to list by self time (default: 15)")
+    args = parser.parse_args(argv)
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+
+    timings, modules = [], []
+    for _ in range(args.runs):
+        ms, modules = timed_import()
+        timings.append(ms)
+    median = statistics.median(timings)
+    print(f"import {APP_MODULE}: median {median:.0f} ms over {args.runs} runs "
+          f"(min {min(timings):.0f}, max {max(timings):.0f}); budget {args.budget_ms:.0f} ms")
+
+    rows = import_profile()
+    libraries = _top_level_cumulative(rows, ("fastapi", "starlette", "pydantic", "sqlalchemy", "jose", "orjson"))
+    app_self_us = sum(self_us for name, self_us, _ in rows if name == "app" or name.startswith("app."))
+    print("  by package (cumulative, -X importtime): " + ", ".join(
+        f"{package} {us / 1000:.0f} ms" for package, us in sorted(libraries.items(), key=lambda item: -item[1])
+    ) + f", app modules {app_self_us / 1000:.0f} ms")
+    print(f"  slowest modules by self time:")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: -row[1])[:args.top]:
+        print(f"    {self_us / 1000:8.1f} ms  {name}  (cumulative {cumulative_us / 1000:.1f} ms)")
+
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"median import time {median:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    loaded = sorted({name.split(".")[0] for name in modules} & set(DEFERRED_MODULES))
+    if loaded:
+        failures.append(f"imported at startup but meant for the lifespan or first use: {', '.join(loaded)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
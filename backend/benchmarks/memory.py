@@ -0,0 +1,145 @@
+# backend/benchmarks/memory.py
+"""
+Measures the memory of the streaming exports: how far each one raises the peak RSS of the process
+serving it, with its time to first byte and total time. Each export runs alone in a fresh interpreter
+that calls the ASGI app directly and drops every chunk as it arrives (httpx's ASGI transport would
+hold the whole body and measure the client instead). A buffered page of orders is measured alongside
+for contrast: its memory grows with the page size, the streams' should not grow with the table.
+
+    python -m benchmarks.memory                              # every export
+    python -m benchmarks.memory orders_ndjson products_csv
+    python -m benchmarks.memory --page-limit 20000
+
+Seed the database first (python -m benchmarks.seed).
+"""
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# name: (path, query string). {page_limit} is filled in from --page-limit.
+EXPORTS: Dict[str, Tuple[str, str]] = {
+    "orders_ndjson": ("/api/v1/orders/", "stream=ndjson"),
+    "orders_json": ("/api/v1/orders/", "stream=json"),
+    "products_ndjson": ("/api/v1/products/", "stream=ndjson"),
+    "users_ndjson": ("/api/v1/users/", "stream=ndjson"),
+    "products_csv": ("/api/v1/products/export", "format=csv"),
+    "orders_page": ("/api/v1/orders/", "limit={page_limit}"),
+}
+
+DEFAULT_PAGE_LIMIT = 10_000
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux, in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+async def fetch(app, path: str, query: str, token: str) -> dict:
+    """
+    GETs `path` from the ASGI `app`, counting the body's bytes without keeping them.
+    """
+    started = time.perf_counter()
+    figures = {"status": None, "bytes": 0, "first_byte_ms": None}
+    done = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Streaming responses listen for a disconnect while they send: there is none until the end.
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            figures["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            if body and figures["first_byte_ms"] is None:
+                figures["first_byte_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            figures["bytes"] += len(body)
+            if not message.get("more_body", False):
+                done.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": query.encode(),
+        "headers": [(b"host", b"benchmark"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0), "server": ("benchmark", 80),
+    }
+    await app(scope, receive, send)
+    done.set()
+    figures["seconds"] = round(time.perf_counter() - started, 3)
+    return figures
+
+
+def measure(name: str, page_limit: int) -> dict:
+    """
+    Runs one export in this process; call it in a fresh interpreter, since the peak RSS never goes down.
+    """
+    from app.api.api import app
+    from benchmarks.scenarios import Dataset
+
+    token = Dataset.load().admin_token
+    path, query = EXPORTS[name]
+
+    async def run():
+        # A one-row page first, so the drivers, pools and serializers are loaded before the baseline.
+        await fetch(app, "/api/v1/orders/", "limit=1", token)
+        before = peak_rss_mb()
+        figures = await fetch(app, path, query.format(page_limit=page_limit), token)
+        figures["peak_rss_mb"] = round(peak_rss_mb(), 1)
+        figures["rss_growth_mb"] = round(peak_rss_mb() - before, 1)
+        return figures
+
+    return asyncio.run(run())
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("exports", nargs="*", metavar="export", help=f"exports to measure (default: all): {', '.join(EXPORTS)}")
+    parser.add_argument("--page-limit", type=int, default=DEFAULT_PAGE_LIMIT, help=f"size of the buffered orders_page (default: {DEFAULT_PAGE_LIMIT})")
+    parser.add_argument("--measure", metavar="EXPORT", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.page_limit)))
+        return 0
+
+    names = args.exports or list(EXPORTS)
+    unknown = [name for name in names if name not in EXPORTS]
+    if unknown:
+        parser.error(f"unknown export(s): {', '.join(unknown)}")
+
+    print(f"{'export':16} {'status':>6} {'MB sent':>9} {'seconds':>9} {'first byte ms':>14} {'peak RSS MB':>12} {'RSS growth MB':>14}")
+    failed = False
+    for name in names:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.memory", "--measure", name, "--page-limit", str(args.page_limit)],
+            cwd=BACKEND_DIR, capture_output=True, text=True,
+        )
+        if output.returncode != 0:
+            print(f"{name:16} failed:\n{output.stderr}", file=sys.stderr)
+            failed = True
+            continue
+        figures = json.loads(output.stdout.strip().splitlines()[-1])
+        first_byte = "-" if figures["first_byte_ms"] is None else f"{figures['first_byte_ms']:.2f}"
+        print(f"{name:16} {figures['status']:>6} {figures['bytes'] / 1e6:9.2f} {figures['seconds']:9.3f} {first_byte:>14} "
+              f"{figures['peak_rss_mb']:12.1f} {figures['rss_growth_mb']:14.1f}")
+        failed = failed or figures["status"] != 200
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+# backend/benchmarks/run.py
+"""
+Runs the scenarios of benchmarks/scenarios.py against the API and reports p50/p95/p99 latency,
+requests per second and SQL statements per request (from GET /internal/metrics).
+
+    python -m benchmarks.run browse search                        # in-process, through an ASGI transport
+    python -m benchmarks.run storefront --target http://127.0.0.1:8000 --concurrency 32
+    python -m benchmarks.run --all --save-baseline sqlite-small   # store the results as a baseline
+    python -m benchmarks.run --all --compare sqlite-small         # exit status 1 on a regression
+    python -m benchmarks.run browse admin --ab async              # sync vs async sessions, same concurrency
+    python -m benchmarks.run browse --ab profiling                # overhead of the profiling middleware
+    python -m benchmarks.run orders_page --ab serializer          # pydantic-validated vs trusted responses
+
+Seed the database first (python -m benchmarks.seed). A --target server must use the same DATABASE_URL
+and SECRET_KEY as this process, which reads the dataset size and issues tokens, and report statements
+per request only with PROFILING_ENABLED=true. --ab runs the scenarios in-process twice, each side in
+its own interpreter since settings are read when the app is imported.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+# SQL statements per request come from the profiling metrics, so in-process runs enable them unless told
+# otherwise. Set before benchmarks.scenarios imports the app's settings.
+os.environ.setdefault("PROFILING_ENABLED", "true")
+
+from benchmarks.scenarios import CHECKS, SCENARIOS, Bench, Dataset, Sample
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+# Relative slack before a slower p95 or a lower throughput counts as a regression, and the absolute
+# slack in milliseconds below which p95 differences are treated as noise.
+DEFAULT_TOLERANCE = 0.25
+P95_NOISE_MS = 2.0
+
+# The two sides of each --ab comparison: (name, environment overrides, extra arguments of this script).
+AB_COMPARISONS: Dict[str, Tuple[Tuple[str, Dict[str, str], List[str]], ...]] = {
+    "async": (
+        ("sync", {"DATABASE_ASYNC": "false"}, []),
+        ("async", {"DATABASE_ASYNC": "true"}, []),
+    ),
+    "profiling": (
+        ("off", {"PROFILING_ENABLED": "false", "SLOW_QUERY_THRESHOLD_MS": "-1", "SERVER_TIMING_HEADER": "false"}, []),
+        ("on", {"PROFILING_ENABLED": "true"}, []),
+    ),
+    "serializer": (
+        ("pydantic", {}, ["--validate-responses"]),
+        ("trusted", {}, []),
+    ),
+}
+
+_METRIC_LINE = re.compile(r'^(http_request_db_statements_(?:sum|count)|http_request_db_seconds_total)\{(.*)\} (\S+)$')
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    # Nearest-rank percentile of an already sorted list.
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+async def _db_totals(client: httpx.AsyncClient, dataset: Dataset) -> Optional[Dict[str, float]]:
+    """
+    Totals of statements, DB seconds and requests over every route but the metrics endpoint itself,
+    or None when the server runs without PROFILING_ENABLED.
+    """
+    response = await client.get("/internal/metrics", headers={"Authorization": f"Bearer {dataset.admin_token}"})
+    if response.status_code != 200:
+        return None
+    totals = {"http_request_db_statements_sum": 0.0, "http_request_db_statements_count": 0.0, "http_request_db_seconds_total": 0.0}
+    for line in response.text.splitlines():
+        match = _METRIC_LINE.match(line)
+        if match and 'route="/internal/metrics"' not in match.group(2):
+            totals[match.group(1)] += float(match.group(3))
+    return totals if totals["http_request_db_statements_count"] else None
+
+
+async def _run_actions(scenario, client, dataset: Dataset, actions: int, concurrency: int, seed: int) -> List[Sample]:
+    samples: List[Sample] = []
+    remaining = actions
+
+    async def worker(index: int):
+        nonlocal remaining
+        bench = Bench(client, dataset, random.Random(seed * 1000 + index), samples)
+        while remaining > 0:
+            remaining -= 1
+            try:
+                await scenario(bench)
+            except httpx.HTTPError as exc:
+                bench.fail("transport", repr(exc))
+
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return samples
+
+
+def summarize(samples: List[Sample], seconds: float, before: Optional[dict], after: Optional[dict]) -> dict:
+    timed = [sample for sample in samples if sample.status_code]
+    latencies = sorted(sample.seconds * 1000 for sample in timed)
+    statuses: Dict[str, int] = {}
+    for sample in timed:
+        statuses[str(sample.status_code)] = statuses.get(str(sample.status_code), 0) + 1
+    errors = [sample.error for sample in samples if sample.error]
+
+    by_label = {}
+    for label in sorted({sample.label for sample in timed}):
+        values = sorted(sample.seconds * 1000 for sample in timed if sample.label == label)
+        by_label[label] = {"requests": len(values), "p50_ms": round(percentile(values, 0.5), 2), "p95_ms": round(percentile(values, 0.95), 2)}
+
+    result = {
+        "requests": len(timed),
+        "seconds": round(seconds, 3),
+        "rps": round(len(timed) / seconds, 1) if seconds else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        "queries_per_request": None,
+        "db_ms_per_request": None,
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "statuses": statuses,
+        "by_label": by_label,
+    }
+    if before is not None and after is not None:
+        requests = after["http_request_db_statements_count"] - before["http_request_db_statements_count"]
+        if requests > 0:
+            result["queries_per_request"] = round((after["http_request_db_statements_sum"] - before["http_request_db_statements_sum"]) / requests, 2)
+            result["db_ms_per_request"] = round((after["http_request_db_seconds_total"] - before["http_request_db_seconds_total"]) * 1000 / requests, 3)
+    return result
+
+
+async def run_scenario(name: str, client: httpx.AsyncClient, dataset: Dataset, actions: int, concurrency: int, warmup: int, seed: int) -> dict:
+    scenario = SCENARIOS[name]
+    check = CHECKS[name](dataset) if name in CHECKS else None
+    if warmup:
+        await _run_actions(scenario, client, dataset, warmup, concurrency, seed + 1)
+    before = await _db_totals(client, dataset)
+    started = time.perf_counter()
+    samples = await _run_actions(scenario, client, dataset, actions, concurrency, seed)
+    seconds = time.perf_counter() - started
+    after = await _db_totals(client, dataset)
+    if check is not None:
+        # Recorded like Bench.fail: untimed samples that count as errors.
+        samples.extend(Sample(f"{name} invariant", 0.0, 0, f"{name}: {violation}") for violation in check())
+    return summarize(samples, seconds, before, after)
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """
+    The regressions of `results` against `baseline`, scenario by scenario.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance) and result["p95_ms"] - base["p95_ms"] > P95_NOISE_MS:
+            regressions.append(f"{name}: p95 {result['p95_ms']} ms, baseline {base['p95_ms']} ms")
+        if result["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {result['rps']} req/s, baseline {base['rps']} req/s")
+        # Statement counts barely vary between runs, so any real increase (an N+1 query, say) is flagged.
+        if result["queries_per_request"] is not None and base.get("queries_per_request") is not None \
+                and result["queries_per_request"] > base["queries_per_request"] * 1.1 + 0.05:
+            regressions.append(f"{name}: {result['queries_per_request']} queries/request, baseline {base['queries_per_request']}")
+        if result["errors"] and not base["errors"]:
+            regressions.append(f"{name}: {result['errors']} errors, baseline none ({'; '.join(result['error_samples'])})")
+    return regressions
+
+
+def _print_result(name: str, result: dict):
+    queries = "-" if result["queries_per_request"] is None else f"{result['queries_per_request']:.2f}"
+    print(f"{name:16} {result['requests']:7} {result['rps']:9.1f} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} {result['p99_ms']:9.2f} {queries:>9} {result['errors']:7}")
+    for label, figures in result["by_label"].items():
+        print(f"  {label:30} {figures['requests']:7} requests  p50 {figures['p50_ms']:8.2f}  p95 {figures['p95_ms']:8.2f}")
+    for error in result["error_samples"]:
+        print(f"  ! {error}")
+
+
+def validate_responses():
+    """
+    Makes every TrustedSerializer validate its objects into the schema and dump that, as the
+    response_model path did before the serializer existed: the "pydantic" side of --ab serializer.
+    """
+    from pydantic import TypeAdapter
+    from app.core.serialization import TrustedSerializer
+
+    adapters = {}
+
+    def dump(self, obj) -> bytes:
+        return self.schema.model_validate(obj, from_attributes=True).model_dump_json().encode()
+
+    def dump_many(self, objs) -> bytes:
+        if self.schema not in adapters:
+            adapters[self.schema] = TypeAdapter(List[self.schema])
+        adapter = adapters[self.schema]
+        return adapter.dump_json(adapter.validate_python(list(objs), from_attributes=True))
+
+    TrustedSerializer.dump = dump
+    TrustedSerializer.dump_many = dump_many
+
+
+def run_ab(comparison: str, names: List[str], args) -> Dict[str, Dict[str, dict]]:
+    """
+    Runs `names` once per side of `comparison`, each in a fresh interpreter with that side's settings,
+    and prints requests per second and latency side by side. Returns {side: {scenario: result}}.
+    """
+    sides = AB_COMPARISONS[comparison]
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        for side, env, extra in sides:
+            print(f"== {comparison}: {side} {' '.join(f'{key}={value}' for key, value in env.items())}".rstrip(), flush=True)
+            path = Path(scratch) / f"{side}.json"
+            command = [
+                sys.executable, "-m", "benchmarks.run", *names, "--json", str(path), "--requests", str(args.requests),
+                "--concurrency", str(args.concurrency), "--warmup", str(args.warmup), "--seed", str(args.seed), *extra,
+            ]
+            subprocess.run(command, env={**os.environ, **env}, check=True)
+            results[side] = json.loads(path.read_text())["results"]
+    (first, *_), (second, *_) = sides
+    print(f"{'scenario':16} {first + ' req/s':>14} {second + ' req/s':>14} {'change':>8} {first + ' p50':>12} {second + ' p50':>12}")
+    for name in names:
+        a, b = results[first][name], results[second][name]
+        change = f"{(b['rps'] / a['rps'] - 1) * 100:+.1f}%" if a["rps"] else "-"
+        print(f"{name:16} {a['rps']:14.1f} {b['rps']:14.1f} {change:>8} {a['p50_ms']:12.2f} {b['p50_ms']:12.2f}")
+    return results
+
+
+def _client(target: Optional[str]) -> httpx.AsyncClient:
+    if target:
+        return httpx.AsyncClient(base_url=target, timeout=60)
+    from app.api.api import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60)
+
+
+async def run(names: List[str], args) -> Dict[str, dict]:
+    dataset = Dataset.load()
+    print(f"Dataset: {dataset.products:,} products, {dataset.users:,} users, {dataset.categories:,} categories; "
+          f"{'target ' + args.target if args.target else 'in-process'}, concurrency {args.concurrency}")
+    print(f"{'scenario':16} {'requests':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>9} {'errors':>7}")
+    results = {}
+    async with _client(args.target) as client:
+        for name in names:
+            results[name] = await run_scenario(name, client, dataset, args.requests, args.concurrency, args.warmup, args.seed)
+            _print_result(name, results[name])
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", metavar="scenario", help=f"scenarios to run: {', '.join(sorted(SCENARIOS))}")
+    parser.add_argument("--all", action="store_true", help="run every scenario")
+    parser.add_argument("--requests", type=int, default=500, help="actions per scenario; an action may send several requests (default: 500)")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent simulated clients (default: 16)")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured actions before each scenario (default: 50)")
+    parser.add_argument("--target", help="base URL of a running server, e.g. http://127.0.0.1:8000 (default: in-process)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed of the simulated clients (default: 1)")
+    parser.add_argument("--save-baseline", metavar="NAME", help=f"store the results as {BASELINE_DIR.name}/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare with a stored baseline; exit status 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help=f"relative slack for --compare (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument("--json", metavar="PATH", help="also write the results to PATH")
+    parser.add_argument("--ab", choices=sorted(AB_COMPARISONS), help="compare two in-process configurations: async, profiling or serializer")
+    parser.add_argument("--validate-responses", action="store_true", help="validate every response through pydantic, as before the trusted serializer")
+    args = parser.parse_args(argv)
+
+    names = sorted(SCENARIOS) if args.all else args.scenarios
+    if not names:
+        parser.error("name at least one scenario, or pass --all")
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    if args.ab:
+        if args.target or args.save_baseline or args.compare:
+            parser.error("--ab runs in-process and cannot be combined with --target, --save-baseline or --compare")
+        results = run_ab(args.ab, names, args)
+        if args.json:
+            Path(args.json).write_text(json.dumps({"ab": args.ab, "results": results}, indent=2))
+        return 0
+    if args.validate_responses:
+        if args.target:
+            parser.error("--validate-responses changes this process, not a --target server")
+        validate_responses()
+
+    results = asyncio.run(run(names, args))
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "target": args.target or "in-process",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path = BASELINE_DIR / f"{args.save_baseline}.json"
+        path.write_text(json.dumps(report, indent=2))
+        print(f"Baseline saved to {path}")
+    if args.compare:
+        path = BASELINE_DIR / f"{args.compare}.json"
+        if not path.exists():
+            print(f"No baseline at {path}", file=sys.stderr)
+            return 2
+        regressions = compare(results, json.loads(path.read_text())["results"], args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {path.name}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"No regressions against {path.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+# backend/benchmarks/scenarios.py
+"""
+Scripted user actions. Each scenario is an async function that performs one action (one or more
+requests) through a Bench; run.py calls it repeatedly from concurrent workers. A scenario may also
+have an invariant in CHECKS, verified against the database once its run is over.
+"""
+import asyncio
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+from sqlalchemy import func, select, update
+
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from app.core.security import create_access_token
+from app.database import models
+from app.database.session import get_engine
+from app.services.idempotency import REPLAYED_HEADER
+from app.services.product import invalidate_products
+from benchmarks.seed import BENCHMARK_PASSWORD, SEARCH_WORDS
+
+# Customers that get a pre-issued token: the order history scenario acts as one of them.
+TOKEN_USERS = 200
+
+PRODUCT_SORTS = ["product_id", "price", "-price", "created_at", "-created_at", "name"]
+
+# Products every hot checkout competes for, and the stock each is cut to before the run so that
+# it sells out part way through.
+HOT_PRODUCTS = 5
+HOT_STOCK = 100
+
+# Pages of the order list page_depth fetches, by number, and their size.
+PAGE_DEPTHS = (1, 10, 100, 1000)
+PAGE_SIZE = 20
+
+
+@dataclass
+class Dataset:
+    """
+    What the benchmark database holds, read from it once (a local server must share its DATABASE_URL).
+    """
+    products: int
+    users: int
+    categories: int
+    admin_token: str
+    customer_tokens: Dict[int, str] = field(default_factory=dict)
+    orders: int = 0
+
+    @classmethod
+    def load(cls) -> "Dataset":
+        with get_engine().connect() as connection:
+            products = connection.execute(select(func.max(models.Product.product_id))).scalar() or 0
+            users = connection.execute(select(func.max(models.User.user_id))).scalar() or 0
+            categories = connection.execute(select(func.max(models.Category.category_id))).scalar() or 0
+            orders = connection.execute(select(func.max(models.Order.order_id))).scalar() or 0
+        if not products or not users:
+            raise SystemExit("The database is empty: run python -m benchmarks.seed first.")
+        # Issued like /auth/token does, so the run does not start with hundreds of bcrypt logins.
+        admin_token = create_access_token({"sub": "admin", "uid": 1, "role": "admin"})
+        customer_tokens = {
+            user_id: create_access_token({"sub": f"user{user_id}", "uid": user_id, "role": "customer"})
+            for user_id in range(2, min(users, TOKEN_USERS + 1) + 1)
+        }
+        return cls(products, users, categories, admin_token, customer_tokens, orders=orders)
+
+
+@dataclass
+class Sample:
+    label: str
+    seconds: float
+    status_code: int
+    error: Optional[str] = None
+
+
+class Bench:
+    """
+    One worker's view of a run: sends requests, times them and records unexpected outcomes as errors.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, dataset: Dataset, rng: random.Random, samples: List[Sample]):
+        self.client = client
+        self.dataset = dataset
+        self.rng = rng
+        self.samples = samples
+
+    async def request(self, method: str, url: str, label: str, expect: Sequence[int] = (200,), **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        error = None if response.status_code in expect else f"{label}: unexpected status {response.status_code}"
+        self.samples.append(Sample(label, time.perf_counter() - started, response.status_code, error))
+        return response
+
+    def fail(self, label: str, error: str):
+        self.samples.append(Sample(label, 0.0, 0, f"{label}: {error}"))
+
+    def auth(self, token: str) -> dict:
+        return {"Authorization": f"Bearer {token}"}
+
+    def product_id(self) -> int:
+        return self.rng.randint(1, self.dataset.products)
+
+    def customer(self) -> int:
+        return self.rng.choice(list(self.dataset.customer_tokens)) if self.dataset.customer_tokens else 1
+
+    def order_payload(self, product_ids: Sequence[int]) -> dict:
+        return {
+            "user_id": self.customer(),
+            "shipping_city": "Benchville",
+            "order_items": [
+                {"order_id": 0, "product_id": product_id, "quantity": 1, "price_at_purchase": "0"} for product_id in product_ids
+            ],
+        }
+
+
+async def browse(bench: Bench):
+    # A listing page (sometimes filtered by category), then one of its products.
+    params = {"limit": 20, "sort": bench.rng.choice(PRODUCT_SORTS)}
+    if bench.rng.random() < 0.5:
+        params["category_id"] = bench.rng.randint(1, bench.dataset.categories)
+    await bench.request("GET", "/api/v1/products/", "products list", params=params)
+    await bench.request("GET", f"/api/v1/products/{bench.product_id()}", "product detail")
+
+
+async def browse_deep(bench: Bench):
+    # Walks five consecutive pages from a random point of the catalog, following X-Next-Cursor.
+    response = await bench.request("GET", "/api/v1/products/", "products page", params={"limit": 20, "sort": "price"})
+    for _ in range(4):
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+        response = await bench.request("GET", "/api/v1/products/", "products page", params={"limit": 20, "sort": "price", "cursor": cursor})
+
+
+async def page_depth(bench: Bench):
+    # The same pages of the order list reached by cursor and by skip: keyset pages should cost the same
+    # at any depth, offset pages grow with it. Orders, because product pages come from the cache.
+    headers = bench.auth(bench.dataset.admin_token)
+    for depth in PAGE_DEPTHS:
+        after = (depth - 1) * PAGE_SIZE
+        if after >= bench.dataset.orders:
+            break
+        cursor = {"cursor": encode_cursor([after])} if after else {}
+        await bench.request("GET", "/api/v1/orders/", f"orders page {depth} by cursor", params={"limit": PAGE_SIZE, **cursor}, headers=headers)
+        await bench.request("GET", "/api/v1/orders/", f"orders page {depth} by skip", params={"limit": PAGE_SIZE, "skip": after}, headers=headers)
+
+
+async def search(bench: Bench):
+    q = " ".join(bench.rng.sample(SEARCH_WORDS, bench.rng.choice((1, 1, 2))))
+    await bench.request("GET", "/api/v1/products/search", "product search", params={"q": q, "limit": 20})
+
+
+async def checkout(bench: Bench):
+    product_ids = sorted({bench.product_id() for _ in range(bench.rng.randint(1, 4))})
+    await bench.request(
+        "POST", "/api/v1/orders/", "checkout", expect=(201,),
+        json=bench.order_payload(product_ids), headers={"Idempotency-Key": uuid.uuid4().hex},
+    )
+
+
+def _hot_products(dataset: Dataset) -> List[int]:
+    return list(range(1, min(HOT_PRODUCTS, dataset.products) + 1))
+
+
+async def checkout_hot(bench: Bench):
+    # Every order takes stock from the same few products: measures lock contention on their rows.
+    # Near and after a sellout orders are refused (400, or 409 if the stock moved underneath); see no_oversell.
+    product_ids = sorted(bench.rng.sample(_hot_products(bench.dataset), min(2, bench.dataset.products)))
+    await bench.request("POST", "/api/v1/orders/", "hot checkout", expect=(201, 400, 409), json=bench.order_payload(product_ids))
+
+
+def _hot_stock(connection, product_ids: List[int]) -> Dict[int, Tuple[int, int]]:
+    # (units in stock, units ever ordered) of each product.
+    stock = dict(connection.execute(
+        select(models.Product.product_id, models.Product.stock_quantity).filter(models.Product.product_id.in_(product_ids))
+    ).all())
+    sold = dict(connection.execute(
+        select(models.OrderItem.product_id, func.sum(models.OrderItem.quantity))
+        .filter(models.OrderItem.product_id.in_(product_ids))
+        .group_by(models.OrderItem.product_id)
+    ).all())
+    return {product_id: (stock[product_id], sold.get(product_id) or 0) for product_id in product_ids}
+
+
+def no_oversell(dataset: Dataset) -> Callable[[], List[str]]:
+    """
+    Cuts the hot products' stock to HOT_STOCK, and returns the check to run afterwards: no stock
+    below zero, no more units sold than there were, and stock down by exactly the units sold.
+    """
+    product_ids = _hot_products(dataset)
+    with get_engine().begin() as connection:
+        connection.execute(update(models.Product).filter(models.Product.product_id.in_(product_ids)).values(stock_quantity=HOT_STOCK))
+        before = _hot_stock(connection, product_ids)
+    invalidate_products(*product_ids)
+
+    def violations() -> List[str]:
+        with get_engine().connect() as connection:
+            after = _hot_stock(connection, product_ids)
+        found = []
+        for product_id in product_ids:
+            stock, sold = after[product_id][0], after[product_id][1] - before[product_id][1]
+            if stock < 0:
+                found.append(f"product {product_id}: stock is {stock}")
+            if sold > HOT_STOCK:
+                found.append(f"product {product_id}: {sold} units sold of {HOT_STOCK} in stock")
+            elif HOT_STOCK - stock != sold:
+                found.append(f"product {product_id}: stock fell by {HOT_STOCK - stock} but {sold} units were sold")
+        return found
+    return violations
+
+
+async def checkout_retry(bench: Bench):
+    # A client that times out and retries at once: two identical requests with one key are in flight together.
+    # Exactly one may place the order; the other must be refused (409) or get the stored response replayed.
+    payload = bench.order_payload([bench.product_id()])
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    first, second = await asyncio.gather(*(
+        bench.request("POST", "/api/v1/orders/", "idempotent checkout", expect=(201, 409), json=payload, headers=headers)
+        for _ in range(2)
+    ))
+    placed = [response for response in (first, second) if response.status_code == 201 and REPLAYED_HEADER.lower() not in response.headers]
+    if len(placed) != 1:
+        bench.fail("idempotent checkout", f"{len(placed)} orders placed for one Idempotency-Key")
+
+
+async def order_history(bench: Bench):
+    user_id = bench.customer()
+    headers = bench.auth(bench.dataset.customer_tokens.get(user_id, bench.dataset.admin_token))
+    response = await bench.request("GET", f"/api/v1/users/{user_id}/orders", "order history", params={"limit": 20}, headers=headers)
+    cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    if cursor:
+        await bench.request("GET", f"/api/v1/users/{user_id}/orders", "order history page 2", params={"limit": 20, "cursor": cursor}, headers=headers)
+
+
+async def admin(bench: Bench):
+    headers = bench.auth(bench.dataset.admin_token)
+    await bench.request("GET", "/api/v1/users/", "admin users", params={"limit": 100}, headers=headers)
+    await bench.request("GET", "/api/v1/orders/", "admin orders", params={"limit": 50}, headers=headers)
+
+
+async def reports(bench: Bench):
+    headers = bench.auth(bench.dataset.admin_token)
+    end = date.today()
+    params = {"start": str(end - timedelta(days=364)), "end": str(end)}
+    await bench.request("GET", "/api/v1/reports/revenue", "revenue report", params=params, headers=headers)
+    await bench.request("GET", "/api/v1/reports/top-products", "top products report", params=params, headers=headers)
+    await bench.request("GET", "/api/v1/reports/categories", "category report", params=params, headers=headers)
+
+
+async def login(bench: Bench):
+    # Password hashing is deliberately slow; under a storm the pool answers 503 rather than stalling other routes.
+    user_id = bench.customer()
+    await bench.request(
+        "POST", "/api/v1/auth/token", "login", expect=(200, 503),
+        data={"username": f"user{user_id}" if user_id > 1 else "admin", "password": BENCHMARK_PASSWORD},
+    )
+
+
+async def login_storm(bench: Bench):
+    # Half the actions log in, half browse: the browse labels should stay close to those of a plain
+    # browse run, since hashing waits on the password pool instead of holding up other routes.
+    if bench.rng.random() < 0.5:
+        await login(bench)
+    else:
+        await browse(bench)
+
+
+async def orders_page(bench: Bench):
+    # A full page of orders with their users, items and products: the serializer's heaviest response.
+    await bench.request("GET", "/api/v1/orders/", "orders limit=100", params={"limit": 100}, headers=bench.auth(bench.dataset.admin_token))
+
+
+async def storefront(bench: Bench):
+    # The usual traffic mix.
+    roll = bench.rng.random()
+    if roll < 0.55:
+        await browse(bench)
+    elif roll < 0.75:
+        await search(bench)
+    elif roll < 0.9:
+        await order_history(bench)
+    else:
+        await checkout(bench)
+
+
+SCENARIOS: Dict[str, Callable[[Bench], Awaitable[None]]] = {
+    "browse": browse,
+    "browse_deep": browse_deep,
+    "page_depth": page_depth,
+    "search": search,
+    "checkout": checkout,
+    "checkout_hot": checkout_hot,
+    "checkout_retry": checkout_retry,
+    "order_history": order_history,
+    "admin": admin,
+    "orders_page": orders_page,
+    "reports": reports,
+    "login": login,
+    "login_storm": login_storm,
+    "storefront": storefront,
+}
+
+# Invariants: called with the dataset before a scenario's warmup, a check prepares the database and
+# returns the function that lists the violations once the run is over.
+CHECKS: Dict[str, Callable[[Dataset], Callable[[], List[str]]]] = {
+    "checkout_hot": no_oversell,
+}
@@ -0,0 +1,255 @@
+# backend/benchmarks/seed.py
+"""
+Fills the database at DATABASE_URL with a deterministic benchmark dataset through the app's models.
+
+    python -m benchmarks.seed --scale small              # 10k products, 1k users, 100k order items
+    python -m benchmarks.seed --scale full --reset       # 1M products, 100k users, 10M order items
+    python -m benchmarks.seed --products 200000 --order-items 500000
+
+User 1 is the admin "admin"; user N > 1 is "user<N>". All share the password BENCHMARK_PASSWORD.
+The same --seed always produces the same rows, so baselines stay comparable.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import func, insert, select, text
+
+from app.core.security import get_password_hash
+from app.database import models
+from app.database.db_setup import create_db_and_tables
+from app.database.migrations import schema_migrations
+from app.database.session import Base, get_engine
+from app.services.report import rebuild_rollups
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+SCALES = {
+    "small": {"products": 10_000, "users": 1_000, "order_items": 100_000, "categories": 50},
+    "medium": {"products": 100_000, "users": 10_000, "order_items": 1_000_000, "categories": 100},
+    "full": {"products": 1_000_000, "users": 100_000, "order_items": 10_000_000, "categories": 200},
+}
+
+# Product names are "<adjective> <material> <noun>": the search scenario queries these words.
+ADJECTIVES = ["classic", "modern", "compact", "deluxe", "rugged", "vintage", "premium", "portable", "ergonomic", "smart",
+              "wireless", "handmade", "lightweight", "heavy", "organic", "sleek", "durable", "foldable", "travel", "mini"]
+MATERIALS = ["steel", "oak", "bamboo", "leather", "cotton", "ceramic", "glass", "carbon", "wool", "copper",
+             "linen", "marble", "silicone", "walnut", "canvas", "titanium", "aluminium", "cork", "denim", "velvet"]
+NOUNS = ["chair", "lamp", "backpack", "kettle", "watch", "speaker", "notebook", "bottle", "jacket", "desk",
+         "mug", "headphones", "wallet", "blanket", "knife", "pillow", "umbrella", "sneakers", "camera", "charger"]
+SEARCH_WORDS = ADJECTIVES + MATERIALS + NOUNS
+
+ORDER_STATUSES = (["delivered"] * 6) + (["shipped"] * 2) + ["processing", "pending", "cancelled"]
+
+# Every order falls within this many days before the seeding time.
+ORDER_HISTORY_DAYS = 365
+
+BATCH_SIZE = 5000
+
+
+def product_price(product_id: int) -> Decimal:
+    # Derived from the id, so order items can be priced without keeping a million prices in memory.
+    return Decimal((product_id * 7919) % 49_900 + 100) / 100
+
+
+def product_name(product_id: int) -> str:
+    return f"{ADJECTIVES[product_id % 20]} {MATERIALS[product_id // 20 % 20]} {NOUNS[product_id // 400 % 20]} {product_id}"
+
+
+def _insert(connection, table, rows):
+    if rows:
+        connection.execute(insert(table), rows)
+
+
+class _Progress:
+    # Prints a line about every 200k rows.
+    EVERY = 200_000
+
+    def __init__(self, label: str, total: int):
+        self.label, self.total = label, total
+        self.done, self.next_report = 0, self.EVERY
+        self.started = time.perf_counter()
+
+    def add(self, rows: int):
+        self.done += rows
+        if self.done >= self.next_report:
+            self.next_report += self.EVERY
+            print(f"  {self.label}: {self.done:,}/{self.total:,} ({self.done / (time.perf_counter() - self.started):,.0f} rows/s)")
+
+    def finish(self):
+        print(f"  {self.label}: {self.total:,} rows in {time.perf_counter() - self.started:.1f}s")
+
+
+def _batched_insert(table, rows, label: str, total: int):
+    progress = _Progress(label, total)
+    batch = []
+    with get_engine().begin() as connection:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                _insert(connection, table, batch)
+                progress.add(len(batch))
+                batch = []
+        _insert(connection, table, batch)
+    progress.finish()
+
+
+def _categories(count: int):
+    for category_id in range(1, count + 1):
+        yield {"category_id": category_id, "name": f"Category {category_id}"}
+
+
+def _products(count: int, categories: int, rng: random.Random, now: datetime):
+    for product_id in range(1, count + 1):
+        created_at = now - timedelta(seconds=rng.randrange(2 * 365 * 24 * 3600))
+        yield {
+            "product_id": product_id,
+            "name": product_name(product_id),
+            "description": " ".join(rng.choice(SEARCH_WORDS) for _ in range(12)),
+            "price": product_price(product_id),
+            # Enough stock that checkout scenarios never run out.
+            "stock_quantity": 1_000_000,
+            "category_id": rng.randrange(1, categories + 1),
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def _users(count: int, password_hash: str):
+    yield {"user_id": 1, "username": "admin", "email": "admin@example.com", "password_hash": password_hash, "role": "admin"}
+    for user_id in range(2, count + 1):
+        yield {
+            "user_id": user_id,
+            "username": f"user{user_id}",
+            "email": f"user{user_id}@example.com",
+            "password_hash": password_hash,
+            "first_name": "Bench",
+            "last_name": f"User {user_id}",
+            "role": "customer",
+        }
+
+
+def _orders_and_items(order_items: int, products: int, users: int, rng: random.Random, now: datetime):
+    """
+    Yields (order, items) with 1-5 items per order (3 on average) until `order_items` items exist.
+    """
+    order_id, item_id = 0, 0
+    while item_id < order_items:
+        order_id += 1
+        count = min(rng.randint(1, 5), order_items - item_id)
+        items = []
+        for product_id in rng.sample(range(1, products + 1), count) if products >= count else [1] * count:
+            item_id += 1
+            items.append({
+                "order_item_id": item_id,
+                "order_id": order_id,
+                "product_id": product_id,
+                "quantity": rng.randint(1, 3),
+                "price_at_purchase": product_price(product_id),
+            })
+        order = {
+            "order_id": order_id,
+            "user_id": rng.randint(2, users) if users > 1 else 1,
+            "order_date": now - timedelta(seconds=rng.randrange(ORDER_HISTORY_DAYS * 24 * 3600)),
+            "total_amount": sum(item["price_at_purchase"] * item["quantity"] for item in items),
+            "status": rng.choice(ORDER_STATUSES),
+            "shipping_city": "Benchville",
+            "shipping_country": "Benchland",
+        }
+        yield order, items
+
+
+def _insert_orders(order_items: int, products: int, users: int, rng: random.Random, now: datetime):
+    progress = _Progress("order items", order_items)
+    orders, items = [], []
+    with get_engine().begin() as connection:
+        for order, order_items_batch in _orders_and_items(order_items, products, users, rng, now):
+            orders.append(order)
+            items.extend(order_items_batch)
+            if len(items) >= BATCH_SIZE:
+                _insert(connection, models.Order.__table__, orders)
+                _insert(connection, models.OrderItem.__table__, items)
+                progress.add(len(items))
+                orders, items = [], []
+        _insert(connection, models.Order.__table__, orders)
+        _insert(connection, models.OrderItem.__table__, items)
+    progress.finish()
+
+
+def _reset():
+    engine = get_engine()
+    Base.metadata.drop_all(bind=engine)
+    schema_migrations.drop(engine, checkfirst=True)
+
+
+def _finish(dialect_name: str):
+    with get_engine().begin() as connection:
+        print("  rebuilding the reporting rollups...")
+        rebuild_rollups(connection)
+        if dialect_name == "postgresql":
+            # Rows were inserted with explicit ids: move the sequences past them.
+            for table, column in (("categories", "category_id"), ("products", "product_id"), ("users", "user_id"),
+                                  ("orders", "order_id"), ("order_items", "order_item_id")):
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), COALESCE((SELECT MAX({column}) FROM {table}), 1))"
+                ))
+    # Fresh statistics, so the planner sees the real table sizes.
+    with get_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("ANALYZE"))
+
+
+def seed(products: int, users: int, order_items: int, categories: int, random_seed: int = 1):
+    engine = get_engine()
+    dialect_name = engine.dialect.name
+    rng = random.Random(random_seed)
+    # Whole seconds: SQLite's CURRENT_TIMESTAMP has no fractions either.
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    print(f"Seeding {products:,} products, {users:,} users and {order_items:,} order items into {engine.url.render_as_string(hide_password=True)}")
+    if dialect_name == "sqlite":
+        with engine.connect() as connection:
+            connection.execute(text("PRAGMA journal_mode=WAL"))
+
+    _batched_insert(models.Category.__table__, _categories(categories), "categories", categories)
+    _batched_insert(models.Product.__table__, _products(products, categories, rng, now), "products", products)
+    _batched_insert(models.User.__table__, _users(users, get_password_hash(BENCHMARK_PASSWORD)), "users", users)
+    _insert_orders(order_items, products, users, rng, now)
+    _finish(dialect_name)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="preset volumes (default: small)")
+    parser.add_argument("--products", type=int, help="override the preset's product count")
+    parser.add_argument("--users", type=int, help="override the preset's user count")
+    parser.add_argument("--order-items", type=int, help="override the preset's order item count")
+    parser.add_argument("--categories", type=int, help="override the preset's category count")
+    parser.add_argument("--seed", type=int, default=1, help="random seed (default: 1)")
+    parser.add_argument("--reset", action="store_true", help="drop and recreate every table first")
+    args = parser.parse_args(argv)
+
+    volumes = dict(SCALES[args.scale])
+    for name in volumes:
+        if getattr(args, name) is not None:
+            volumes[name] = getattr(args, name)
+    if min(volumes.values()) < 1:
+        parser.error("every volume must be at least 1")
+
+    if args.reset:
+        _reset()
+    create_db_and_tables()
+    with get_engine().connect() as connection:
+        if connection.execute(select(func.count()).select_from(models.Product)).scalar():
+            print("The database already has products; pass --reset to replace them.", file=sys.stderr)
+            return 1
+
+    started = time.perf_counter()
+    seed(random_seed=args.seed, **volumes)
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,127 @@
-# backend/run.py 
-import uvicorn
-from app.api.api import app
-from app.database.db_setup import create_db_and_tables 
+# backend/run.py
+"""
+Starts the API.
+
+    python run.py                # production: WEB_CONCURRENCY workers on HOST:PORT
+    python run.py --workers 4 --port 9000
+    python run.py --reload       # development: a single auto-reloading process
+    uvicorn run:app --reload     # the same through the uvicorn CLI (tables are not created)
+
+The schema is created and migrated once, in the launching process, before any worker starts
+(--no-bootstrap skips this when migrations run as a separate deploy step). Workers are gunicorn
+processes running uvicorn's worker class when gunicorn is installed (not on Windows); with
+PRELOAD_APP the app is imported once in the gunicorn master and the workers share it copy-on-write.
+Without gunicorn, uvicorn's own supervisor spawns the workers, each importing the app itself.
+uvicorn uses uvloop and httptools when they are installed.
+
+SIGTERM stops accepting connections and gives in-flight requests GRACEFUL_SHUTDOWN_TIMEOUT
+seconds to finish. Probes: GET /internal/health/live and GET /internal/health/ready.
+"""
+import argparse
+import importlib.util
+
+from app.core.config import settings
+from app.database.db_setup import create_db_and_tables
+from app.database.session import dispose_engines
+
+APP_IMPORT_STRING = "app.api.api:app"
+
+
+def __getattr__(name):
+    # run:app, for the uvicorn CLI, imported only on demand: without preload the master never loads the app.
+    if name == "app":
+        from app.api.api import app
+        return app
+    raise AttributeError(name)
+
+
+def _uvicorn_worker_class() -> str:
+    # The worker class moved to the uvicorn-worker package; older uvicorn releases still ship it.
+    if importlib.util.find_spec("uvicorn_worker") is not None:
+        return "uvicorn_worker.UvicornWorker"
+    return "uvicorn.workers.UvicornWorker"
+
+
+def _post_fork(server, worker):
+    # The master connected while bootstrapping (and, with preload, imported the engines): start clean.
+    dispose_engines(close=False)
+
+
+def gunicorn_options(host: str, port: int, workers: int, preload: bool) -> dict:
+    """
+    The gunicorn settings serve_gunicorn() runs with.
+    """
+    return {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": _uvicorn_worker_class(),
+        "preload_app": preload,
+        "graceful_timeout": settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+        "post_fork": _post_fork,
+    }
+
+
+def serve_gunicorn(host: str, port: int, workers: int, preload: bool):
+    from gunicorn.app.base import BaseApplication
+
+    options = gunicorn_options(host, port, workers, preload)
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.api.api import app
+            return app
+
+    Application().run()
+
+
+def serve_uvicorn(host: str, port: int, workers: int, reload: bool = False):
+    import uvicorn
+
+    uvicorn.run(
+        APP_IMPORT_STRING,
+        host=host,
+        port=port,
+        workers=None if reload else workers,
+        reload=reload,
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.HOST, help=f"bind address (default: HOST, {settings.HOST})")
+    parser.add_argument("--port", type=int, default=settings.PORT, help=f"bind port (default: PORT, {settings.PORT})")
+    parser.add_argument("--workers", type=int, default=settings.WEB_CONCURRENCY,
+                        help=f"worker processes (default: WEB_CONCURRENCY, {settings.WEB_CONCURRENCY})")
+    parser.add_argument("--server", choices=["auto", "gunicorn", "uvicorn"], default="auto",
+                        help="process manager; auto picks gunicorn when it is installed (default: auto)")
+    parser.add_argument("--no-preload", action="store_true", help="import the app in each gunicorn worker instead of once")
+    parser.add_argument("--no-bootstrap", action="store_true", help="do not create or migrate the schema first")
+    parser.add_argument("--reload", action="store_true", help="development mode: one process, restarted on code changes")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    if not args.no_bootstrap:
+        create_db_and_tables()
+        # Workers must not inherit the bootstrap's connections.
+        dispose_engines()
+
+    if args.reload:
+        serve_uvicorn(args.host, args.port, 1, reload=True)
+        return
+    server = args.server
+    if server == "auto":
+        server = "gunicorn" if importlib.util.find_spec("gunicorn") is not None else "uvicorn"
+    if server == "gunicorn":
+        serve_gunicorn(args.host, args.port, args.workers, preload=settings.PRELOAD_APP and not args.no_preload)
+    else:
+        serve_uvicorn(args.host, args.port, args.workers)
+
 
 if __name__ == "__main__":
-    create_db_and_tables()
-    uvicorn.run("run:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    main()
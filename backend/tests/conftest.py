@@ -0,0 +1,135 @@
+# backend/tests/conftest.py
+"""
+Fixtures shared by the suite. Tests run against TEST_DATABASE_URL when it is set (a scratch
+PostgreSQL database, say: every table is emptied between tests), otherwise against a throwaway
+SQLite file. Settings are read when the app is imported, so the environment is set up first.
+"""
+import os
+import tempfile
+from decimal import Decimal
+
+_scratch_dir = tempfile.mkdtemp(prefix="ecommerce-tests-")
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{_scratch_dir}/test.db"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["JOB_BACKEND"] = "database"
+# The cheapest cost bcrypt accepts: tests check the login flow, not the hash strength.
+os.environ["PASSWORD_BCRYPT_ROUNDS"] = "4"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, event
+
+from app.api.api import app
+from app.database import models
+from app.database.db_setup import create_db_and_tables
+from app.core.security import create_access_token
+from app.database.session import Base, SessionLocal, get_engine
+from app.services.product import product_cache
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    create_db_and_tables()
+    yield get_engine()
+
+
+@pytest.fixture(autouse=True)
+def empty_tables(database):
+    yield
+    with database.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(delete(table))
+    product_cache.bump()
+
+
+@pytest.fixture
+def client():
+    # Not entered as a context manager: the lifespan (and with it the job worker) does not run.
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+class QueryCounter:
+    """
+    Counts the statements sent to the primary engine while active.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+
+@pytest.fixture
+def count_queries(database):
+    return QueryCounter(database)
+
+
+@pytest.fixture
+def catalog(db):
+    """
+    Two categories with `products` products each, `stock` units of each in stock, and `users` customers.
+    Returns a function: catalog(products=5, users=1, stock=10) -> (product ids, user ids).
+    """
+    def create(products: int = 5, users: int = 1, stock: int = 10):
+        categories = [models.Category(name=f"category {index}") for index in range(2)]
+        db.add_all(categories)
+        db.flush()
+        db_products = [
+            models.Product(
+                name=f"product {index}", description=f"description {index}", price=Decimal("1.50") + index,
+                stock_quantity=stock, category_id=categories[index % 2].category_id,
+            )
+            for index in range(products * 2)
+        ]
+        db_users = [
+            models.User(username=f"user{index}", email=f"user{index}@example.com", password_hash="-", role="customer")
+            for index in range(users)
+        ]
+        db.add_all(db_products + db_users)
+        db.commit()
+        return [product.product_id for product in db_products], [user.user_id for user in db_users]
+    return create
+
+
+@pytest.fixture
+def users(catalog, db):
+    """
+    An admin and a customer, in that order.
+    """
+    _, user_ids = catalog(products=1, users=2)
+    admin = db.get(models.User, user_ids[0])
+    admin.role = "admin"
+    db.commit()
+    return admin, db.get(models.User, user_ids[1])
+
+
+@pytest.fixture
+def auth():
+    """
+    auth(db_user) -> the Authorization header of an access token issued to `db_user`.
+    """
+    def headers(db_user: models.User) -> dict:
+        token = create_access_token({"sub": db_user.username, "uid": db_user.user_id, "role": db_user.role})
+        return {"Authorization": f"Bearer {token}"}
+    return headers
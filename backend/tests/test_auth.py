@@ -0,0 +1,122 @@
+# backend/tests/test_auth.py
+"""
+Access tokens are trusted for what they claim without a query, until revoked: a logout revokes the
+token, a role change or a deletion every token of that user, on the next request in the process that
+made the change and within TOKEN_REVOCATION_REFRESH_SECONDS in every other.
+"""
+import pytest
+from jose import jwt
+
+from app.api import deps
+from app.core.config import settings
+from app.core.security import RevocationSet, create_access_token, token_cache
+from app.database import models
+
+NEW_USER = {"username": "newuser", "email": "newuser@example.com", "password": "correct horse"}
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def token_for(db_user: models.User, role: str = None) -> str:
+    return create_access_token({"sub": db_user.username, "uid": db_user.user_id, "role": role or db_user.role})
+
+
+def test_registration_cannot_choose_a_role(client):
+    response = client.post("/api/v1/users/", json={**NEW_USER, "role": "admin"})
+    assert response.status_code == 201, response.text
+    assert response.json()["role"] == "customer"
+
+
+def test_updating_a_user_needs_that_user_or_an_admin(client, users):
+    admin, customer = users
+    path = f"/api/v1/users/{admin.user_id}"
+    body = {"username": admin.username, "email": admin.email, "first_name": "changed"}
+    assert client.put(path, json=body).status_code == 401
+    assert client.put(path, json=body, headers=bearer(token_for(customer))).status_code == 403
+    response = client.put(path, json=body, headers=bearer(token_for(admin)))
+    assert response.status_code == 200, response.text
+    assert response.json()["first_name"] == "changed"
+
+
+def test_users_cannot_promote_themselves(client, users, db):
+    _, customer = users
+    body = {"username": customer.username, "email": customer.email, "role": "admin"}
+    response = client.put(f"/api/v1/users/{customer.user_id}", json=body, headers=bearer(token_for(customer)))
+    assert response.status_code == 200, response.text
+    assert response.json()["role"] == "customer"
+    response = client.put(f"/api/v1/users/{customer.user_id}/role", json={"role": "admin"}, headers=bearer(token_for(customer)))
+    assert response.status_code == 403
+
+
+def test_admins_change_roles(client, users):
+    admin, customer = users
+    response = client.put(f"/api/v1/users/{customer.user_id}/role", json={"role": "admin"}, headers=bearer(token_for(admin)))
+    assert response.status_code == 200, response.text
+    assert client.get("/api/v1/users/", headers=bearer(token_for(customer, role="admin"))).status_code == 200
+
+
+def test_forged_and_legacy_tokens_are_refused(client, users):
+    _, customer = users
+    claims = {"sub": customer.username, "uid": customer.user_id, "role": "admin", "exp": 4102444800}
+    assert client.get("/api/v1/users/", headers=bearer(jwt.encode(claims, "not the secret", algorithm=settings.ALGORITHM))).status_code == 401
+    # A token from before the uid and role claims.
+    legacy = create_access_token({"sub": customer.username})
+    assert client.get(f"/api/v1/users/{customer.user_id}", headers=bearer(legacy)).status_code == 401
+
+
+def test_reading_a_user_needs_that_user_or_an_admin(client, users):
+    admin, customer = users
+    path = f"/api/v1/users/{admin.user_id}"
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers=bearer(token_for(customer))).status_code == 403
+    assert client.get(path, headers=bearer(token_for(admin))).status_code == 200
+    assert client.get(f"/api/v1/users/{customer.user_id}", headers=bearer(token_for(customer))).status_code == 200
+
+
+def test_role_change_revokes_existing_tokens(client, users):
+    admin, _ = users
+    other_admin = token_for(admin)
+    token = token_for(admin)
+    assert client.get("/api/v1/users/", headers=bearer(token)).status_code == 200
+    response = client.put(f"/api/v1/users/{admin.user_id}/role", json={"role": "customer"}, headers=bearer(other_admin))
+    assert response.status_code == 200, response.text
+    assert response.json()["role"] == "customer"
+    # The old tokens claim the old role, so they no longer work; a new one carries the new role.
+    assert client.get("/api/v1/users/", headers=bearer(token)).status_code == 401
+    assert client.get("/api/v1/users/", headers=bearer(other_admin)).status_code == 401
+    assert client.get("/api/v1/users/", headers=bearer(token_for(admin, role="customer"))).status_code == 403
+
+
+def test_authenticated_request_queries_nothing(client, users, count_queries):
+    admin, _ = users
+    headers = bearer(token_for(admin))
+    assert client.get("/internal/metrics/cache", headers=headers).status_code == 200
+    with count_queries:
+        for _ in range(3):
+            assert client.get("/internal/metrics/cache", headers=headers).status_code == 200
+    assert count_queries.count == 0, count_queries.statements
+
+
+def test_deleted_users_tokens_stop_working(client, users, db):
+    admin, customer = users
+    token = token_for(customer)
+    path = f"/api/v1/users/{customer.user_id}/orders"
+    assert client.get(path, headers=bearer(token)).status_code == 200
+    assert client.delete(f"/api/v1/users/{customer.user_id}", headers=bearer(token_for(admin))).status_code == 204
+    assert client.get(path, headers=bearer(token)).status_code == 401
+
+
+def test_logout_revokes_in_every_process(client, users, db, monkeypatch):
+    _, customer = users
+    token = token_for(customer)
+    path = f"/api/v1/users/{customer.user_id}/orders"
+    assert client.get(path, headers=bearer(token)).status_code == 200
+    assert client.post("/api/v1/auth/logout", headers=bearer(token)).status_code == 204
+    assert client.get(path, headers=bearer(token)).status_code == 401
+    # Another worker process: its own token cache and revocation set, the same database.
+    token_cache._entries.clear()
+    monkeypatch.setattr(deps, "revocations", RevocationSet(settings.TOKEN_REVOCATION_REFRESH_SECONDS))
+    assert client.get(path, headers=bearer(token)).status_code == 401
+    assert db.query(models.RevokedToken).count() == 1
@@ -0,0 +1,64 @@
+# backend/tests/test_bulk_import.py
+"""
+Bulk imports hold at most one line or record in memory: one longer than BULK_IMPORT_MAX_RECORD_LENGTH
+ends the import with a 413 instead of being buffered.
+"""
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.database import models
+
+MAX_LENGTH = 200
+
+
+@pytest.fixture
+def category_id(catalog, db, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_IMPORT_MAX_RECORD_LENGTH", MAX_LENGTH)
+    catalog(products=0)
+    return db.query(models.Category.category_id).first()[0]
+
+
+def ndjson(*rows) -> bytes:
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+
+def product(category_id: int, name: str = "imported", description: str = "") -> dict:
+    return {"name": name, "description": description, "price": "2.50", "stock_quantity": 3, "category_id": category_id}
+
+
+def post(client, body, content_type: str, batch_size: int = 1000):
+    return client.post(f"/api/v1/products/bulk?batch_size={batch_size}", content=body, headers={"Content-Type": content_type})
+
+
+def test_import_within_the_limit(client, category_id, db):
+    response = post(client, ndjson(product(category_id), product(category_id, "second")), "application/x-ndjson")
+    assert response.status_code == 200, response.text
+    assert response.json()["written"] == 2
+
+
+def test_overlong_ndjson_line_is_rejected(client, category_id, db):
+    body = ndjson(product(category_id), product(category_id, description="x" * MAX_LENGTH), product(category_id, "after"))
+    response = post(client, body, "application/x-ndjson", batch_size=1)
+    assert response.status_code == 413, response.text
+    assert "Line 2" in response.json()["detail"]
+    # The batch before the overlong line was committed; nothing after it was read.
+    assert db.query(models.Product.name).all() == [("imported",)]
+
+
+def test_overlong_line_without_line_break_is_rejected(client, category_id):
+    chunks = (b"x" * 64 for _ in range(100))
+    response = post(client, chunks, "application/x-ndjson")
+    assert response.status_code == 413, response.text
+    assert "Line 1" in response.json()["detail"]
+
+
+def test_overlong_quoted_csv_record_is_rejected(client, category_id, db):
+    # Each line is short, but an unterminated quote keeps the record open across all of them.
+    body = f"name,price,stock_quantity,category_id\nfirst,1.00,1,{category_id}\n\"open,1.00,1,{category_id}\n" + "short line\n" * 100
+    response = post(client, body.encode(), "text/csv")
+    assert response.status_code == 413, response.text
+    assert "Record 2" in response.json()["detail"]
+    # The unfinished batch is not written.
+    assert db.query(models.Product).count() == 0
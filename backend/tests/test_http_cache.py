@@ -0,0 +1,98 @@
+# backend/tests/test_http_cache.py
+"""
+Conditional GETs: the ETag always describes the body it is sent with, and only a matching
+If-None-Match gets a 304.
+"""
+from email.utils import formatdate
+
+from sqlalchemy import update
+
+from app.core.http_cache import make_etag
+from app.database import models
+
+
+def _get(client, path, etag=None, **headers):
+    if etag is not None:
+        headers["If-None-Match"] = etag
+    response = client.get(path, headers=headers)
+    if response.status_code == 200:
+        assert response.headers["etag"] == make_etag(response.content)
+        assert "last-modified" not in response.headers
+    return response
+
+
+def test_revalidation(client, catalog):
+    product_ids, _ = catalog()
+    path = f"/api/v1/products/{product_ids[0]}"
+    first = _get(client, path)
+    assert first.status_code == 200
+    revalidated = _get(client, path, first.headers["etag"])
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == first.headers["etag"]
+    assert _get(client, path, 'W/"other", ' + first.headers["etag"]).status_code == 304
+    assert _get(client, path, '"other"').status_code == 200
+
+
+def test_stale_cache_entry_keeps_its_own_etag(client, catalog, db):
+    # A worker whose cache did not see a write keeps serving its entry until it expires; what it
+    # must never do is pair the new state's ETag with the old body, or a client would keep that body.
+    product_ids, _ = catalog(stock=8)
+    path = f"/api/v1/products/{product_ids[0]}"
+    first = _get(client, path)
+    db.execute(update(models.Product).filter(models.Product.product_id == product_ids[0]).values(stock_quantity=3))
+    db.commit()
+
+    stale = _get(client, path)
+    assert stale.json()["stock_quantity"] == 8
+    assert stale.headers["etag"] == first.headers["etag"]
+
+    # Once the entry is invalidated (or expires), the new body comes with a new ETag, and the old one no longer matches.
+    client.put(path, json={**{key: first.json()[key] for key in ("name", "price", "category_id")}, "stock_quantity": 3})
+    fresh = _get(client, path, first.headers["etag"])
+    assert fresh.status_code == 200
+    assert fresh.json()["stock_quantity"] == 3
+    assert fresh.headers["etag"] != first.headers["etag"]
+
+
+def test_category_rename_changes_embedding_products(client, catalog, db):
+    product_ids, _ = catalog()
+    path = f"/api/v1/products/{product_ids[0]}"
+    first = _get(client, path)
+    category_id = first.json()["category_id"]
+    assert client.put(f"/api/v1/categories/{category_id}", json={"name": "renamed"}).status_code == 200
+
+    # If-Modified-Since is not honoured: no updated_at moved, yet the product's JSON did.
+    since = formatdate(usegmt=True)
+    assert _get(client, path, **{"If-Modified-Since": since}).status_code == 200
+    renamed = _get(client, path, first.headers["etag"])
+    assert renamed.status_code == 200
+    assert renamed.json()["category"]["name"] == "renamed"
+
+
+def test_deleted_product_changes_its_page(client, catalog):
+    product_ids, _ = catalog()
+    path = "/api/v1/products/?limit=3"
+    first = _get(client, path)
+    assert client.delete(f"/api/v1/products/{product_ids[1]}").status_code == 204
+    after = _get(client, path, first.headers["etag"])
+    assert after.status_code == 200
+    assert product_ids[1] not in [product["product_id"] for product in after.json()]
+
+
+def test_not_modified_page_keeps_next_cursor(client, catalog):
+    catalog()
+    first = _get(client, "/api/v1/products/?limit=3")
+    revalidated = _get(client, "/api/v1/products/?limit=3", first.headers["etag"])
+    assert revalidated.status_code == 304
+    assert revalidated.headers["x-next-cursor"] == first.headers["x-next-cursor"]
+
+
+def test_categories(client, catalog):
+    catalog()
+    first = _get(client, "/api/v1/categories/")
+    assert _get(client, "/api/v1/categories/", first.headers["etag"]).status_code == 304
+    category_id = first.json()[0]["category_id"]
+    single = _get(client, f"/api/v1/categories/{category_id}")
+    assert _get(client, f"/api/v1/categories/{category_id}", single.headers["etag"]).status_code == 304
+    assert client.get("/api/v1/categories/999999").status_code == 404
@@ -0,0 +1,75 @@
+# backend/tests/test_idempotency.py
+"""
+An Idempotency-Key places its order at most once: for simultaneous requests, and when a claim expires
+and is taken over while the request that held it is still running.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+
+from app.database import models
+from app.database.session import SessionLocal
+from app.schemas.order import OrderCreate
+from app.services import idempotency as idempotency_services
+from app.services import order as order_services
+
+KEY = "checkout-1"
+REQUESTS = 8
+
+
+@pytest.fixture
+def order(catalog):
+    product_ids, user_ids = catalog(products=1, users=1, stock=10)
+    return OrderCreate(user_id=user_ids[0], order_items=[
+        {"order_id": 0, "product_id": product_ids[0], "quantity": 1, "price_at_purchase": "0.00"},
+    ])
+
+
+def _orders(db) -> int:
+    return db.scalar(select(func.count()).select_from(models.Order))
+
+
+def test_simultaneous_requests_place_one_order(client, order, db):
+    start = threading.Barrier(REQUESTS)
+
+    def post(_):
+        start.wait()
+        return client.post("/api/v1/orders/", content=order.model_dump_json(), headers={"Idempotency-Key": KEY, "Content-Type": "application/json"})
+
+    with ThreadPoolExecutor(max_workers=REQUESTS) as pool:
+        responses = list(pool.map(post, range(REQUESTS)))
+
+    placed = [response for response in responses if response.status_code == 201 and "Idempotent-Replayed" not in response.headers]
+    assert len(placed) == 1
+    # The others were turned away while it ran, or got its response replayed.
+    assert all(response.status_code in (201, 409) for response in responses)
+    assert {response.json()["order_id"] for response in responses if response.status_code == 201} == {placed[0].json()["order_id"]}
+    assert _orders(db) == 1
+
+
+def test_taken_over_claim_cannot_complete(order, db):
+    request_fingerprint = idempotency_services.fingerprint("POST /api/v1/orders/", order)
+    with SessionLocal() as first, SessionLocal() as second:
+        first_token, _ = idempotency_services.claim(first, KEY, request_fingerprint)
+        # The first request outlives IDEMPOTENCY_LOCK_SECONDS; a retry takes the key over.
+        db.execute(update(models.IdempotencyKey).values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1)))
+        db.commit()
+        second_token, stored = idempotency_services.claim(second, KEY, request_fingerprint)
+        assert stored is None and second_token != first_token
+
+        with pytest.raises(HTTPException) as lost:
+            order_services.create_order(first, order, idempotency_key=KEY, claim_token=first_token)
+        assert lost.value.status_code == 409
+        idempotency_services.release(first, KEY, first_token)
+
+        db_order = order_services.create_order(second, order, idempotency_key=KEY, claim_token=second_token)
+
+    db.expire_all()
+    assert _orders(db) == 1
+    assert db.get(models.Product, order.order_items[0].product_id).stock_quantity == 9
+    stored = db.get(models.IdempotencyKey, KEY)
+    assert stored.status_code == 201 and str(db_order.order_id) in stored.response_body.decode()
@@ -0,0 +1,19 @@
+# backend/tests/test_import_time.py
+"""
+Importing the app stays within the benchmarks.import_time budget and leaves password hashing and the
+database drivers for the lifespan: every worker pays for the import on each start and restart.
+"""
+import statistics
+
+from benchmarks.import_time import DEFAULT_BUDGET_MS, DEFERRED_MODULES, timed_import
+
+RUNS = 3
+
+
+def test_import_time_within_budget():
+    timings, modules = [], []
+    for _ in range(RUNS):
+        ms, modules = timed_import()
+        timings.append(ms)
+    assert statistics.median(timings) <= DEFAULT_BUDGET_MS, timings
+    assert not {name.split(".")[0] for name in modules} & set(DEFERRED_MODULES)
@@ -0,0 +1,209 @@
+# backend/tests/test_jobs.py
+"""
+Background jobs run only if the transaction that enqueued them commits, and at least once: a failed
+job is retried with jittered exponential backoff until JOB_MAX_ATTEMPTS and then marked dead, and a
+job whose worker lost its lease is claimed again. Both backends; the database one on the test database.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+
+from app.core import jobs
+from app.core.config import settings
+from app.core.jobs import DatabaseJobBackend, JobQueue, MemoryJobBackend, retry_delay
+from app.database import models
+from app.database.session import SessionLocal
+from app.schemas.order import OrderCreate
+from app.services import order as order_services
+from app.services import order_events
+
+TOPIC = "test.job"
+
+
+@pytest.fixture(params=["database", "memory"])
+def queue(request, monkeypatch):
+    """
+    A job queue over a fresh backend, not started: tests claim and run its jobs themselves.
+    """
+    backend = DatabaseJobBackend() if request.param == "database" else MemoryJobBackend()
+    created = JobQueue(backend, concurrency=1, poll_interval=0.1)
+    # The commit and rollback listeners dispatch to the module's queue.
+    monkeypatch.setattr(jobs, "job_queue", created)
+    return created
+
+
+class RecordingHandler:
+    """
+    TOPIC's handler: records the payloads it receives, and raises while `failing` is set.
+    """
+
+    def __init__(self):
+        self.payloads = []
+        self.failing = False
+
+    def __call__(self, payload: dict):
+        self.payloads.append(payload)
+        if self.failing:
+            raise RuntimeError("handler failed")
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    created = RecordingHandler()
+    monkeypatch.setitem(jobs._handlers, TOPIC, created)
+    return created
+
+
+def _outbox(db):
+    db.expire_all()
+    return db.execute(select(models.OutboxEvent)).scalars().all()
+
+
+def _make_due(db):
+    # As if the lease or the retry delay had run out.
+    db.execute(update(models.OutboxEvent).values(available_at=datetime.now(timezone.utc) - timedelta(seconds=1)))
+    db.commit()
+
+
+def _run_due(queue) -> int:
+    claimed = queue.backend.claim(10)
+    for job in claimed:
+        queue._execute(job)
+    return len(claimed)
+
+
+def test_outbox_row_commits_or_rolls_back_with_the_transaction(db):
+    with SessionLocal() as session:
+        session.add(models.Category(name="kept"))
+        jobs.enqueue(session, TOPIC, {"n": 1})
+        session.commit()
+    with SessionLocal() as session:
+        session.add(models.Category(name="dropped"))
+        jobs.enqueue(session, TOPIC, {"n": 2})
+        session.rollback()
+
+    assert [(event.topic, event.payload, event.status) for event in _outbox(db)] == [(TOPIC, {"n": 1}, "pending")]
+    assert db.scalar(select(func.count()).select_from(models.Category)) == 1
+
+
+def test_only_committed_jobs_are_dispatched(queue, handler, monkeypatch):
+    notified = []
+    monkeypatch.setattr(queue, "notify", lambda: notified.append(True))
+    with SessionLocal() as session:
+        queue.enqueue(session, TOPIC, {"n": 1})
+        session.rollback()
+        assert jobs._PENDING_JOBS not in session.info and jobs._ENQUEUED not in session.info
+        assert _run_due(queue) == 0
+        assert notified == []
+
+        queue.enqueue(session, TOPIC, {"n": 2})
+        session.commit()
+        assert jobs._PENDING_JOBS not in session.info and jobs._ENQUEUED not in session.info
+    # The commit woke the worker, which finds the committed job only.
+    assert notified == [True]
+    assert _run_due(queue) == 1
+    assert handler.payloads == [{"n": 2}]
+    assert queue.stats()["this_process"]["succeeded"] == 1
+
+
+def test_a_later_commit_does_not_dispatch_rolled_back_jobs(queue, handler):
+    with SessionLocal() as session:
+        queue.enqueue(session, TOPIC, {"n": 1})
+        session.rollback()
+        session.add(models.Category(name="unrelated"))
+        session.commit()
+    assert _run_due(queue) == 0
+    assert handler.payloads == []
+
+
+def test_retry_delay_backs_off_exponentially_with_jitter(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 2)
+    monkeypatch.setattr(settings, "JOB_RETRY_MAX_SECONDS", 600)
+    monkeypatch.setattr(jobs.random, "uniform", lambda low, high: high)
+    assert [retry_delay(attempts) for attempts in range(1, 12)] == [2, 4, 8, 16, 32, 64, 128, 256, 512, 600, 600]
+    monkeypatch.setattr(jobs.random, "uniform", lambda low, high: low)
+    assert [retry_delay(attempts) for attempts in range(1, 4)] == [1, 2, 4]
+
+    monkeypatch.undo()
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 2)
+    random.seed(7)
+    delays = [retry_delay(3) for _ in range(100)]
+    assert all(4 <= delay <= 8 for delay in delays)
+    # Jobs that failed together spread their retries out.
+    assert len(set(delays)) == 100
+
+
+def test_expired_lease_is_claimed_again(db, handler):
+    backend = DatabaseJobBackend()
+    with SessionLocal() as session:
+        jobs.enqueue(session, TOPIC, {"n": 1})
+        session.commit()
+
+    (first,) = backend.claim(10)
+    assert first.attempts == 1
+    # Leased: no other worker gets it meanwhile.
+    assert backend.claim(10) == []
+
+    _make_due(db)
+    (second,) = backend.claim(10)
+    assert (second.job_id, second.attempts) == (first.job_id, 2)
+    # The worker that lost the lease cannot finish the job; the one holding it can.
+    backend.succeed(first)
+    assert _outbox(db)[0].status == "pending"
+    backend.succeed(second)
+    (event,) = _outbox(db)
+    assert event.status == "done" and event.attempts == 2
+
+
+def test_job_goes_dead_after_max_attempts(queue, handler, db, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(jobs, "retry_delay", lambda attempts: 0)
+    handler.failing = True
+    with SessionLocal() as session:
+        queue.enqueue(session, TOPIC, {"n": 1})
+        session.commit()
+
+    for attempt in range(1, 4):
+        _make_due(db)
+        assert _run_due(queue) == 1, attempt
+    _make_due(db)
+    assert _run_due(queue) == 0
+    assert len(handler.payloads) == 3
+
+    stats = queue.stats()
+    assert stats["this_process"] == {"succeeded": 0, "failed_attempts": 3, "dead": 1}
+    assert stats["jobs"].get("dead") == 1 and not stats["jobs"].get("pending")
+    if isinstance(queue.backend, DatabaseJobBackend):
+        (event,) = _outbox(db)
+        assert event.status == "dead" and event.attempts == 3
+        assert event.last_error == "RuntimeError: handler failed"
+
+
+@pytest.fixture
+def order(catalog):
+    product_ids, user_ids = catalog(products=1, users=1, stock=10)
+    return OrderCreate(user_id=user_ids[0], order_items=[
+        {"order_id": 0, "product_id": product_ids[0], "quantity": 2, "price_at_purchase": "0.00"},
+    ])
+
+
+def test_create_order_enqueues_its_confirmation(order, db):
+    with SessionLocal() as session:
+        db_order = order_services.create_order(session, order)
+    (event,) = _outbox(db)
+    assert (event.topic, event.payload, event.status) == (order_events.ORDER_CREATED, {"order_id": db_order.order_id}, "pending")
+
+
+def test_create_order_rollback_leaves_no_outbox_row(order, db):
+    with SessionLocal() as session:
+        # The idempotency claim is not held: the order fails after its job was enqueued.
+        with pytest.raises(HTTPException) as failed:
+            order_services.create_order(session, order, idempotency_key="checkout-1", claim_token="not the claim")
+        assert failed.value.status_code == 409
+        session.rollback()
+    assert _outbox(db) == []
+    assert db.scalar(select(func.count()).select_from(models.Order)) == 0
+    assert db.get(models.Product, order.order_items[0].product_id).stock_quantity == 10
@@ -0,0 +1,110 @@
+# backend/tests/test_launcher.py
+"""
+The launcher (run.py) and the probes a process manager or load balancer watches: liveness never
+touches the database, readiness fails without it, gunicorn workers get the uvicorn worker class, the
+graceful timeout and fresh pools after the fork, and run:app imports the app only when asked for it.
+"""
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+
+import run
+from app.api import internal
+from app.api.api import app
+from app.core.config import settings
+from benchmarks.import_time import BACKEND_DIR, _environment
+
+
+@pytest.fixture
+def started(monkeypatch):
+    # The lifespan does not run under the test client: mark the worker started, as it would.
+    monkeypatch.setattr(app.state, "ready", True)
+
+
+def _no_database():
+    raise AssertionError("the probe touched the database")
+
+
+def test_liveness_does_not_touch_the_database(client, monkeypatch, count_queries):
+    monkeypatch.setattr(internal, "get_engine", _no_database)
+    with count_queries:
+        response = client.get("/internal/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+    assert count_queries.count == 0
+
+
+def test_readiness(client, started):
+    response = client.get("/internal/health/ready")
+    assert response.status_code == 200, response.text
+    assert response.json()["checks"]["database"] == "ok"
+
+
+def test_not_ready_without_the_database(client, started, monkeypatch, tmp_path):
+    unreachable = create_engine(f"sqlite:///{tmp_path}/missing/directory/test.db")
+    monkeypatch.setattr(internal, "get_engine", lambda: unreachable)
+    response = client.get("/internal/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "unavailable"
+    assert response.json()["checks"]["database"] == "error: OperationalError"
+    unreachable.dispose()
+
+
+def test_not_ready_before_startup(client):
+    response = client.get("/internal/health/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"]["started"] == "not ready"
+
+
+def test_gunicorn_options(monkeypatch):
+    options = run.gunicorn_options("0.0.0.0", 8000, 4, preload=True)
+    assert options["bind"] == "0.0.0.0:8000"
+    assert options["workers"] == 4 and options["preload_app"] is True
+    assert options["worker_class"] in ("uvicorn_worker.UvicornWorker", "uvicorn.workers.UvicornWorker")
+    assert options["graceful_timeout"] == settings.GRACEFUL_SHUTDOWN_TIMEOUT
+
+    # After the fork, a worker drops the master's connections without closing their sockets.
+    calls = []
+    monkeypatch.setattr(run, "dispose_engines", lambda **kwargs: calls.append(kwargs))
+    options["post_fork"](server=None, worker=None)
+    assert calls == [{"close": False}]
+
+
+def test_gunicorn_accepts_the_options():
+    pytest.importorskip("gunicorn")
+    from gunicorn.config import Config
+
+    config = Config()
+    for key, value in run.gunicorn_options("127.0.0.1", 8000, 2, preload=False).items():
+        config.set(key, value)
+    assert config.worker_class_str == run._uvicorn_worker_class()
+    assert config.graceful_timeout == settings.GRACEFUL_SHUTDOWN_TIMEOUT
+    assert config.post_fork is run._post_fork
+
+
+@pytest.mark.parametrize("argv, expected", [
+    ([], ("gunicorn" if run.importlib.util.find_spec("gunicorn") else "uvicorn", 1)),
+    (["--server", "uvicorn", "--workers", "3"], ("uvicorn", 1)),
+    (["--server", "gunicorn", "--no-bootstrap"], ("gunicorn", 0)),
+    (["--reload"], ("reload", 1)),
+])
+def test_main_bootstraps_once_then_serves(monkeypatch, argv, expected):
+    calls = []
+    monkeypatch.setattr(run, "create_db_and_tables", lambda: calls.append("bootstrap"))
+    monkeypatch.setattr(run, "dispose_engines", lambda **kwargs: calls.append("dispose"))
+    monkeypatch.setattr(run, "serve_gunicorn", lambda *args, **kwargs: calls.append("gunicorn"))
+    monkeypatch.setattr(run, "serve_uvicorn", lambda *args, reload=False: calls.append("reload" if reload else "uvicorn"))
+    run.main(argv)
+    server, bootstraps = expected
+    assert calls == ["bootstrap", "dispose"] * bootstraps + [server]
+
+
+def test_run_app_is_imported_on_demand():
+    assert run.app is app
+    with pytest.raises(AttributeError):
+        run.application
+    # In a fresh interpreter: importing run leaves the app unimported until run.app is read.
+    script = "import sys, run; assert 'app.api.api' not in sys.modules; run.app; assert 'app.api.api' in sys.modules"
+    subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, env=_environment(), check=True)
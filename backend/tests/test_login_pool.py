@@ -0,0 +1,61 @@
+# backend/tests/test_login_pool.py
+"""
+A login returns its connection to the pool before the response is sent: a burst of logins far larger
+than the pool completes without waiting out the pool timeout, and no request ends holding a connection.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.api.api import app
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.database import leak_detector, models, session
+
+LOGINS = 10_000
+# Logins in flight at once: many more than the pool has connections, fewer than the hasher queues.
+CONCURRENCY = 32
+PASSWORD = "correct horse"
+
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    # Far shorter than the run: one leaked connection per login would exhaust the pool within it.
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 2)
+    created = session._create_engine()
+    leak_detector.attach_leak_detector(created)
+    monkeypatch.setattr(session, "engine", created)
+    yield created
+    created.dispose()
+
+
+@pytest.fixture
+def login_user(db):
+    db.add(models.User(username="login", email="login@example.com", password_hash=get_password_hash(PASSWORD), role="customer"))
+    db.commit()
+
+
+async def _login_burst() -> list:
+    transport = httpx.ASGITransport(app=leak_detector.ConnectionLeakMiddleware(app))
+    statuses = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def worker(count: int):
+            for _ in range(count):
+                response = await client.post("/api/v1/auth/token", data={"username": "login", "password": PASSWORD})
+                statuses.append(response.status_code)
+        # The first worker also runs the remainder, so that exactly LOGINS logins are made.
+        share, remainder = divmod(LOGINS, CONCURRENCY)
+        await asyncio.gather(*(worker(share + (remainder if index == 0 else 0)) for index in range(CONCURRENCY)))
+    return statuses
+
+
+def test_login_burst_on_a_small_pool(small_pool, login_user):
+    leaked_before = leak_detector.leaked_connections
+    statuses = asyncio.run(_login_burst())
+    assert len(statuses) == LOGINS
+    assert set(statuses) == {200}
+    assert leak_detector.leaked_connections == leaked_before
+    assert small_pool.pool.checkedout() == 0
@@ -0,0 +1,91 @@
+# backend/tests/test_migrations.py
+"""
+Migrations run once per database and are recorded in schema_migrations; a database brought up to
+date by them, new or old, has an index for every foreign key, filter column and main read query.
+"""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.database import models
+from app.database.migrations import MIGRATIONS, run_migrations, schema_migrations
+from app.database.schema_audit import audit_indexes, audit_plans
+from app.database.session import Base
+
+VERSIONS = [version for version, _ in MIGRATIONS]
+
+
+def _applied(engine):
+    with engine.connect() as connection:
+        return sorted(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+@pytest.fixture
+def old_database(tmp_path):
+    """
+    A SQLite database as created before the migrations existed: the tables, without the indexes
+    and tables the migrations add.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    later = {models.DailyProductSales.__table__, models.DailyOrderSummary.__table__, models.MonthlyProductSales.__table__}
+    Base.metadata.create_all(engine, tables=[table for table in Base.metadata.sorted_tables if table not in later])
+    with engine.begin() as connection:
+        for table in ("products", "orders", "order_items"):
+            for index in inspect(connection).get_indexes(table):
+                connection.exec_driver_sql(f"DROP INDEX {index['name']}")
+    with Session(engine) as db:
+        category = models.Category(name="category")
+        user = models.User(username="buyer", email="buyer@example.com", password_hash="-", role="customer")
+        db.add_all([category, user])
+        db.flush()
+        product = models.Product(name="product", description="-", price=Decimal("2.50"), stock_quantity=5, category_id=category.category_id)
+        db.add(product)
+        db.flush()
+        order = models.Order(user_id=user.user_id, total_amount=Decimal("5.00"), status="shipped")
+        db.add(order)
+        db.flush()
+        db.add(models.OrderItem(order_id=order.order_id, product_id=product.product_id, quantity=2, price_at_purchase=Decimal("2.50")))
+        db.commit()
+    yield engine
+    engine.dispose()
+
+
+def test_migrated_test_database_records_every_version(database):
+    assert _applied(database) == sorted(VERSIONS)
+
+
+def test_second_run_applies_nothing(database, capsys):
+    run_migrations(database)
+    assert "Applying migration" not in capsys.readouterr().out
+    assert _applied(database) == sorted(VERSIONS)
+
+
+def test_old_database_is_migrated_once(old_database, capsys):
+    with old_database.connect() as connection:
+        assert audit_indexes(connection)
+
+    run_migrations(old_database)
+    output = capsys.readouterr().out
+    assert [line.split()[-1].rstrip(".") for line in output.splitlines() if line.startswith("Applying")] == VERSIONS
+    assert _applied(old_database) == sorted(VERSIONS)
+    # The rollup tables exist and hold the orders placed before them.
+    with old_database.connect() as connection:
+        assert connection.execute(select(func.sum(models.DailyProductSales.units))).scalar() == 2
+        assert connection.execute(select(func.sum(models.MonthlyProductSales.units))).scalar() == 2
+        assert connection.execute(select(func.sum(models.DailyOrderSummary.units))).scalar() == 2
+
+    run_migrations(old_database)
+    assert "Applying migration" not in capsys.readouterr().out
+    assert _applied(old_database) == sorted(VERSIONS)
+
+
+@pytest.mark.parametrize("migrated", ["test database", "old database"])
+def test_schema_audit_finds_nothing_missing(database, old_database, migrated):
+    engine = database if migrated == "test database" else old_database
+    if engine is old_database:
+        run_migrations(old_database)
+    with engine.begin() as connection:
+        assert audit_indexes(connection) == []
+        assert audit_plans(connection) == []
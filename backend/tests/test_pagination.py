@@ -0,0 +1,89 @@
+# backend/tests/test_pagination.py
+"""
+Keyset pagination: following X-Next-Cursor visits every row exactly once, whatever the sort and
+however many rows tie on it, and a cursor the server did not issue is a 400.
+"""
+import base64
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import update
+
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from app.database import models
+
+SORTS = ["product_id", "price", "-price", "name", "-name", "created_at", "-created_at"]
+
+
+@pytest.fixture
+def tied_catalog(catalog, db):
+    # Half the products share one price and every product shares its created_at: pages break inside the ties.
+    product_ids, _ = catalog(products=7)
+    db.execute(update(models.Product).filter(models.Product.product_id.in_(product_ids[::2])).values(price=Decimal("5.00")))
+    db.execute(update(models.Product).values(created_at=datetime(2024, 1, 1, tzinfo=timezone.utc)))
+    db.commit()
+    return product_ids
+
+
+def _walk(client, limit, **params):
+    pages, cursor = [], None
+    while True:
+        response = client.get("/api/v1/products/", params={"limit": limit, **params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        pages.append(response)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+        assert len(pages) < 100, "the cursor does not advance"
+
+
+@pytest.mark.parametrize("sort", SORTS)
+def test_walk_visits_every_product_once(client, tied_catalog, sort):
+    pages = _walk(client, 3, sort=sort)
+    seen = [product["product_id"] for page in pages for product in page.json()]
+    assert sorted(seen) == sorted(tied_catalog)
+    # The same order as one page holding everything.
+    everything = client.get("/api/v1/products/", params={"limit": 100, "sort": sort}).json()
+    assert seen == [product["product_id"] for product in everything]
+
+
+def test_last_page_has_no_cursor(client, tied_catalog):
+    # 14 products: pages of 5, 5 and 4; the last is short, so there is nothing after it.
+    pages = _walk(client, 5)
+    assert [len(page.json()) for page in pages] == [5, 5, 4]
+    assert NEXT_CURSOR_HEADER not in pages[-1].headers
+
+
+def test_full_last_page_is_followed_by_an_empty_one(client, tied_catalog):
+    # A last page that happens to be full cannot know it is the last: its cursor leads to an empty page without one.
+    pages = _walk(client, 7)
+    assert [len(page.json()) for page in pages] == [7, 7, 0]
+    assert NEXT_CURSOR_HEADER not in pages[-1].headers
+
+
+def _raw(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("sort, cursor", [
+    ("product_id", "not a cursor!"),
+    ("product_id", "%%%"),
+    ("product_id", _raw("not json")),
+    ("product_id", _raw('{"product_id": 3}')),
+    ("product_id", _raw("[1, 2]")),
+    ("product_id", encode_cursor(["three"])),
+    ("product_id", encode_cursor([[3]])),
+    ("price", encode_cursor([3])),
+    ("price", encode_cursor(["cheap", 3])),
+    ("price", encode_cursor(["NaN-ish", 3])),
+    ("price", encode_cursor(["NaN", 3])),
+    ("created_at", encode_cursor(["yesterday", 3])),
+    ("created_at", encode_cursor([12, 3])),
+    ("name", encode_cursor([{"a": 1}, 3])),
+    ("product_id", _raw("[1]")[:-1] + "\xff"),
+])
+def test_tampered_cursor_is_a_400(client, tied_catalog, sort, cursor):
+    response = client.get("/api/v1/products/", params={"sort": sort, "cursor": cursor})
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "Invalid pagination cursor"
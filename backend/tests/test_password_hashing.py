@@ -0,0 +1,80 @@
+# backend/tests/test_password_hashing.py
+"""
+The password hashing pool admits at most max_pending operations: once it is full, a login gets a
+503 with Retry-After at once instead of queueing, and the pool's counters say what happened.
+"""
+import threading
+import time
+
+import pytest
+
+from app.api import internal
+from app.core import security
+from app.core.hashing import PasswordHasher
+
+
+class SlowContext:
+    """
+    A CryptContext stand-in whose operations block until `release` is set.
+    """
+
+    def __init__(self, release: threading.Event):
+        self.release = release
+
+    def verify(self, plain_password, hashed_password):
+        assert self.release.wait(10)
+        return False
+
+    def hash(self, password):
+        assert self.release.wait(10)
+        return "hashed"
+
+
+@pytest.fixture
+def slow_hasher(monkeypatch):
+    release = threading.Event()
+    hasher = PasswordHasher(lambda: SlowContext(release), workers=1, max_pending=2)
+    monkeypatch.setattr(security, "password_hasher", hasher)
+    monkeypatch.setattr(internal, "password_hasher", hasher)
+    yield hasher, release
+    release.set()
+    hasher.shutdown()
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_full_pool_rejects_logins_with_503(client, users, auth, slow_hasher):
+    hasher, release = slow_hasher
+    admin, customer = users
+    # One operation running and one queued fill the pool.
+    blocked = [threading.Thread(target=hasher.verify, args=("password", "hash")) for _ in range(2)]
+    for thread in blocked:
+        thread.start()
+    _wait_for(lambda: hasher.stats()["running"] == 1 and hasher.stats()["queue_depth"] == 1)
+
+    response = client.post("/api/v1/auth/token", data={"username": customer.username, "password": "password"})
+    assert response.status_code == 503, response.text
+    assert response.headers["retry-after"] == "1"
+    stats = client.get("/internal/metrics/password-hashing", headers=auth(admin)).json()
+    assert stats["rejected"] == 1
+    assert stats["peak_pending"] == 2
+    assert stats["completed"] == 0
+
+    release.set()
+    for thread in blocked:
+        thread.join(5)
+    stats = hasher.stats()
+    assert stats["completed"] == 2
+    assert stats["queue_depth"] == 0 and stats["running"] == 0
+    assert stats["avg_wait_ms"] > 0 and stats["avg_run_ms"] > 0
+
+    # With room again, the login reaches the (stand-in) password check and is refused on its merits.
+    response = client.post("/api/v1/auth/token", data={"username": customer.username, "password": "password"})
+    assert response.status_code == 401
+    assert hasher.stats()["completed"] == 3
+    assert hasher.stats()["rejected"] == 1
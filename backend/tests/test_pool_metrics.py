@@ -0,0 +1,48 @@
+# backend/tests/test_pool_metrics.py
+"""
+The instrumented pool counts checkouts and times their waits, and the internal metrics are only
+served to admins and to a scraper holding METRICS_TOKEN.
+"""
+import pytest
+
+from app.core.config import settings
+from app.database.session import get_engine
+
+METRICS_PATHS = ["/internal/metrics", "/internal/metrics/db-pool", "/internal/metrics/cache", "/internal/metrics/password-hashing", "/internal/metrics/jobs"]
+
+
+def test_checkout_is_counted_and_timed(client, users, auth):
+    admin, _ = users
+    before = client.get("/internal/metrics/db-pool", headers=auth(admin)).json()["primary"]
+    with get_engine().connect():
+        during = client.get("/internal/metrics/db-pool", headers=auth(admin)).json()["primary"]
+    after = client.get("/internal/metrics/db-pool", headers=auth(admin)).json()["primary"]
+
+    assert during["pool_class"] == "InstrumentedQueuePool"
+    # At least the test's own checkout; the requests in between may add theirs.
+    assert during["checkouts"] >= before["checkouts"] + 1
+    assert during["checked_out"] >= 1
+    waits = after["wait_ms"]
+    assert waits["count"] >= before["wait_ms"]["count"] + 1
+    assert waits["buckets"]["le_inf"] == waits["count"]
+    assert list(waits["buckets"].values()) == sorted(waits["buckets"].values())
+    assert waits["sum"] >= 0 and waits["max"] >= 0
+
+
+@pytest.mark.parametrize("path", METRICS_PATHS)
+def test_metrics_need_an_admin(client, users, auth, path):
+    admin, customer = users
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers=auth(customer)).status_code == 403
+    assert client.get(path, headers=auth(admin)).status_code == 200
+
+
+@pytest.mark.parametrize("path", METRICS_PATHS)
+def test_metrics_token(client, monkeypatch, path):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scraper-secret")
+    assert client.get(path, headers={"Authorization": "Bearer scraper-secret"}).status_code == 200
+    assert client.get(path, headers={"Authorization": "Bearer wrong-secret"}).status_code == 401
+
+
+def test_health_probes_stay_open(client):
+    assert client.get("/internal/health/live").status_code == 200
@@ -0,0 +1,71 @@
+# backend/tests/test_product_cache.py
+"""
+The read-through product cache: hits (and conditional GETs on hits) cost no query, writes are
+seen by the next read, and a read racing a write cannot put the old row back.
+"""
+import json
+
+from sqlalchemy import update
+
+from app.database import models
+from app.database.session import SessionLocal
+from app.services import product as product_services
+
+
+def test_hits_and_revalidations_need_no_query(client, catalog, count_queries):
+    product_ids, _ = catalog()
+    for path in (f"/api/v1/products/{product_ids[0]}", "/api/v1/products/?limit=3&sort=-price"):
+        first = client.get(path)
+        with count_queries:
+            hit = client.get(path)
+            revalidated = client.get(path, headers={"If-None-Match": first.headers["etag"]})
+        assert hit.content == first.content
+        assert revalidated.status_code == 304
+        assert count_queries.count == 0, count_queries.statements
+
+
+def test_writes_invalidate(client, catalog):
+    product_ids, _ = catalog()
+    item, page = f"/api/v1/products/{product_ids[0]}", "/api/v1/products/?limit=3"
+    before = client.get(item).json()
+    client.get(page)
+    changed = {key: before[key] for key in ("name", "price", "category_id")}
+    assert client.put(item, json={**changed, "stock_quantity": 1}).status_code == 200
+    assert client.get(item).json()["stock_quantity"] == 1
+    assert client.get(page).json()[0]["stock_quantity"] == 1
+
+
+def test_read_racing_a_write_does_not_cache_the_old_row(catalog, monkeypatch):
+    product_ids, _ = catalog(stock=8)
+    product_id = product_ids[0]
+    load = product_services.get_product
+
+    def load_then_write(db, product_id):
+        # The row is read, then a write commits and invalidates before the read stores its result.
+        db_product = load(db, product_id)
+        with SessionLocal() as writer:
+            writer.execute(update(models.Product).filter(models.Product.product_id == product_id).values(stock_quantity=3))
+            writer.commit()
+        product_services.invalidate_products(product_id)
+        return db_product
+
+    monkeypatch.setattr(product_services, "get_product", load_then_write)
+    with SessionLocal() as db:
+        assert json.loads(product_services.get_product_json(db, product_id))["stock_quantity"] == 8
+    monkeypatch.setattr(product_services, "get_product", load)
+    with SessionLocal() as db:
+        assert json.loads(product_services.get_product_json(db, product_id))["stock_quantity"] == 3
+
+
+def test_invalidation_is_limited_to_the_product_bucket(catalog, count_queries):
+    product_ids, _ = catalog()
+    with SessionLocal() as db:
+        for product_id in product_ids[:2]:
+            product_services.get_product_json(db, product_id)
+        product_services.invalidate_products(product_ids[0])
+        with count_queries:
+            product_services.get_product_json(db, product_ids[1])
+        assert count_queries.count == 0
+        with count_queries:
+            product_services.get_product_json(db, product_ids[0])
+        assert count_queries.count == 1
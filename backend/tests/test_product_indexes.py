@@ -0,0 +1,77 @@
+# backend/tests/test_product_indexes.py
+"""
+Every filter and sort shape of the product listing is answered from an index, never a scan of the
+whole products table. On SQLite the plans come from EXPLAIN QUERY PLAN; on PostgreSQL from EXPLAIN
+with sequential scans priced out, so a test table small enough to scan cheaply still shows whether
+an index can serve the query.
+"""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.core.pagination import encode_cursor
+from app.database import models
+from app.database.schema_audit import Explain, full_scans
+from app.schemas.product import ProductFilter
+from app.services.product import _products_query, _sort_key
+
+CATEGORY = {"category_id": 1}
+PRICE_RANGE = {"min_price": Decimal("2.00"), "max_price": Decimal("9.00")}
+
+# (filters, the index SQLite is expected to read products through). None: the sort is by
+# product_id, so the table itself (keyed by its integer primary key) is walked in order.
+SHAPES = [
+    ({"sort": "product_id"}, None),
+    ({"sort": "price"}, "ix_products_price"),
+    ({"sort": "-price"}, "ix_products_price"),
+    ({"sort": "created_at"}, "ix_products_created_at"),
+    ({"sort": "-created_at"}, "ix_products_created_at"),
+    ({"sort": "name"}, "ix_products_name"),
+    ({"sort": "-name"}, "ix_products_name"),
+    ({"sort": "product_id", **CATEGORY}, "ix_products_category_"),
+    ({"sort": "price", **CATEGORY}, "ix_products_category_price"),
+    ({"sort": "-price", **CATEGORY}, "ix_products_category_price"),
+    ({"sort": "created_at", **CATEGORY}, "ix_products_category_created_at"),
+    ({"sort": "name", **CATEGORY}, "ix_products_category_name"),
+    ({"sort": "price", **CATEGORY, **PRICE_RANGE}, "ix_products_category_price"),
+    ({"sort": "price", **PRICE_RANGE}, "ix_products_price"),
+    ({"sort": "name", **PRICE_RANGE}, "ix_products_"),
+    ({"sort": "price", "in_stock": True}, "ix_products_price"),
+    ({"sort": "name", **CATEGORY, "in_stock": True}, "ix_products_category_name"),
+    ({"sort": "product_id", "in_stock": True}, None),
+]
+
+
+def assert_uses_index(connection, query, index):
+    if connection.dialect.name not in ("sqlite", "postgresql"):
+        pytest.skip(f"no plan check for {connection.dialect.name}")
+    # The same check as python -m app.database.schema_audit --explain: no full scan of a table.
+    assert full_scans(connection, query, pk_ordered=index is None) == []
+    if connection.dialect.name == "sqlite" and index is not None:
+        # On PostgreSQL the planner may pick a different, equally indexed path; SQLite's choice is checked too.
+        plan = [row[-1] for row in connection.execute(Explain(query))]
+        products = [line for line in plan if " products" in line]
+        assert products, plan
+        assert all(f"USING INDEX {index}" in line or f"USING COVERING INDEX {index}" in line for line in products), plan
+
+
+@pytest.fixture
+def last_product(catalog, db):
+    catalog(products=5)
+    return db.scalars(select(models.Product).order_by(models.Product.product_id.desc())).first()
+
+
+@pytest.mark.parametrize("filters, index", SHAPES)
+def test_listing_uses_an_index(database, filters, index):
+    with database.begin() as connection:
+        assert_uses_index(connection, _products_query(0, 20, None, ProductFilter(**filters)), index)
+
+
+@pytest.mark.parametrize("filters, index", SHAPES)
+def test_next_page_uses_an_index(database, last_product, filters, index):
+    filters = ProductFilter(**filters)
+    columns, _ = _sort_key(filters)
+    cursor = encode_cursor([getattr(last_product, column.key) for column in columns])
+    with database.begin() as connection:
+        assert_uses_index(connection, _products_query(0, 20, cursor, filters), index)
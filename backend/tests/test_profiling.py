@@ -0,0 +1,120 @@
+# backend/tests/test_profiling.py
+"""
+ProfilingMiddleware keys its metrics by route template, reports a request's own figures in
+Server-Timing, and serves them all from GET /internal/metrics in the Prometheus text format; the
+query profiler logs statements at least SLOW_QUERY_THRESHOLD_MS slow. PROFILING_ENABLED is off by
+default, so the middleware is put around the app here.
+"""
+import logging
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+
+from app.api.api import app
+from app.core.config import settings
+from app.core.profiling import UNMATCHED_ROUTE, ProfilingMiddleware, route_metrics
+from app.database import models, session
+
+SERVER_TIMING = re.compile(r'^db;desc="(\d+) statements";dur=([\d.]+), serialize;dur=([\d.]+), total;dur=([\d.]+)$')
+SAMPLE = re.compile(r'^(\w+)\{method="([^"]*)",route="([^"]*)",status="(\d+)"(?:,le="[^"]*")?\} (\S+)$')
+
+
+@pytest.fixture
+def profiled_client(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_TIMING_HEADER", True)
+    return TestClient(ProfilingMiddleware(app))
+
+
+def _counts(client, headers) -> dict:
+    response = client.get("/internal/metrics", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    counts = {}
+    for line in response.text.splitlines():
+        match = SAMPLE.match(line)
+        if match and match.group(1) == "http_request_duration_seconds_count":
+            counts[match.group(2, 3, 4)] = int(match.group(5))
+    return counts
+
+
+def test_server_timing_header(profiled_client, catalog):
+    product_ids, _ = catalog(products=1)
+    response = profiled_client.get(f"/api/v1/products/{product_ids[0]}")
+    assert response.status_code == 200
+    match = SERVER_TIMING.match(response.headers["server-timing"])
+    assert match, response.headers["server-timing"]
+    statements, db_ms, serialize_ms, total_ms = match.groups()
+    assert int(statements) >= 1
+    assert 0 < float(db_ms) <= float(total_ms)
+    assert float(serialize_ms) <= float(total_ms)
+
+
+def test_metrics_are_keyed_by_route_template(profiled_client, users, auth, db):
+    admin, _ = users
+    product_ids = db.execute(select(models.Product.product_id)).scalars().all()
+    before = _counts(profiled_client, auth(admin))
+    for product_id in [*product_ids, product_ids[0]]:
+        assert profiled_client.get(f"/api/v1/products/{product_id}").status_code == 200
+    assert profiled_client.get("/api/v1/products/999999").status_code == 404
+    assert profiled_client.get("/no/such/path/1").status_code == 404
+    after = _counts(profiled_client, auth(admin))
+
+    def added(key):
+        return after.get(key, 0) - before.get(key, 0)
+    # Two product ids, one series; and not one per path for the unknown paths either.
+    assert added(("GET", "/api/v1/products/{product_id}", "200")) == 3
+    assert added(("GET", "/api/v1/products/{product_id}", "404")) == 1
+    assert added(("GET", UNMATCHED_ROUTE, "404")) == 1
+    assert not any(route.startswith("/api/v1/products/") and "{" not in route for _, route, _ in after)
+
+
+def test_prometheus_text_format(profiled_client, users, auth):
+    admin, _ = users
+    profiled_client.get("/api/v1/categories/")
+    body = profiled_client.get("/internal/metrics", headers=auth(admin)).text
+    assert body.endswith("\n")
+    types = dict(re.findall(r"^# TYPE (\S+) (\S+)$", body, re.M))
+    assert types == {
+        "http_request_duration_seconds": "histogram",
+        "http_request_db_statements": "histogram",
+        "http_request_db_seconds_total": "counter",
+        "http_request_serialization_seconds_total": "counter",
+        "db_slow_queries_total": "counter",
+    }
+    for line in body.splitlines():
+        if not line.startswith("#"):
+            assert SAMPLE.match(line) or re.match(r"^db_slow_queries_total \d+$", line), line
+    # Buckets are cumulative and end with +Inf, which equals the count.
+    labels = 'method="GET",route="/api/v1/categories/",status="200"'
+    buckets = [int(value) for value in re.findall(rf'^http_request_duration_seconds_bucket\{{{labels},le="[^"]*"\}} (\d+)$', body, re.M)]
+    assert buckets == sorted(buckets) and len(buckets) == len(route_metrics.DURATION_BUCKETS) + 1
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {buckets[-1]}' in body
+    assert f"http_request_duration_seconds_count{{{labels}}} {buckets[-1]}" in body
+
+
+def test_slow_query_log(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    engine = session._create_engine(metrics_name="slow-query-test")
+    slow_queries = route_metrics.slow_queries
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.database.slow_queries"), engine.connect() as connection:
+            connection.execute(text("SELECT 42"))
+    finally:
+        engine.dispose()
+    records = [record for record in caplog.records if record.name == "app.database.slow_queries"]
+    assert any("outside a request" in record.getMessage() and "SELECT 42" in record.getMessage() for record in records)
+    assert route_metrics.slow_queries >= slow_queries + 1
+
+
+def test_negative_threshold_disables_the_slow_query_log(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", -1)
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", False)
+    engine = session._create_engine(metrics_name="slow-query-test")
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.database.slow_queries"), engine.connect() as connection:
+            connection.execute(text("SELECT 42"))
+    finally:
+        engine.dispose()
+    assert not [record for record in caplog.records if record.name == "app.database.slow_queries"]
@@ -0,0 +1,59 @@
+# backend/tests/test_query_counts.py
+"""
+List endpoints load each response graph with a fixed number of statements, whatever the page size.
+"""
+from decimal import Decimal
+
+import pytest
+
+from app.core.security import create_access_token
+from app.database import models
+
+
+@pytest.fixture
+def orders(db, catalog):
+    product_ids, user_ids = catalog(products=10, users=3)
+    for index in range(40):
+        db_order = models.Order(user_id=user_ids[index % len(user_ids)], total_amount=Decimal("3.00"), status="pending")
+        db.add(db_order)
+        db.flush()
+        db.add_all([
+            models.OrderItem(order_id=db_order.order_id, product_id=product_ids[(index + offset) % len(product_ids)], quantity=1, price_at_purchase=Decimal("1.00"))
+            for offset in range(3)
+        ])
+    db.commit()
+
+
+@pytest.mark.parametrize("path, statements", [
+    # The orders with their users joined, then every item of the page with its product and category.
+    ("/api/v1/orders/?limit={limit}", 2),
+    # The products with their categories joined (the cache is cold: every limit is a new page).
+    ("/api/v1/products/?limit={limit}", 1),
+])
+def test_list_statements_do_not_grow_with_the_page(client, count_queries, orders, path, statements):
+    for limit in (1, 5, 20):
+        with count_queries:
+            response = client.get(path.format(limit=limit))
+        assert response.status_code == 200, response.text
+        assert len(response.json()) == limit
+        assert count_queries.count == statements, count_queries.statements
+
+
+@pytest.mark.parametrize("path, statements", [
+    ("/api/v1/orders/{order_id}", 2),
+    # The order (to tell a missing order from one without items), then the items with products and categories.
+    ("/api/v1/orders/{order_id}/items", 3),
+    # The page of orders, then their items: the token costs no query.
+    ("/api/v1/users/{user_id}/orders?limit=20", 2),
+])
+def test_detail_statements(client, count_queries, orders, db, path, statements):
+    db_order = db.query(models.Order).first()
+    db_user = db_order.user
+    token = create_access_token({"sub": db_user.username, "uid": db_user.user_id, "role": db_user.role})
+    path = path.format(order_id=db_order.order_id, user_id=db_user.user_id)
+    # Once, so that the revocation set is loaded before counting.
+    client.get(path, headers={"Authorization": f"Bearer {token}"})
+    with count_queries:
+        response = client.get(path, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200, response.text
+    assert count_queries.count == statements, count_queries.statements
@@ -0,0 +1,65 @@
+# backend/tests/test_read_sessions.py
+"""
+The read endpoints answer the same over the sync engine and, with DATABASE_ASYNC, over the async one.
+"""
+import pytest
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.database import session
+
+READ_PATHS = [
+    "/api/v1/products/?limit=3",
+    "/api/v1/products/?sort=-price&category_id={category_id}",
+    "/api/v1/products/{product_id}",
+    "/api/v1/products/search?q=product",
+    "/api/v1/categories/",
+    "/api/v1/categories/{category_id}",
+    "/api/v1/orders/",
+    "/api/v1/orders/{order_id}",
+    "/api/v1/orders/{order_id}/items",
+    "/api/v1/users/{user_id}",
+    "/api/v1/users/{user_id}/orders",
+]
+
+
+@pytest.fixture
+def async_engine(monkeypatch):
+    created = session._create_async_engine()
+    monkeypatch.setattr(settings, "DATABASE_ASYNC", True)
+    monkeypatch.setattr(session, "async_engine", created)
+    yield created
+    created.sync_engine.dispose()
+
+
+@pytest.fixture
+def placed_order(client, catalog):
+    product_ids, user_ids = catalog(products=3, users=1)
+    response = client.post("/api/v1/orders/", json={
+        "user_id": user_ids[0],
+        "order_items": [{"order_id": 0, "product_id": product_ids[0], "quantity": 2, "price_at_purchase": "0.00"}],
+    })
+    assert response.status_code == 201, response.text
+    order = response.json()
+    return {
+        "order_id": order["order_id"], "user_id": order["user_id"], "product_id": product_ids[0],
+        "category_id": order["order_items"][0]["product"]["category_id"],
+    }
+
+
+def _read_all(client, ids):
+    token = create_access_token({"sub": "user0", "uid": ids["user_id"], "role": "customer"})
+    responses = {}
+    for path in READ_PATHS:
+        response = client.get(path.format(**ids), headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200, (path, response.text)
+        responses[path] = response.json()
+    return responses
+
+
+def test_async_engine_serves_the_same_responses(client, placed_order, request):
+    expected = _read_all(client, placed_order)
+    async_engine = request.getfixturevalue("async_engine")
+    assert _read_all(client, placed_order) == expected
+    # The reads really went through the async engine's pool.
+    assert async_engine.sync_engine.pool.checkedin() > 0
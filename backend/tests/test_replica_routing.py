@@ -0,0 +1,81 @@
+# backend/tests/test_replica_routing.py
+"""
+Read-only sessions read from a replica picked without connecting; a replica that refuses the connection
+is skipped for the next one, then the primary. Sync and async sessions alike.
+"""
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.database import models, session
+from app.database.replicas import Replica, ReplicaSet
+
+
+@pytest.fixture
+def replica_urls(database, tmp_path):
+    # A replica that cannot be opened, and one that is a second engine on the test database.
+    return [f"sqlite:///{tmp_path}/missing/replica.db", settings.DATABASE_URL]
+
+
+def _replica_set(engines) -> ReplicaSet:
+    # Retried only after the test: each failure is counted once.
+    return ReplicaSet([Replica(f"replica{index}", engine) for index, engine in enumerate(engines, 1)], "round_robin", 3600)
+
+
+@pytest.fixture
+def sync_replicas(monkeypatch, replica_urls):
+    engines = [session._create_engine(url, f"test_replica{index}") for index, url in enumerate(replica_urls, 1)]
+    replica_set = _replica_set(engines)
+    monkeypatch.setattr(session, "replicas", replica_set)
+    yield replica_set
+    replica_set.dispose()
+
+
+@pytest.fixture
+def async_replicas(monkeypatch, replica_urls):
+    engines = [session._create_async_engine(session.async_url(url), f"test_async_replica{index}") for index, url in enumerate(replica_urls, 1)]
+    async_engine = session._create_async_engine()
+    monkeypatch.setattr(settings, "DATABASE_ASYNC", True)
+    monkeypatch.setattr(session, "async_engine", async_engine)
+    replica_set = _replica_set([engine.sync_engine for engine in engines])
+    monkeypatch.setattr(session, "async_replicas", replica_set)
+    yield replica_set
+    replica_set.dispose()
+    async_engine.sync_engine.dispose()
+
+
+def test_get_bind_does_not_connect(sync_replicas, catalog):
+    catalog(products=1)
+    bad, good = sync_replicas.replicas
+    with session.SessionLocal(info={session.READ_ONLY: True}) as db:
+        bind = db.get_bind()
+        assert bind in (bad.engine, good.engine)
+        assert bad.failures == 0 and good.engine.pool.checkedout() == 0
+        assert db.execute(select(models.Product.name).limit(1)).scalar() == "product 0"
+    # Whichever was picked first, the session ended up reading from the good one.
+    assert bad.failures <= 1 and good.sessions == 1
+    assert sync_replicas.primary_fallbacks == 0
+
+
+def test_falls_back_to_the_primary(sync_replicas, catalog):
+    catalog(products=1)
+    bad, good = sync_replicas.replicas
+    sync_replicas.replicas = [bad]
+    with session.SessionLocal(info={session.READ_ONLY: True}) as db:
+        assert db.get_bind() is bad.engine
+        assert db.execute(select(models.Product.name).limit(1)).scalar() == "product 0"
+        assert db.get_bind() is session.get_engine()
+    assert bad.failures == 1 and sync_replicas.primary_fallbacks == 1
+
+
+@pytest.mark.parametrize("replicas_fixture", ["sync_replicas", "async_replicas"])
+def test_search_reads_from_replicas(client, catalog, request, replicas_fixture):
+    catalog(products=3)
+    expected = client.get("/api/v1/products/search?q=product").json()
+    replica_set = request.getfixturevalue(replicas_fixture)
+    bad, good = replica_set.replicas
+    for _ in range(4):
+        response = client.get("/api/v1/products/search?q=product")
+        assert response.status_code == 200, response.text
+        assert response.json() == expected
+    assert bad.failures == 1 and good.sessions >= 3
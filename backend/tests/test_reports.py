@@ -0,0 +1,116 @@
+# backend/tests/test_reports.py
+"""
+Reports read from the rollups (whole months from the monthly product sales, the days around them from the
+daily ones) and must agree with the same aggregates computed from orders and order_items directly.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.database import models
+from app.services import report as report_services
+from app.services.report import SALES_STATUSES
+
+ORDER_DATES = [
+    datetime(2025, 1, 31, 23, 30, tzinfo=timezone.utc), datetime(2025, 2, 1, tzinfo=timezone.utc),
+    datetime(2025, 2, 15, 12, tzinfo=timezone.utc), datetime(2025, 3, 31, tzinfo=timezone.utc),
+    datetime(2025, 4, 1, tzinfo=timezone.utc), datetime(2025, 7, 14, tzinfo=timezone.utc),
+    datetime(2025, 12, 31, 23, 59, tzinfo=timezone.utc),
+]
+
+PERIODS = [
+    (date(2025, 1, 1), date(2025, 12, 31)),
+    (date(2025, 1, 15), date(2025, 12, 20)),
+    (date(2025, 2, 1), date(2025, 3, 31)),
+    (date(2025, 1, 31), date(2025, 2, 1)),
+    (date(2025, 2, 2), date(2025, 3, 30)),
+    (date(2025, 7, 14), date(2025, 7, 14)),
+]
+
+
+@pytest.fixture
+def orders(catalog, db, database):
+    product_ids, user_ids = catalog(products=3, users=1)
+    for index, order_date in enumerate(ORDER_DATES):
+        items = [(product_ids[(index + offset) % len(product_ids)], index % 3 + offset + 1, Decimal("2.50") + offset) for offset in range(3)]
+        db_order = models.Order(
+            user_id=user_ids[0], order_date=order_date, status="cancelled" if index == 5 else "delivered",
+            total_amount=sum(quantity * price for _, quantity, price in items),
+        )
+        db.add(db_order)
+        db.flush()
+        db.add_all(models.OrderItem(order_id=db_order.order_id, product_id=product_id, quantity=quantity, price_at_purchase=price) for product_id, quantity, price in items)
+    db.commit()
+    with database.begin() as connection:
+        report_services.rebuild_rollups(connection)
+
+
+def _sold(db, start: date, end: date):
+    # (product, category, quantity, amount, order) of every item sold in the period, straight from the orders.
+    for db_order in db.query(models.Order).filter(models.Order.status.in_(SALES_STATUSES)):
+        if start <= report_services.sales_day(db_order.order_date) <= end:
+            for item in db_order.order_items:
+                yield item.product_id, item.product.category_id, item.quantity, item.quantity * item.price_at_purchase, db_order
+
+
+@pytest.mark.parametrize("start, end", PERIODS)
+def test_product_and_category_sales(db, orders, start, end):
+    products, categories = defaultdict(lambda: [0, 0]), defaultdict(lambda: [0, 0])
+    for product_id, category_id, quantity, amount, _ in _sold(db, start, end):
+        for totals in (products[product_id], categories[category_id]):
+            totals[0] += quantity
+            totals[1] += amount
+    top = report_services.top_products(db, start, end, limit=100)
+    assert {row["product_id"]: [row["units"], row["revenue"]] for row in top} == products
+    assert [row["revenue"] for row in top] == sorted((revenue for _, revenue in products.values()), reverse=True)
+    by_category = report_services.category_sales(db, start, end)
+    assert {row["category_id"]: [row["units"], row["revenue"]] for row in by_category} == categories
+
+
+@pytest.mark.parametrize("start, end", PERIODS)
+def test_daily_revenue(db, orders, start, end):
+    days = defaultdict(lambda: {"orders": set(), "units": 0, "revenue": Decimal("0")})
+    for _, _, quantity, _, db_order in _sold(db, start, end):
+        day = days[report_services.sales_day(db_order.order_date)]
+        day["units"] += quantity
+        if db_order.order_id not in day["orders"]:
+            day["orders"].add(db_order.order_id)
+            day["revenue"] += db_order.total_amount
+    expected = [
+        {"day": day, "orders": len(totals["orders"]), "units": totals["units"], "revenue": totals["revenue"]}
+        for day, totals in sorted(days.items())
+    ]
+    assert report_services.daily_revenue(db, start, end) == expected
+
+
+def test_incremental_rollups_match_a_rebuild(client, catalog, db, database):
+    product_ids, user_ids = catalog(products=3, users=1)
+    order_ids = []
+    for index in range(4):
+        response = client.post("/api/v1/orders/", json={"user_id": user_ids[0], "order_items": [
+            {"order_id": 0, "product_id": product_ids[index], "quantity": index + 1, "price_at_purchase": "0.00"},
+            {"order_id": 0, "product_id": product_ids[index + 1], "quantity": 1, "price_at_purchase": "0.00"},
+        ]})
+        assert response.status_code == 201, response.text
+        order_ids.append(response.json()["order_id"])
+    assert client.put(f"/api/v1/orders/{order_ids[0]}", json={"user_id": user_ids[0], "status": "cancelled"}).status_code == 200
+    assert client.delete(f"/api/v1/orders/{order_ids[1]}").status_code in (200, 204)
+
+    today = datetime.now(timezone.utc).date()
+    start = today.replace(month=1, day=1)
+
+    def reports():
+        db.expire_all()
+        return (
+            report_services.daily_revenue(db, start, today),
+            report_services.top_products(db, start, today),
+            report_services.category_sales(db, start, today),
+        )
+
+    incremental = reports()
+    assert incremental[0] and incremental[1]
+    with database.begin() as connection:
+        report_services.rebuild_rollups(connection)
+    assert reports() == incremental
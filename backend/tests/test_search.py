@@ -0,0 +1,108 @@
+# backend/tests/test_search.py
+"""
+GET /products/search: best match first, a name still found with one typo, the category filter
+applied on top of the query, and cursor pages that visit each match once. The portable LIKE ranking
+runs everywhere; the full-text and trigram ranking only against PostgreSQL (TEST_DATABASE_URL).
+"""
+from decimal import Decimal
+
+import pytest
+
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.database import models
+
+
+@pytest.fixture
+def shop(db):
+    """
+    Creates products from (name, description, category index) and returns their ids by name.
+    """
+    categories = [models.Category(name="audio"), models.Category(name="lighting")]
+    db.add_all(categories)
+    db.flush()
+
+    def create(*products):
+        rows = [
+            models.Product(name=name, description=description, price=Decimal("9.99"), stock_quantity=5, category_id=categories[category].category_id)
+            for name, description, category in products
+        ]
+        db.add_all(rows)
+        db.commit()
+        return {row.name: row.product_id for row in rows}
+    create.categories = categories
+    return create
+
+
+def _search(client, q, **params):
+    response = client.get("/api/v1/products/search", params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return response
+
+
+def _names(response):
+    return [product["name"] for product in response.json()]
+
+
+def test_name_matches_rank_above_description_matches(client, shop):
+    shop(
+        ("Studio monitor", "pairs well with headphones", 0),
+        ("Wireless headphones", "over-ear", 0),
+        ("Headphones stand", "holds your wireless headphones", 0),
+        ("Desk lamp", "bright", 1),
+    )
+    # Name and description both match, then name only, then description only; the lamp not at all.
+    assert _names(_search(client, "headphones")) == ["Headphones stand", "Wireless headphones", "Studio monitor"]
+    # Every term counts: both terms in the name beat one.
+    assert _names(_search(client, "wireless headphones"))[0] == "Wireless headphones"
+
+
+def test_one_typo_still_matches_the_name(client, shop):
+    shop(("Wireless headphones", "over-ear", 0), ("Desk lamp", "bright", 1))
+    for typo in ("headphnes", "headpohnes", "headphonez"):
+        assert _names(_search(client, typo)) == ["Wireless headphones"], typo
+    assert _search(client, "hdphns").json() == []
+
+
+def test_category_filter_applies_to_the_matches(client, shop):
+    ids = shop(("Lamp speaker", "a speaker", 0), ("Floor lamp", "tall", 1), ("Speaker cable", "2 m", 0))
+    audio, lighting = (category.category_id for category in shop.categories)
+    assert _names(_search(client, "lamp", category_id=lighting)) == ["Floor lamp"]
+    assert _names(_search(client, "lamp", category_id=audio)) == ["Lamp speaker"]
+    assert [product["product_id"] for product in _search(client, "lamp").json()] == sorted([ids["Lamp speaker"], ids["Floor lamp"]], reverse=True)
+
+
+def test_pages_visit_every_match_once(client, shop):
+    # Seven equally ranked matches and two better ones: pages of three break inside the tie.
+    shop(*[(f"Widget {index}", "plain", index % 2) for index in range(7)], ("Widget widget", "widget", 0), ("Widget pro", "a widget", 1))
+    everything = [product["product_id"] for product in _search(client, "widget", limit=100).json()]
+    assert len(everything) == 9
+
+    seen, cursor = [], None
+    while True:
+        response = _search(client, "widget", limit=3, **({"cursor": cursor} if cursor else {}))
+        seen += [product["product_id"] for product in response.json()]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+        assert len(seen) <= 9, "the cursor does not advance"
+    assert seen == everything
+
+
+def test_query_without_terms_matches_nothing(client, shop):
+    shop(("Desk lamp", "bright", 1))
+    assert _search(client, "%_!").json() == []
+
+
+def test_postgres_full_text_and_trigram_search(client, shop, database):
+    if database.dialect.name != "postgresql":
+        pytest.skip("the tsquery and word_similarity ranking needs PostgreSQL (TEST_DATABASE_URL)")
+    shop(
+        ("Studio monitor", "pairs well with headphones", 0),
+        ("Wireless headphones", "over-ear", 0),
+        ("Desk lamp", "bright", 1),
+    )
+    # Terms match as prefixes, the name outranks the description, and trigrams forgive a typo.
+    assert _names(_search(client, "headph")) == ["Wireless headphones", "Studio monitor"]
+    assert _names(_search(client, "headphones"))[0] == "Wireless headphones"
+    assert "Wireless headphones" in _names(_search(client, "headphnes"))
+    assert _names(_search(client, "lamp", category_id=shop.categories[0].category_id)) == []
@@ -0,0 +1,95 @@
+# backend/tests/test_serialization.py
+"""
+TrustedSerializer skips validation but not correctness: for products, orders (with their user and
+items, each with its product and category) and users, its output is the schema's own
+model_dump(mode="json"), Decimals, datetimes and None fields included, with orjson and without.
+"""
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.core import serialization
+from app.core.serialization import TrustedSerializer
+from app.database import models
+from app.schemas.order import Order
+from app.schemas.product import Product
+from app.schemas.user import User
+from app.services.order import ORDER_LOAD_OPTIONS
+from app.services.product import PRODUCT_LOAD_OPTIONS
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_library(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+def _assert_parity(schema, objs):
+    serializer = TrustedSerializer(schema)
+    expected = [schema.model_validate(obj).model_dump(mode="json") for obj in objs]
+    assert [serializer.to_python(obj) for obj in objs] == [schema.model_validate(obj).model_dump() for obj in objs]
+    assert [json.loads(serializer.dump(obj)) for obj in objs] == expected
+    assert json.loads(serializer.dump_many(objs)) == expected
+
+
+def _detached_order(created_at: datetime) -> models.Order:
+    """
+    An order as the ORM holds it, but with timezone-aware datetimes and every optional field set or None.
+    """
+    category = models.Category(category_id=1, name="audio")
+    user = models.User(
+        user_id=2, username="buyer", email="buyer@example.com", first_name="Ada", last_name=None, address=None,
+        city="Paris", state=None, zip_code="75001", country="FR", phone_number=None, role="customer",
+        created_at=created_at, updated_at=None,
+    )
+    products = [
+        models.Product(
+            product_id=3, name="headphones", description=None, price=Decimal("199.90"), stock_quantity=0,
+            image_url=None, category_id=1, category=category, created_at=created_at, updated_at=created_at + timedelta(microseconds=1),
+        ),
+        models.Product(
+            product_id=4, name="cable", description="2 m", price=Decimal("0.05"), stock_quantity=7,
+            image_url="https://example.com/cable.png", category_id=1, category=category, created_at=created_at, updated_at=None,
+        ),
+    ]
+    return models.Order(
+        order_id=5, user_id=2, user=user, order_date=created_at, total_amount=Decimal("200.00"), status="shipped",
+        shipping_address="1 rue de Rivoli", shipping_city="Paris", shipping_state=None, shipping_zip_code=None, shipping_country="FR",
+        order_items=[
+            models.OrderItem(order_item_id=index + 6, order_id=5, product_id=product.product_id, product=product, quantity=1, price_at_purchase=product.price)
+            for index, product in enumerate(products)
+        ],
+    )
+
+
+@pytest.mark.parametrize("created_at", [
+    datetime(2024, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    datetime(2024, 3, 1, 12, 30, tzinfo=timezone(timedelta(hours=2))),
+    datetime(2024, 3, 1, 12, 30, 15),
+])
+def test_detached_objects(json_library, created_at):
+    order = _detached_order(created_at)
+    _assert_parity(Order, [order])
+    _assert_parity(Product, [item.product for item in order.order_items])
+    _assert_parity(User, [order.user])
+
+
+def test_objects_loaded_by_our_queries(json_library, catalog, db):
+    product_ids, user_ids = catalog(products=2, users=2)
+    db.add(models.Order(
+        user_id=user_ids[0], total_amount=Decimal("4.50"), status="pending", shipping_city="Lyon",
+        order_items=[models.OrderItem(product_id=product_id, quantity=2, price_at_purchase=Decimal("1.125")) for product_id in product_ids[:2]],
+    ))
+    db.add(models.Order(user_id=user_ids[1], total_amount=Decimal("0"), status="cancelled"))
+    db.commit()
+    db.expire_all()
+
+    _assert_parity(Order, db.execute(select(models.Order).options(*ORDER_LOAD_OPTIONS).order_by(models.Order.order_id)).scalars().all())
+    _assert_parity(Product, db.execute(select(models.Product).options(*PRODUCT_LOAD_OPTIONS)).scalars().all())
+    _assert_parity(User, db.execute(select(models.User)).scalars().all())
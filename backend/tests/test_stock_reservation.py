@@ -0,0 +1,47 @@
+# backend/tests/test_stock_reservation.py
+"""
+Concurrent checkouts of the same product never sell more than its stock.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.database import models
+from app.database.session import SessionLocal
+from app.schemas.order import OrderCreate
+from app.services import order as order_services
+
+CHECKOUTS = 24
+STOCK = 7
+
+
+def test_concurrent_checkouts_do_not_oversell(db, catalog):
+    product_ids, user_ids = catalog(products=1, users=1, stock=STOCK)
+    hot_product = product_ids[0]
+    order = OrderCreate(user_id=user_ids[0], shipping_address="1 Main St", order_items=[
+        # order_id and price_at_purchase are part of the item schema but set by create_order.
+        {"order_id": 0, "product_id": hot_product, "quantity": 1, "price_at_purchase": "0.00"},
+    ])
+    start = threading.Barrier(CHECKOUTS)
+
+    def checkout(_):
+        start.wait()
+        with SessionLocal() as session:
+            try:
+                order_services.create_order(session, order)
+                return "placed"
+            except HTTPException as exc:
+                # 400 when the stock check sees none left, 409 when the conditional UPDATE lost the race.
+                assert exc.status_code in (400, 409), exc.detail
+                return "rejected"
+
+    with ThreadPoolExecutor(max_workers=CHECKOUTS) as pool:
+        outcomes = list(pool.map(checkout, range(CHECKOUTS)))
+
+    assert outcomes.count("placed") == STOCK
+    assert db.get(models.Product, hot_product).stock_quantity == 0
+    units_sold = db.execute(select(func.sum(models.OrderItem.quantity)).filter(models.OrderItem.product_id == hot_product)).scalar_one()
+    assert units_sold == STOCK
+    assert db.execute(select(func.count()).select_from(models.Order)).scalar_one() == STOCK
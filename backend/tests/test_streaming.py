@@ -0,0 +1,95 @@
+# backend/tests/test_streaming.py
+"""
+?stream=ndjson and ?stream=json send every row, batch by batch, as the same objects as the paged
+response, and the read session behind the stream is closed once it has been consumed.
+"""
+import json
+from decimal import Decimal
+
+import pytest
+
+from app.core import streaming
+from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.database import models
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    # Several batches per stream, so that the separators between them are exercised too.
+    monkeypatch.setattr(settings, "STREAM_BATCH_SIZE", 4)
+
+
+@pytest.fixture
+def read_sessions(monkeypatch):
+    """
+    The sessions the streams open, each with a `closed` flag set when it is closed.
+    """
+    opened = []
+    factory = streaming.ReadSessionLocal
+
+    def tracked():
+        session = factory()
+        session.closed = False
+        close = session.close
+
+        def closing():
+            session.closed = True
+            close()
+        session.close = closing
+        opened.append(session)
+        return session
+    monkeypatch.setattr(streaming, "ReadSessionLocal", tracked)
+    return opened
+
+
+@pytest.fixture
+def shop(catalog, db):
+    product_ids, user_ids = catalog(products=9, users=3)
+    for index in range(10):
+        db_order = models.Order(user_id=user_ids[index % len(user_ids)], total_amount=Decimal("3.00"), status="pending")
+        db.add(db_order)
+        db.flush()
+        db.add_all([
+            models.OrderItem(order_id=db_order.order_id, product_id=product_ids[(index + offset) % len(product_ids)], quantity=1, price_at_purchase=Decimal("1.50"))
+            for offset in range(2)
+        ])
+    db.commit()
+    admin = db.get(models.User, user_ids[0])
+    admin.role = "admin"
+    db.commit()
+    return admin
+
+
+def _parse(response, format):
+    assert response.headers["content-type"] == streaming.MEDIA_TYPES[format]
+    if format == "json":
+        return json.loads(response.content)
+    lines = response.content.decode().split("\n")
+    assert lines[-1] == "", "the last line is not terminated"
+    return [json.loads(line) for line in lines[:-1]]
+
+
+@pytest.mark.parametrize("format", ["ndjson", "json"])
+@pytest.mark.parametrize("path, rows", [("/api/v1/products/", 18), ("/api/v1/orders/", 10), ("/api/v1/users/", 3)])
+def test_stream_equals_the_paged_response(client, shop, auth, read_sessions, format, path, rows):
+    headers = auth(shop)
+    response = client.get(path, params={"stream": format}, headers=headers)
+    assert response.status_code == 200, response.text
+    streamed = _parse(response, format)
+    assert len(streamed) == rows
+    assert streamed == client.get(path, params={"limit": 100}, headers=headers).json()
+    assert len(read_sessions) == 1 and read_sessions[0].closed
+
+
+@pytest.mark.parametrize("format", ["ndjson", "json"])
+def test_stream_after_a_cursor(client, shop, format):
+    first = client.get("/api/v1/products/", params={"limit": 5})
+    streamed = _parse(client.get("/api/v1/products/", params={"stream": format, "cursor": first.headers[NEXT_CURSOR_HEADER]}), format)
+    assert streamed == client.get("/api/v1/products/", params={"limit": 100}).json()[5:]
+
+
+@pytest.mark.parametrize("format", ["ndjson", "json"])
+def test_empty_stream(client, read_sessions, format):
+    assert _parse(client.get("/api/v1/products/", params={"stream": format}), format) == []
+    assert read_sessions[0].closed